@@ -0,0 +1,88 @@
+"""
+Memory per key and acquire latency of keyed rate limiting at scale.
+
+Compares KeyedGCRA against the naive approach of one TokenBucket per key.
+
+Usage:
+    python -m benchmarks.ratelimit_keyed [--keys 1000000]
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from hyx.ratelimit.buckets import TokenBucket
+from hyx.ratelimit.gcra import KeyedGCRA
+
+
+def measure_memory_per_key(keys: list[str], fill: Callable[[list[str]], object]) -> float:
+    gc.collect()
+    tracemalloc.start()
+
+    state = fill(keys)
+    current_bytes, _ = tracemalloc.get_traced_memory()
+
+    tracemalloc.stop()
+    del state
+
+    return current_bytes / len(keys)
+
+
+def measure_acquire_latency_ns(keys: list[str], take: Callable[[str], None]) -> float:
+    started_at = time.perf_counter_ns()
+
+    for key in keys:
+        take(key)
+
+    return (time.perf_counter_ns() - started_at) / len(keys)
+
+
+def fill_keyed_gcra(keys: list[str]) -> KeyedGCRA:
+    gcra = KeyedGCRA(max_executions=100, per_time_secs=3600)
+
+    for key in keys:
+        gcra.take_nowait(key)
+
+    return gcra
+
+
+def fill_token_buckets(keys: list[str]) -> dict[str, TokenBucket]:
+    buckets = {}
+
+    for key in keys:
+        bucket = buckets[key] = TokenBucket(max_executions=100, per_time_secs=3600)
+        bucket.take_nowait()
+
+    return buckets
+
+
+def main(num_keys: int) -> None:
+    keys = [f"tenant-{idx}" for idx in range(num_keys)]
+    shuffled_keys = random.sample(keys, len(keys))
+
+    print(f"Keys: {num_keys:,}")
+
+    gcra_bytes = measure_memory_per_key(keys, fill_keyed_gcra)
+    bucket_bytes = measure_memory_per_key(keys, fill_token_buckets)
+
+    print(f"Memory per key: KeyedGCRA {gcra_bytes:.0f} B, TokenBucket per key {bucket_bytes:.0f} B")
+
+    gcra = fill_keyed_gcra(keys)
+    buckets = fill_token_buckets(keys)
+
+    gcra_latency = measure_acquire_latency_ns(shuffled_keys, gcra.take_nowait)
+    bucket_latency = measure_acquire_latency_ns(shuffled_keys, lambda key: buckets[key].take_nowait())
+
+    print(f"Acquire latency: KeyedGCRA {gcra_latency:.0f} ns, TokenBucket per key {bucket_latency:.0f} ns")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=1_000_000)
+
+    args = parser.parse_args()
+
+    main(args.keys)
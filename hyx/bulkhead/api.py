@@ -4,7 +4,7 @@ from types import TracebackType
 from typing import Any, cast
 
 from hyx.bulkhead.events import _BULKHEAD_LISTENERS, BulkheadListener
-from hyx.bulkhead.manager import BulkheadManager
+from hyx.bulkhead.manager import BulkheadManager, SharedBulkheadManager
 from hyx.events import EventManager, create_manager, get_default_name
 from hyx.typing import FuncT
 
@@ -21,6 +21,8 @@ class bulkhead:
         If the number is exceeded and max_execs allows, remaining executions are going to be queued
     * **max_capacity** *(int)* - Overall max number of executions (concurrent and queued).
         If the number is exceeded, new executions are going to be rejected
+    * **shared** *(bool)* - Share the limits between all processes on the host (e.g. gunicorn or uvicorn workers)
+        that use the bulkhead with the same *name* via shared memory. The *name* is required then
     """
 
     __slots__ = ("_manager",)
@@ -33,9 +35,14 @@ class bulkhead:
         name: str | None = None,
         listeners: Sequence[BulkheadListener] | None = None,
         event_manager: "EventManager | None" = None,
+        shared: bool = False,
     ) -> None:
+        if shared and not name:
+            # default names are not unique across the host, so unrelated bulkheads would share their state
+            raise ValueError("Shared bulkheads should be given an explicit name")
+
         self._manager = create_manager(
-            BulkheadManager,
+            SharedBulkheadManager if shared else BulkheadManager,
             listeners,
             _BULKHEAD_LISTENERS,
             event_manager=event_manager,
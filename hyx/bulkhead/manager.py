@@ -1,10 +1,32 @@
 import asyncio
+import os
 from typing import Any
 
 from hyx.bulkhead.events import BulkheadListener
 from hyx.bulkhead.exceptions import BulkheadFull
+from hyx.sharedmem import SharedSegment
 from hyx.typing import FuncT
 
+PROCESS_SLOTS = 256
+SLOT_WORDS = 3
+SLOT_PID, SLOT_EXECUTING, SLOT_ADMITTED = range(SLOT_WORDS)
+
+# slots claimed by this process as (pid, slot) by segment paths.
+# A slot that holds the pid of this process, but hasn't been claimed by it, is left by a dead process with the same pid
+_CLAIMED_SLOTS: dict[str, tuple[int, int]] = {}
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # the process exists, but belongs to another user
+        return True
+
+    return True
+
 
 class BulkheadManager:
     """
@@ -61,3 +83,136 @@ class BulkheadManager:
         async with self._total_execs_limiter:
             async with self._concurrency_limiter:
                 return await func()
+
+
+class SharedBulkheadManager(BulkheadManager):
+    """
+    Shared memory bulkhead implementation.
+    Limits concurrency and capacity across all processes on the host that use the same bulkhead name.
+
+    Each process accounts its executions in its own slot of the shared segment,
+    so executions of crashed processes are reclaimed instead of leaking forever.
+    Queued executions poll the shared state as there is no way to wake up waiters in other processes
+    """
+
+    __slots__ = ("_max_concurrency", "_max_capacity", "_poll_interval_secs", "_segment", "_slot", "_slot_pid")
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_capacity: int,
+        event_dispatcher: BulkheadListener,
+        name: str | None = None,
+        poll_interval_secs: float = 0.01,
+    ) -> None:
+        super().__init__(max_concurrency, max_capacity, event_dispatcher, name)
+
+        self._max_concurrency = max_concurrency
+        self._max_capacity = max_capacity
+        self._poll_interval_secs = poll_interval_secs
+
+        self._segment = SharedSegment(f"bulkhead-{name}", words=PROCESS_SLOTS * SLOT_WORDS)
+        self._slot = -1
+        self._slot_pid = 0
+
+    def _get_slot(self, words: memoryview) -> int:
+        pid = os.getpid()
+
+        if self._slot_pid == pid:
+            return self._slot
+
+        claimed_pid, claimed_slot = _CLAIMED_SLOTS.get(self._segment.path, (0, -1))
+
+        if claimed_pid == pid and words[claimed_slot + SLOT_PID] == pid:
+            # another manager of this process has already claimed the slot
+            self._slot, self._slot_pid = claimed_slot, pid
+            return claimed_slot
+
+        free_slot = None
+
+        for slot in range(0, len(words), SLOT_WORDS):
+            slot_pid = words[slot + SLOT_PID]
+
+            # the pid of this process in an unclaimed slot has been reused from a dead process
+            if slot_pid == 0 or slot_pid == pid or not _is_alive(slot_pid):
+                free_slot = slot
+                break
+
+        if free_slot is None:
+            raise RuntimeError(f"All {PROCESS_SLOTS} process slots of the shared bulkhead are taken")
+
+        # counts of the previous owner of the slot have leaked with its death
+        words[free_slot + SLOT_PID] = pid
+        words[free_slot + SLOT_EXECUTING] = 0
+        words[free_slot + SLOT_ADMITTED] = 0
+
+        _CLAIMED_SLOTS[self._segment.path] = (pid, free_slot)
+        self._slot, self._slot_pid = free_slot, pid
+
+        return free_slot
+
+    @staticmethod
+    def _count(words: memoryview, field: int) -> int:
+        return sum(words[slot + field] for slot in range(0, len(words), SLOT_WORDS))
+
+    @staticmethod
+    def _reclaim_dead_slots(words: memoryview) -> None:
+        for slot in range(0, len(words), SLOT_WORDS):
+            slot_pid = words[slot + SLOT_PID]
+
+            if slot_pid and words[slot + SLOT_ADMITTED] and not _is_alive(slot_pid):
+                words[slot + SLOT_EXECUTING] = 0
+                words[slot + SLOT_ADMITTED] = 0
+
+    def _admit(self) -> int | None:
+        with self._segment.locked() as words:
+            slot = self._get_slot(words)
+
+            if self._count(words, SLOT_ADMITTED) >= self._max_capacity:
+                self._reclaim_dead_slots(words)
+
+                if self._count(words, SLOT_ADMITTED) >= self._max_capacity:
+                    return None
+
+            words[slot + SLOT_ADMITTED] += 1
+
+            return slot
+
+    def _try_execute(self, slot: int) -> bool:
+        with self._segment.locked() as words:
+            if self._count(words, SLOT_EXECUTING) >= self._max_concurrency:
+                return False
+
+            words[slot + SLOT_EXECUTING] += 1
+
+            return True
+
+    async def acquire(self) -> None:
+        slot = self._admit()
+
+        if slot is None:
+            await self._event_dispatcher.on_bulkhead_full(self)
+
+            raise BulkheadFull
+
+        try:
+            while not self._try_execute(slot):
+                await asyncio.sleep(self._poll_interval_secs)
+        except BaseException:
+            with self._segment.locked() as words:
+                words[slot + SLOT_ADMITTED] -= 1
+
+            raise
+
+    async def release(self) -> None:
+        with self._segment.locked() as words:
+            words[self._slot + SLOT_EXECUTING] -= 1
+            words[self._slot + SLOT_ADMITTED] -= 1
+
+    async def __call__(self, func: FuncT) -> Any:
+        await self.acquire()
+
+        try:
+            return await func()
+        finally:
+            await self.release()
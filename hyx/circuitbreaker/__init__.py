@@ -1,4 +1,12 @@
-from hyx.circuitbreaker.api import consecutive_breaker
+from hyx.circuitbreaker.api import consecutive_breaker, count_window_breaker, time_window_breaker
 from hyx.circuitbreaker.events import BreakerListener, register_breaker_listener
+from hyx.circuitbreaker.health import HealthCheck
 
-__all__ = ("consecutive_breaker", "BreakerListener", "register_breaker_listener")
+__all__ = (
+    "consecutive_breaker",
+    "time_window_breaker",
+    "count_window_breaker",
+    "BreakerListener",
+    "register_breaker_listener",
+    "HealthCheck",
+)
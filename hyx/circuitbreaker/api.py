@@ -4,14 +4,65 @@ from types import TracebackType
 from typing import Any, cast
 
 from hyx.circuitbreaker.events import _BREAKER_LISTENERS, BreakerListener
-from hyx.circuitbreaker.managers import ConsecutiveCircuitBreaker
+from hyx.circuitbreaker.health import HealthCheck
+from hyx.circuitbreaker.managers import (
+    CircuitBreaker,
+    ConsecutiveCircuitBreaker,
+    SharedConsecutiveCircuitBreaker,
+    WindowCircuitBreaker,
+)
 from hyx.circuitbreaker.states import BreakerState
-from hyx.circuitbreaker.typing import DelayT
+from hyx.circuitbreaker.typing import BackoffT, DelayT, RampUpT
+from hyx.circuitbreaker.windows import CountWindow, TimeWindow
 from hyx.events import EventManager, create_manager, get_default_name
 from hyx.typing import ExceptionsT, FuncT
 
 
-class consecutive_breaker:
+class circuitbreaker:
+    """
+    Apply a circuit breaker manager as a decorator or a context manager
+    """
+
+    __slots__ = ("_manager",)
+
+    def __init__(self, manager: CircuitBreaker) -> None:
+        self._manager = manager
+
+    @property
+    def state(self) -> "BreakerState":
+        return self._manager.state
+
+    async def __aenter__(self) -> "circuitbreaker":
+        await self._manager.acquire()
+
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> bool | None:
+        await self._manager.release(exc_val)
+
+        return None
+
+    def __call__(self, func: FuncT) -> FuncT:
+        """
+        Apply Circuit Breaker as decorator
+        """
+
+        @functools.wraps(func)
+        async def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            return await self._manager(cast(FuncT, functools.partial(func, *args, **kwargs)))
+
+        _wrapper._original = func  # type: ignore[attr-defined]
+        _wrapper._manager = self._manager  # type: ignore[attr-defined]
+
+        return cast(FuncT, _wrapper)
+
+
+class consecutive_breaker(circuitbreaker):
     """
     Consecutive breaker is the most basic implementation of the circuit breaker pattern.
     It counts the absolute amount of times the system has been **consecutively failed** and
@@ -39,9 +90,29 @@ class consecutive_breaker:
     * **recovery_time_secs** - Time in seconds we give breaker to recover from the `failing` state
     * **recovery_threshold** - Number of consecutive successes that is needed to be pass to
         turn breaker back to the `working` state
+    * **shared** - Share detected failures between all processes on the host (e.g. gunicorn or uvicorn workers)
+        that use the breaker with the same *name* via shared memory. The *name* is required then.
+        Failures are still counted by each process, but once any of them moves into the `failing` state,
+        the rest follow it
+    * **slow_call_secs** - Successful calls that take longer than this are counted as failures.
+        Their results are still returned. Disabled by default
+    * **recovery_max_probes** - The max number of trial executions in flight in the `recovering` state.
+        Executions beyond it are rejected, so the backlog doesn't hit the barely recovered system. Unbounded by default
+    * **health_check** - Probe the system in the background while the breaker is failing (see `HealthCheck`).
+        The breaker moves into the `working` state after *recovery_threshold* successful probes in a row
+        and doesn't let executions through after the recovery delay
+    * **recovery_backoff** - Grow the recovery delay each time a recovery attempt fails
+        (e.g. `expo(min_delay_secs=5, max_delay_secs=300, jitter=jitters.full)` from `hyx.retry.backoffs`).
+        Replaces *recovery_time_secs*. Each breaker needs its own backoff instance
+    * **recovery_reset_secs** - Time in the `working` state after which the recovery backoff starts over
+    * **ramp_up_secs** - Time after recovery during which only a growing share of executions is let through,
+        so the cold system is not hit by the full traffic at once. The rest are rejected with `BreakerFailing`
+        right away. Disabled by default
+    * **ramp_up** - How the share of let through executions grows during *ramp_up_secs*:
+        `linear` or `exponential` (stays low longer and speeds up in the end)
     """
 
-    __slots__ = ("_manager",)
+    __slots__ = ()
 
     def __init__(
         self,
@@ -52,48 +123,213 @@ class consecutive_breaker:
         listeners: Sequence[BreakerListener] | None = None,
         name: str | None = None,
         event_manager: "EventManager | None" = None,
+        shared: bool = False,
+        slow_call_secs: float | None = None,
+        recovery_max_probes: int | None = None,
+        health_check: HealthCheck | None = None,
+        recovery_backoff: BackoffT | None = None,
+        recovery_reset_secs: float = 60,
+        ramp_up_secs: float | None = None,
+        ramp_up: RampUpT = "linear",
     ) -> None:
-        self._manager = create_manager(
-            ConsecutiveCircuitBreaker,
-            listeners,
-            _BREAKER_LISTENERS,
-            event_manager=event_manager,
-            name=name or get_default_name(),
-            exceptions=exceptions,
-            failure_threshold=failure_threshold,
-            recovery_time_secs=recovery_time_secs,
-            recovery_threshold=recovery_threshold,
+        if shared and not name:
+            # default names are not unique across the host, so unrelated breakers would share their state
+            raise ValueError("Shared breakers should be given an explicit name")
+
+        super().__init__(
+            create_manager(
+                SharedConsecutiveCircuitBreaker if shared else ConsecutiveCircuitBreaker,
+                listeners,
+                _BREAKER_LISTENERS,
+                event_manager=event_manager,
+                name=name or get_default_name(),
+                exceptions=exceptions,
+                failure_threshold=failure_threshold,
+                recovery_time_secs=recovery_time_secs,
+                recovery_threshold=recovery_threshold,
+                slow_call_secs=slow_call_secs,
+                recovery_max_probes=recovery_max_probes,
+                health_check=health_check,
+                recovery_backoff=recovery_backoff,
+                recovery_reset_secs=recovery_reset_secs,
+                ramp_up_secs=ramp_up_secs,
+                ramp_up=ramp_up,
+            )
         )
 
-    @property
-    def state(self) -> "BreakerState":
-        return self._manager.state
 
-    async def __aenter__(self) -> "consecutive_breaker":
-        await self._manager.acquire()
+class time_window_breaker(circuitbreaker):
+    """
+    Time window breaker watches the **failure rate** of calls made over the last *window_secs* seconds and
+    turns into the `failing` state once the rate reaches the threshold.
+    Unlike the consecutive breaker, occasional successes don't hide an upstream that fails most of the time.
 
-        return self
+    The breaker doesn't judge the rate until at least *minimum_calls* calls are made within the window,
+    so a couple of failures during a quiet period don't open it.
+    Recovery works the same way as in the consecutive breaker.
+    Calls are counted in a ring of time buckets, so recording a call takes constant time and memory.
 
-    async def __aexit__(
+    **Parameters**
+
+    * **exceptions** - Exception or list of exceptions that are considered as a failure
+    * **failure_rate_threshold** - Share of failed calls in the window (from 0 to 1)
+        that turns breaker into the `failing` state
+    * **window_secs** - Time in seconds the failure rate is calculated over
+    * **minimum_calls** - Number of calls in the window needed to calculate the failure rate
+    * **bucket_secs** - The window resolution. Calls older than *window_secs* expire one bucket at a time
+    * **recovery_time_secs** - Time in seconds we give breaker to recover from the `failing` state
+    * **recovery_threshold** - Number of consecutive successes that is needed to be pass to
+        turn breaker back to the `working` state
+    * **slow_call_secs** - Successful calls that take longer than this are slow calls.
+        Their results are still returned. Disabled by default
+    * **slow_call_rate_threshold** - Share of slow calls in the window (from 0 to 1)
+        that turns breaker into the `failing` state
+    * **recovery_max_probes** - The max number of trial executions in flight in the `recovering` state.
+        Executions beyond it are rejected, so the backlog doesn't hit the barely recovered system. Unbounded by default
+    * **health_check** - Probe the system in the background while the breaker is failing (see `HealthCheck`).
+        The breaker moves into the `working` state after *recovery_threshold* successful probes in a row
+        and doesn't let executions through after the recovery delay
+    * **recovery_backoff** - Grow the recovery delay each time a recovery attempt fails
+        (e.g. `expo(min_delay_secs=5, max_delay_secs=300, jitter=jitters.full)` from `hyx.retry.backoffs`).
+        Replaces *recovery_time_secs*. Each breaker needs its own backoff instance
+    * **recovery_reset_secs** - Time in the `working` state after which the recovery backoff starts over
+    * **ramp_up_secs** - Time after recovery during which only a growing share of executions is let through,
+        so the cold system is not hit by the full traffic at once. The rest are rejected with `BreakerFailing`
+        right away. Disabled by default
+    * **ramp_up** - How the share of let through executions grows during *ramp_up_secs*:
+        `linear` or `exponential` (stays low longer and speeds up in the end)
+    """
+
+    __slots__ = ()
+
+    def __init__(
         self,
-        exc_type: type[BaseException] | None,
-        exc_val: BaseException | None,
-        exc_tb: TracebackType | None,
-    ) -> bool | None:
-        await self._manager.release(exc_val)
+        exceptions: ExceptionsT = Exception,
+        failure_rate_threshold: float = 0.5,
+        window_secs: float = 60,
+        minimum_calls: int = 20,
+        bucket_secs: float = 1,
+        recovery_time_secs: DelayT = 30,
+        recovery_threshold: int = 3,
+        listeners: Sequence[BreakerListener] | None = None,
+        name: str | None = None,
+        event_manager: "EventManager | None" = None,
+        slow_call_secs: float | None = None,
+        slow_call_rate_threshold: float = 1.0,
+        recovery_max_probes: int | None = None,
+        health_check: HealthCheck | None = None,
+        recovery_backoff: BackoffT | None = None,
+        recovery_reset_secs: float = 60,
+        ramp_up_secs: float | None = None,
+        ramp_up: RampUpT = "linear",
+    ) -> None:
+        super().__init__(
+            create_manager(
+                WindowCircuitBreaker,
+                listeners,
+                _BREAKER_LISTENERS,
+                event_manager=event_manager,
+                name=name or get_default_name(),
+                exceptions=exceptions,
+                window=TimeWindow(
+                    window_secs,
+                    failure_rate_threshold,
+                    minimum_calls,
+                    bucket_secs=bucket_secs,
+                    slow_call_rate_threshold=slow_call_rate_threshold,
+                ),
+                slow_call_secs=slow_call_secs,
+                recovery_time_secs=recovery_time_secs,
+                recovery_threshold=recovery_threshold,
+                recovery_max_probes=recovery_max_probes,
+                health_check=health_check,
+                recovery_backoff=recovery_backoff,
+                recovery_reset_secs=recovery_reset_secs,
+                ramp_up_secs=ramp_up_secs,
+                ramp_up=ramp_up,
+            )
+        )
 
-        return None
 
-    def __call__(self, func: FuncT) -> FuncT:
-        """
-        Apply Consecutive Circuit Breaker as decorator
-        """
+class count_window_breaker(circuitbreaker):
+    """
+    Count window breaker watches the **failure rate** of the last *window_size* calls and
+    turns into the `failing` state once the rate reaches the threshold.
+    It suits low-traffic upstreams where time windows hold too few calls to judge,
+    as the window always contains the same number of calls no matter how long ago they were made.
 
-        @functools.wraps(func)
-        async def _wrapper(*args: Any, **kwargs: Any) -> Any:
-            return await self._manager(cast(FuncT, functools.partial(func, *args, **kwargs)))
+    Outcomes are kept as two bits per call (failed and slow), so the window takes *2 x window_size* bits of memory.
+    Recovery works the same way as in the consecutive breaker.
 
-        _wrapper._original = func  # type: ignore[attr-defined]
-        _wrapper._manager = self._manager  # type: ignore[attr-defined]
+    **Parameters**
 
-        return cast(FuncT, _wrapper)
+    * **exceptions** - Exception or list of exceptions that are considered as a failure
+    * **failure_rate_threshold** - Share of failed calls in the window (from 0 to 1)
+        that turns breaker into the `failing` state
+    * **window_size** - Number of the most recent calls the failure rate is calculated over
+    * **minimum_calls** - Number of calls needed to calculate the failure rate. Equal to *window_size* by default
+    * **recovery_time_secs** - Time in seconds we give breaker to recover from the `failing` state
+    * **recovery_threshold** - Number of consecutive successes that is needed to be pass to
+        turn breaker back to the `working` state
+    * **slow_call_secs** - Successful calls that take longer than this are slow calls.
+        Their results are still returned. Disabled by default
+    * **slow_call_rate_threshold** - Share of slow calls in the window (from 0 to 1)
+        that turns breaker into the `failing` state
+    * **recovery_max_probes** - The max number of trial executions in flight in the `recovering` state.
+        Executions beyond it are rejected, so the backlog doesn't hit the barely recovered system. Unbounded by default
+    * **health_check** - Probe the system in the background while the breaker is failing (see `HealthCheck`).
+        The breaker moves into the `working` state after *recovery_threshold* successful probes in a row
+        and doesn't let executions through after the recovery delay
+    * **recovery_backoff** - Grow the recovery delay each time a recovery attempt fails
+        (e.g. `expo(min_delay_secs=5, max_delay_secs=300, jitter=jitters.full)` from `hyx.retry.backoffs`).
+        Replaces *recovery_time_secs*. Each breaker needs its own backoff instance
+    * **recovery_reset_secs** - Time in the `working` state after which the recovery backoff starts over
+    * **ramp_up_secs** - Time after recovery during which only a growing share of executions is let through,
+        so the cold system is not hit by the full traffic at once. The rest are rejected with `BreakerFailing`
+        right away. Disabled by default
+    * **ramp_up** - How the share of let through executions grows during *ramp_up_secs*:
+        `linear` or `exponential` (stays low longer and speeds up in the end)
+    """
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        exceptions: ExceptionsT = Exception,
+        failure_rate_threshold: float = 0.5,
+        window_size: int = 100,
+        minimum_calls: int | None = None,
+        recovery_time_secs: DelayT = 30,
+        recovery_threshold: int = 3,
+        listeners: Sequence[BreakerListener] | None = None,
+        name: str | None = None,
+        event_manager: "EventManager | None" = None,
+        slow_call_secs: float | None = None,
+        slow_call_rate_threshold: float = 1.0,
+        recovery_max_probes: int | None = None,
+        health_check: HealthCheck | None = None,
+        recovery_backoff: BackoffT | None = None,
+        recovery_reset_secs: float = 60,
+        ramp_up_secs: float | None = None,
+        ramp_up: RampUpT = "linear",
+    ) -> None:
+        super().__init__(
+            create_manager(
+                WindowCircuitBreaker,
+                listeners,
+                _BREAKER_LISTENERS,
+                event_manager=event_manager,
+                name=name or get_default_name(),
+                exceptions=exceptions,
+                window=CountWindow(window_size, failure_rate_threshold, minimum_calls, slow_call_rate_threshold),
+                slow_call_secs=slow_call_secs,
+                recovery_time_secs=recovery_time_secs,
+                recovery_threshold=recovery_threshold,
+                recovery_max_probes=recovery_max_probes,
+                health_check=health_check,
+                recovery_backoff=recovery_backoff,
+                recovery_reset_secs=recovery_reset_secs,
+                ramp_up_secs=ramp_up_secs,
+                ramp_up=ramp_up,
+            )
+        )
@@ -1,11 +1,13 @@
 import dataclasses
 from typing import TYPE_CHECKING
 
-from hyx.circuitbreaker.typing import DelayT
+from hyx.circuitbreaker.typing import BackoffT, DelayT, RampUpT
 from hyx.typing import ExceptionsT
 
 if TYPE_CHECKING:
     from hyx.circuitbreaker import BreakerListener
+    from hyx.circuitbreaker.health import HealthCheck
+    from hyx.circuitbreaker.windows import OutcomeWindow
 
 
 @dataclasses.dataclass
@@ -16,6 +18,21 @@ class BreakerContext:
     recovery_time_secs: DelayT
     recovery_threshold: int
     event_dispatcher: "BreakerListener"
+    # judges the failure rate of recent calls instead of counting consecutive failures
+    window: "OutcomeWindow | None" = None
+    # successful calls that take longer are slow calls
+    slow_call_secs: float | None = None
+    # the max number of trial executions in flight while the breaker is recovering
+    recovery_max_probes: int | None = None
+    # probes the system in the background instead of letting executions through after the recovery delay
+    health_check: "HealthCheck | None" = None
+    # delays of consecutive failing periods that replace the flat recovery_time_secs
+    recovery_backoff: BackoffT | None = None
+    # time in the working state after which the recovery backoff starts over
+    recovery_reset_secs: float = 60.0
+    # time after recovery during which only a growing share of executions is let through
+    ramp_up_secs: float | None = None
+    ramp_up: RampUpT = "linear"
 
     @property
     def name(self) -> str | None:
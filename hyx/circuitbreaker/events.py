@@ -1,13 +1,13 @@
 from typing import TYPE_CHECKING
 
 from hyx.circuitbreaker.context import BreakerContext
-from hyx.circuitbreaker.managers import ConsecutiveCircuitBreaker
+from hyx.circuitbreaker.managers import CircuitBreaker
 from hyx.events import ListenerFactoryT, ListenerRegistry
 
 if TYPE_CHECKING:
     from hyx.circuitbreaker.states import BreakerState, FailingState, RecoveringState, WorkingState
 
-_BREAKER_LISTENERS: ListenerRegistry["ConsecutiveCircuitBreaker", "BreakerListener"] = ListenerRegistry()
+_BREAKER_LISTENERS: ListenerRegistry["CircuitBreaker", "BreakerListener"] = ListenerRegistry()
 
 
 class BreakerListener:
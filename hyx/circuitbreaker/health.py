@@ -0,0 +1,66 @@
+import asyncio
+import random
+
+from hyx.circuitbreaker.typing import ProbeT
+
+
+class HealthCheck:
+    """
+    Probe the failing system in the background, so real executions are not used as trial ones.
+
+    A breaker with a health check doesn't let executions through once the recovery delay is over.
+    Instead, it runs the probe every *interval_secs* seconds while it's failing
+    and moves into the working state after `recovery_threshold` consecutive successful probes.
+
+    **Parameters:**
+
+    * **probe** - An async function that checks the system health. The probe fails if it raises or times out
+    * **interval_secs** - Time between two probes
+    * **timeout_secs** - How long to wait for the probe to finish
+    * **jitter** - Randomize intervals by this share (e.g. 0.2 means ±20%), so processes don't probe in sync
+    """
+
+    __slots__ = ("_probe", "_interval_secs", "_timeout_secs", "_jitter")
+
+    def __init__(
+        self,
+        probe: ProbeT,
+        interval_secs: float = 5.0,
+        timeout_secs: float = 1.0,
+        jitter: float = 0.2,
+    ) -> None:
+        if interval_secs <= 0:
+            raise ValueError(f'interval_secs should be greater than zero ("{interval_secs}" given)')
+
+        if not 0 <= jitter < 1:
+            raise ValueError(f'jitter should be in [0, 1) range ("{jitter}" given)')
+
+        self._probe = probe
+        self._interval_secs = interval_secs
+        self._timeout_secs = timeout_secs
+        self._jitter = jitter
+
+    @property
+    def interval_secs(self) -> float:
+        return self._interval_secs
+
+    @property
+    def timeout_secs(self) -> float:
+        return self._timeout_secs
+
+    def get_delay(self) -> float:
+        """
+        Time until the next probe
+        """
+        return self._interval_secs * random.uniform(1 - self._jitter, 1 + self._jitter)
+
+    async def check(self) -> bool:
+        """
+        Run the probe and tell whether it has succeeded
+        """
+        try:
+            await asyncio.wait_for(self._probe(), self._timeout_secs)
+        except Exception:
+            return False
+
+        return True
@@ -1,70 +1,328 @@
+import asyncio
+import math
+import time
+from contextvars import ContextVar
 from typing import TYPE_CHECKING, Any
 
 from hyx.circuitbreaker.context import BreakerContext
-from hyx.circuitbreaker.states import BreakerState, WorkingState
-from hyx.circuitbreaker.typing import DelayT
+from hyx.circuitbreaker.health import HealthCheck
+from hyx.circuitbreaker.states import BreakerState, BreakerStates, FailingState
+from hyx.circuitbreaker.typing import BackoffT, DelayT, RampUpT
+from hyx.circuitbreaker.windows import OutcomeWindow
+from hyx.sharedmem import SharedSegment
 from hyx.typing import ExceptionsT, FuncT
 
+SECS_TO_NS = 1_000_000_000
+NS_TO_SECS = 1 / SECS_TO_NS
+
+# start times and breaker transitions of executions made via breakers used as context managers in the current task
+# (the innermost execution is the last)
+_CALL_STARTS: ContextVar[tuple[tuple[float, int], ...]] = ContextVar("hyx_breaker_call_starts", default=())
+
 if TYPE_CHECKING:
     from hyx.circuitbreaker import BreakerListener
 
 
-class ConsecutiveCircuitBreaker:
+class CircuitBreaker:
     """
-    Watch for consecutive exceptions that exceed a given threshold
+    Run executions through the breaker state machine described by the given context
     """
 
-    __slots__ = ("_context", "_name", "_state", "_event_dispatcher")
+    __slots__ = ("_context", "_name", "_states", "_state", "_transitions", "_health_check_task", "_event_dispatcher")
 
-    def __init__(
-        self,
-        name: str,
-        exceptions: ExceptionsT,
-        failure_threshold: int,
-        recovery_time_secs: DelayT,
-        recovery_threshold: int,
-        event_dispatcher: "BreakerListener",
-    ) -> None:
-        self._name = name
-
-        self._context = BreakerContext(
-            breaker_name=name,
-            exceptions=exceptions,
-            failure_threshold=failure_threshold,
-            recovery_time_secs=recovery_time_secs,
-            recovery_threshold=recovery_threshold,
-            event_dispatcher=event_dispatcher,
-        )
+    def __init__(self, context: BreakerContext) -> None:
+        self._name = context.breaker_name
+        self._context = context
+
+        self._states = BreakerStates(self._context)
+        self._state: BreakerState = self._states.working
 
-        self._state: BreakerState = WorkingState(self._context)
+        # outcomes of executions that have started before the latest transition are not counted
+        self._transitions = 0
+
+        self._health_check_task: asyncio.Task[None] | None = None
 
     @property
     def state(self) -> BreakerState:
         return self._state
 
-    async def _transit_state(self, new_state: BreakerState) -> None:
+    def _set_state(self, new_state: BreakerState) -> None:
+        if new_state is self._state:
+            return
+
         self._state = new_state
+        self._transitions += 1
+
+        if new_state is self._states.failing and self._context.health_check is not None:
+            self._health_check_task = asyncio.create_task(self._check_health(self._context.health_check))
+
+    async def _check_health(self, health_check: HealthCheck) -> None:
+        """
+        Probe the system while the breaker is failing and move the breaker into the working state once it's healthy
+        """
+        successes = 0
+
+        while successes < self._context.recovery_threshold:
+            await asyncio.sleep(health_check.get_delay())
+
+            successes = successes + 1 if await health_check.check() else 0
+
+        if self._state is not self._states.failing:
+            return
+
+        working_state = self._states.working.enter()
+        await self._context.event_dispatcher.on_working(self._context, self._state, working_state)
+
+        self._health_check_task = None
+        self._on_recovered()
+
+        self._set_state(working_state)
+
+    def _on_recovered(self) -> None:
+        """
+        The health check has found the system healthy while the breaker is failing
+        """
+
+    async def _transit_state(self, new_state: BreakerState) -> None:
+        self._set_state(new_state)
+
+    def _is_slow(self, started_at: float) -> bool:
+        slow_call_secs = self._context.slow_call_secs
+
+        return slow_call_secs is not None and time.monotonic() - started_at >= slow_call_secs
 
     async def acquire(self) -> None:
         await self._transit_state(await self._state.before_execution())
 
+        # the same breaker may be entered by concurrent tasks, so each task keeps its own executions
+        _CALL_STARTS.set((*_CALL_STARTS.get(), (time.monotonic(), self._transitions)))
+
     async def release(self, exception: BaseException | None) -> None:
+        *call_starts, (started_at, transitions) = _CALL_STARTS.get()
+        _CALL_STARTS.set(tuple(call_starts))
+
         if exception and isinstance(exception, self._context.exceptions):
-            await self._transit_state(await self._state.on_exception())
+            if transitions == self._transitions:
+                await self._transit_state(await self._state.on_exception())
+
             raise exception
 
-        await self._transit_state(await self._state.on_success())
+        if transitions != self._transitions:
+            return
+
+        if exception:
+            # cancellations and exceptions the breaker doesn't watch for are neither successes nor failures
+            await self._transit_state(await self._state.on_discard())
+            return
+
+        await self._transit_state(await self._state.on_success(self._is_slow(started_at)))
 
     async def __call__(self, func: FuncT) -> Any:
         await self._transit_state(await self._state.before_execution())
 
+        started_at = time.monotonic()
+        transitions = self._transitions
+
         try:
             result = await func()
-
-            await self._transit_state(await self._state.on_success())
-
-            return result
         except self._context.exceptions as e:
-            await self._transit_state(await self._state.on_exception())
+            if transitions == self._transitions:
+                await self._transit_state(await self._state.on_exception())
+
             # breaker is not hiding the error like retry or fallback
             raise e
+        except BaseException:
+            if transitions == self._transitions:
+                await self._transit_state(await self._state.on_discard())
+
+            raise
+
+        if transitions == self._transitions:
+            # the result is returned even if the call is slow
+            await self._transit_state(await self._state.on_success(self._is_slow(started_at)))
+
+        return result
+
+
+class ConsecutiveCircuitBreaker(CircuitBreaker):
+    """
+    Watch for consecutive exceptions that exceed a given threshold
+    """
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        name: str,
+        exceptions: ExceptionsT,
+        failure_threshold: int,
+        recovery_time_secs: DelayT,
+        recovery_threshold: int,
+        event_dispatcher: "BreakerListener",
+        slow_call_secs: float | None = None,
+        recovery_max_probes: int | None = None,
+        health_check: HealthCheck | None = None,
+        recovery_backoff: BackoffT | None = None,
+        recovery_reset_secs: float = 60.0,
+        ramp_up_secs: float | None = None,
+        ramp_up: RampUpT = "linear",
+    ) -> None:
+        super().__init__(
+            BreakerContext(
+                breaker_name=name,
+                exceptions=exceptions,
+                failure_threshold=failure_threshold,
+                recovery_time_secs=recovery_time_secs,
+                recovery_threshold=recovery_threshold,
+                event_dispatcher=event_dispatcher,
+                slow_call_secs=slow_call_secs,
+                recovery_max_probes=recovery_max_probes,
+                health_check=health_check,
+                recovery_backoff=recovery_backoff,
+                recovery_reset_secs=recovery_reset_secs,
+                ramp_up_secs=ramp_up_secs,
+                ramp_up=ramp_up,
+            )
+        )
+
+
+class WindowCircuitBreaker(CircuitBreaker):
+    """
+    Watch for the failure rate of recent calls that exceeds a given threshold.
+    Unlike consecutive exceptions, the failure rate is not reset by occasional successes
+    """
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        name: str,
+        exceptions: ExceptionsT,
+        window: OutcomeWindow,
+        recovery_time_secs: DelayT,
+        recovery_threshold: int,
+        event_dispatcher: "BreakerListener",
+        slow_call_secs: float | None = None,
+        recovery_max_probes: int | None = None,
+        health_check: HealthCheck | None = None,
+        recovery_backoff: BackoffT | None = None,
+        recovery_reset_secs: float = 60.0,
+        ramp_up_secs: float | None = None,
+        ramp_up: RampUpT = "linear",
+    ) -> None:
+        super().__init__(
+            BreakerContext(
+                breaker_name=name,
+                exceptions=exceptions,
+                # the fewest failures that can move the breaker into the failing state
+                failure_threshold=math.ceil(window.minimum_calls * window.failure_rate_threshold),
+                recovery_time_secs=recovery_time_secs,
+                recovery_threshold=recovery_threshold,
+                event_dispatcher=event_dispatcher,
+                window=window,
+                slow_call_secs=slow_call_secs,
+                recovery_max_probes=recovery_max_probes,
+                health_check=health_check,
+                recovery_backoff=recovery_backoff,
+                recovery_reset_secs=recovery_reset_secs,
+                ramp_up_secs=ramp_up_secs,
+                ramp_up=ramp_up,
+            )
+        )
+
+    @property
+    def window(self) -> OutcomeWindow:
+        assert self._context.window is not None
+        return self._context.window
+
+
+class SharedConsecutiveCircuitBreaker(ConsecutiveCircuitBreaker):
+    """
+    Watch for consecutive exceptions and share detected failures with all processes on the host.
+
+    When any process moves the breaker into the failing state, it publishes the failing deadline into shared memory.
+    Other processes that use the breaker with the same name follow it into the failing state until the deadline,
+    so each of them doesn't have to discover the outage on its own
+    """
+
+    __slots__ = ("_segment",)
+
+    def __init__(
+        self,
+        name: str,
+        exceptions: ExceptionsT,
+        failure_threshold: int,
+        recovery_time_secs: DelayT,
+        recovery_threshold: int,
+        event_dispatcher: "BreakerListener",
+        slow_call_secs: float | None = None,
+        recovery_max_probes: int | None = None,
+        health_check: HealthCheck | None = None,
+        recovery_backoff: BackoffT | None = None,
+        recovery_reset_secs: float = 60.0,
+        ramp_up_secs: float | None = None,
+        ramp_up: RampUpT = "linear",
+    ) -> None:
+        super().__init__(
+            name,
+            exceptions,
+            failure_threshold,
+            recovery_time_secs,
+            recovery_threshold,
+            event_dispatcher,
+            slow_call_secs,
+            recovery_max_probes,
+            health_check,
+            recovery_backoff,
+            recovery_reset_secs,
+            ramp_up_secs,
+            ramp_up,
+        )
+
+        # the failing deadline on the system-wide time.monotonic_ns() clock
+        self._segment = SharedSegment(f"breaker-{name}", words=1)
+
+    @property
+    def segment(self) -> SharedSegment:
+        return self._segment
+
+    async def _transit_state(self, new_state: BreakerState) -> None:
+        if isinstance(new_state, FailingState) and new_state is not self._state:
+            failing_until_ns = time.monotonic_ns() + round(new_state.recovery_time_secs * SECS_TO_NS)
+
+            with self._segment.locked() as words:
+                if words[0] < failing_until_ns:
+                    words[0] = failing_until_ns
+
+        self._set_state(new_state)
+
+    def _on_recovered(self) -> None:
+        # the published deadline would move the breaker back into the failing state on the next execution
+        with self._segment.locked() as words:
+            words[0] = 0
+
+    async def _follow_shared_state(self) -> None:
+        """
+        Move into the failing state if another process has detected the failure
+        """
+        if isinstance(self._state, FailingState):
+            return
+
+        remaining_ns = self._segment[0] - time.monotonic_ns()
+
+        if remaining_ns <= 0:
+            return
+
+        failing_state = self._states.failing.enter(recovery_time_secs=remaining_ns * NS_TO_SECS)
+        await self._context.event_dispatcher.on_failing(self._context, self._state, failing_state)
+
+        self._set_state(failing_state)
+
+    async def acquire(self) -> None:
+        await self._follow_shared_state()
+        await super().acquire()
+
+    async def __call__(self, func: FuncT) -> Any:
+        await self._follow_shared_state()
+
+        return await super().__call__(func)
@@ -1,16 +1,23 @@
+import random
+import time
 from datetime import datetime, timedelta, timezone
 
 from hyx.circuitbreaker.context import BreakerContext
 from hyx.circuitbreaker.exceptions import BreakerFailing
+from hyx.circuitbreaker.typing import DelayT
+
+# the share of executions let through right after recovery when the traffic is ramped up
+RAMP_UP_MIN_SHARE = 0.05
 
 
 class BreakerState:
     NAME: str = "base"
 
-    __slots__ = ("_context", "_event_dispatcher")
+    __slots__ = ("_context", "_states")
 
-    def __init__(self, context: BreakerContext) -> None:
+    def __init__(self, context: BreakerContext, states: "BreakerStates") -> None:
         self._context = context
+        self._states = states
 
     @property
     def name(self) -> str:
@@ -19,59 +26,165 @@ class BreakerState:
     async def before_execution(self) -> "BreakerState":
         return self
 
-    async def on_success(self) -> "BreakerState":
+    async def on_success(self, slow: bool = False) -> "BreakerState":
         return self
 
     async def on_exception(self) -> "BreakerState":
         return self
 
+    async def on_discard(self) -> "BreakerState":
+        """
+        The execution has ended with an exception the breaker doesn't watch for, so its outcome is not counted
+        """
+        return self
+
+
+class BreakerStates:
+    """
+    States of one breaker. They are allocated once, and transitions move the breaker between them
+    """
+
+    __slots__ = ("working", "failing", "recovering")
+
+    def __init__(self, context: BreakerContext) -> None:
+        self.working = WorkingState(context, self)
+        self.failing = FailingState(context, self)
+        self.recovering = RecoveringState(context, self)
+
 
 class WorkingState(BreakerState):
     """
     The breaker executes given code.
 
+    Right after recovery, the breaker can ramp the traffic up (aka slow start),
+    so only a growing share of executions is let through, and the rest are rejected right away.
+
     Also known as the "closed" state
     """
 
     NAME = "working"
+    REJECTION_MESSAGE = "Circuit Breaker is ramping the traffic up after recovery"
 
-    __slots__ = ("_consecutive_exceptions",)
+    __slots__ = ("_consecutive_exceptions", "_working_since", "_ramp_up_until")
 
-    def __init__(self, context: BreakerContext) -> None:
-        super().__init__(context)
+    def __init__(self, context: BreakerContext, states: "BreakerStates") -> None:
+        super().__init__(context, states)
+
+        if context.ramp_up_secs is not None and context.ramp_up_secs <= 0:
+            raise ValueError(f'ramp_up_secs should be greater than zero ("{context.ramp_up_secs}" given)')
+
+        if context.ramp_up not in ("linear", "exponential"):
+            raise ValueError(f'ramp_up should be either linear or exponential ("{context.ramp_up}" given)')
 
         self._consecutive_exceptions: int = 0
+        self._working_since = time.monotonic()
+
+        # the breaker starts with the full traffic, zero means no ramp up is in progress
+        self._ramp_up_until = 0.0
+
+    def enter(self) -> "WorkingState":
+        self._consecutive_exceptions = 0
+        self._working_since = time.monotonic()
+
+        if self._context.ramp_up_secs is not None:
+            self._ramp_up_until = self._working_since + self._context.ramp_up_secs
+
+        if self._context.window is not None:
+            # failures recorded before the breaker has recovered don't count anymore
+            self._context.window.reset()
+
+        return self
 
     @property
     def consecutive_exceptions(self) -> int:
         return self._consecutive_exceptions
 
+    @property
+    def admitted_share(self) -> float:
+        """
+        Share of executions the breaker lets through (from 0 to 1)
+        """
+        return self._get_admitted_share(time.monotonic())
+
+    def _get_admitted_share(self, now: float) -> float:
+        ramp_up_secs = self._context.ramp_up_secs
+
+        if ramp_up_secs is None or now >= self._ramp_up_until:
+            return 1.0
+
+        progress = (now - self._working_since) / ramp_up_secs
+
+        if self._context.ramp_up == "exponential":
+            # the share grows by the same factor each moment, so it stays low longer and speeds up in the end
+            return float(RAMP_UP_MIN_SHARE ** (1 - progress))
+
+        return RAMP_UP_MIN_SHARE + (1 - RAMP_UP_MIN_SHARE) * progress
+
     def _reset_exceptions_count(self) -> None:
         self._consecutive_exceptions = 0
 
-    async def on_success(self) -> "BreakerState":
+    async def before_execution(self) -> "BreakerState":
+        if not self._ramp_up_until:
+            return self
+
+        now = time.monotonic()
+
+        if now >= self._ramp_up_until:
+            self._ramp_up_until = 0.0
+            return self
+
+        if random.random() >= self._get_admitted_share(now):
+            raise BreakerFailing(self.REJECTION_MESSAGE)
+
+        return self
+
+    async def on_success(self, slow: bool = False) -> "BreakerState":
         """
-        Reset the failure counter
+        Reset the failure counter. Slow calls are failures to the consecutive breaker
+        and are counted separately by windows of recent calls
         """
-        self._reset_exceptions_count()
-        await self._context.event_dispatcher.on_success(self._context, self)
+        if slow and self._context.window is None:
+            return await self.on_exception()
+
+        if not slow:
+            self._reset_exceptions_count()
+            await self._context.event_dispatcher.on_success(self._context, self)
+
+        if self._context.window is not None and self._context.window.record(failed=False, slow=slow):
+            return await self._fail()
 
         return self
 
     async def on_exception(self) -> "BreakerState":
         """
         Transit the breaker to the failing state if number of consecutive errors is beyond the threshold
+        (or the failure rate is beyond the threshold when the breaker watches a window of recent calls)
         """
         self._consecutive_exceptions += 1
 
-        if self._consecutive_exceptions >= self._context.failure_threshold:
-            failing_state = FailingState(self._context)
-            await self._context.event_dispatcher.on_failing(self._context, self, failing_state)
+        if self._context.window is not None:
+            if self._context.window.record(failed=True):
+                return await self._fail()
 
-            return failing_state
+            return self
+
+        if self._consecutive_exceptions >= self._context.failure_threshold:
+            return await self._fail()
 
         return self
 
+    async def _fail(self) -> "BreakerState":
+        recovery_backoff = self._context.recovery_backoff
+
+        if recovery_backoff is not None and time.monotonic() - self._working_since >= self._context.recovery_reset_secs:
+            # the system has been stable for a while, so this is a new outage
+            iter(recovery_backoff)
+
+        failing_state = self._states.failing.enter()
+        await self._context.event_dispatcher.on_failing(self._context, self, failing_state)
+
+        return failing_state
+
 
 class FailingState(BreakerState):
     """
@@ -82,59 +195,82 @@ class FailingState(BreakerState):
     """
 
     NAME = "failing"
+    REJECTION_MESSAGE = "Circuit Breaker is in the failing state"
 
     __slots__ = (
+        "_recovery_time_secs",
         "_failing_since",
         "_failing_until",
     )
 
-    def __init__(self, context: BreakerContext) -> None:
-        super().__init__(context)
+    def __init__(self, context: BreakerContext, states: "BreakerStates") -> None:
+        super().__init__(context, states)
+
+        self._recovery_time_secs: DelayT = context.recovery_time_secs
+
+        # deadlines are on the time.monotonic() clock, so they are immune to wall clock adjustments
+        self._failing_since = 0.0
+        self._failing_until = 0.0
+
+    def enter(self, recovery_time_secs: DelayT | None = None) -> "FailingState":
+        if recovery_time_secs is None:
+            recovery_backoff = self._context.recovery_backoff
+
+            # each failed recovery attempt takes the next delay from the backoff
+            recovery_time_secs = (
+                next(recovery_backoff) if recovery_backoff is not None else self._context.recovery_time_secs
+            )
 
-        self._failing_since = self._get_failing_since()
-        self._failing_until = self._get_failing_until(self._failing_since)
+        self._recovery_time_secs = recovery_time_secs
 
-    @staticmethod
-    def _get_failing_since() -> datetime:
-        return datetime.now(timezone.utc)
+        self._failing_since = time.monotonic()
+        self._failing_until = self._failing_since + self._recovery_time_secs
 
-    def _get_failing_until(self, since: datetime) -> datetime:
-        return since + timedelta(seconds=self._context.recovery_time_secs)
+        return self
+
+    @property
+    def recovery_time_secs(self) -> DelayT:
+        """
+        Time the breaker gives the system to recover before moving into the recovering state
+        """
+        return self._recovery_time_secs
 
     @property
     def until(self) -> datetime:
         """
         The breaker is going to fail until
         """
-        return self._failing_until
+        return datetime.now(timezone.utc) + timedelta(seconds=self._failing_until - time.monotonic())
 
     @property
     def remain(self) -> timedelta | None:
         """
         Remaining time the breaker is going to fail
         """
-        now = datetime.now(timezone.utc)
+        remaining_secs = self._failing_until - time.monotonic()
 
-        if now >= self.until:
+        if remaining_secs <= 0:
             return None
 
-        return self.until - now
+        return timedelta(seconds=remaining_secs)
 
     @property
     def since(self) -> datetime:
         """
         The breaker is failing since
         """
-        return self._failing_since
+        return datetime.now(timezone.utc) - timedelta(seconds=time.monotonic() - self._failing_since)
 
     async def before_execution(self) -> "BreakerState":
-        if self.remain:
-            raise BreakerFailing("Circuit Breaker is in the failing state")
+        if time.monotonic() < self._failing_until or self._context.health_check is not None:
+            # breakers with health checks recover in the background only
+            raise BreakerFailing(self.REJECTION_MESSAGE)
 
-        recovering_state = RecoveringState(self._context)
+        recovering_state = self._states.recovering.enter()
         await self._context.event_dispatcher.on_recovering(self._context, self, recovering_state)
 
-        return recovering_state
+        # the execution that has moved the breaker is the first trial one
+        return await recovering_state.before_execution()
 
 
 class RecoveringState(BreakerState):
@@ -143,28 +279,69 @@ class RecoveringState(BreakerState):
     If the code execution has been successful for a given number of time, we transmit to the working state.
     Otherwise, the delay was not enough, and we need to give another round of waiting.
 
+    The number of trial executions in flight can be limited, so the backlog doesn't hit the barely recovered system.
+    Executions beyond the limit are rejected right away.
+
     Also known as the "half-open" state.
     """
 
     NAME = "recovering"
+    REJECTION_MESSAGE = "Circuit Breaker is recovering and has enough trial executions in flight"
 
-    __slots__ = ("_consecutive_successes",)
+    __slots__ = ("_consecutive_successes", "_probes")
 
-    def __init__(self, context: BreakerContext) -> None:
-        super().__init__(context)
+    def __init__(self, context: BreakerContext, states: "BreakerStates") -> None:
+        super().__init__(context, states)
+
+        if context.recovery_max_probes is not None and context.recovery_max_probes <= 0:
+            raise ValueError(f'recovery_max_probes should be greater than zero ("{context.recovery_max_probes}" given)')
 
         self._consecutive_successes: int = 0
+        self._probes: int = 0
+
+    def enter(self) -> "RecoveringState":
+        self._consecutive_successes = 0
+        self._probes = 0
+
+        return self
 
     @property
     def consecutive_successes(self) -> int:
         return self._consecutive_successes
 
-    async def on_success(self) -> "BreakerState":
+    @property
+    def probes(self) -> int:
+        """
+        Number of trial executions in flight
+        """
+        return self._probes
+
+    async def before_execution(self) -> "BreakerState":
+        max_probes = self._context.recovery_max_probes
+
+        if max_probes is not None and self._probes >= max_probes:
+            raise BreakerFailing(self.REJECTION_MESSAGE)
+
+        self._probes += 1
+
+        return self
+
+    async def on_discard(self) -> "BreakerState":
+        self._probes -= 1
+
+        return self
+
+    async def on_success(self, slow: bool = False) -> "BreakerState":
+        if slow:
+            # the upstream is not healthy enough yet
+            return await self.on_exception()
+
+        self._probes -= 1
         self._consecutive_successes += 1
         await self._context.event_dispatcher.on_success(self._context, self)
 
         if self.consecutive_successes >= self._context.recovery_threshold:
-            working_state = WorkingState(self._context)
+            working_state = self._states.working.enter()
             await self._context.event_dispatcher.on_working(self._context, self, working_state)
 
             return working_state
@@ -172,7 +349,7 @@ class RecoveringState(BreakerState):
         return self
 
     async def on_exception(self) -> "BreakerState":
-        failing_state = FailingState(self._context)
+        failing_state = self._states.failing.enter()
         await self._context.event_dispatcher.on_failing(self._context, self, failing_state)
 
         return failing_state
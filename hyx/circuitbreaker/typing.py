@@ -1 +1,13 @@
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Any, Literal
+
 DelayT = float | int
+
+# checks the health of the system the breaker protects
+ProbeT = Callable[[], Awaitable[Any]]
+
+# delays of consecutive failing periods (e.g. backoffs from hyx.retry.backoffs)
+BackoffT = Iterator[float]
+
+# how the share of admitted executions grows after the breaker has recovered
+RampUpT = Literal["linear", "exponential"]
@@ -0,0 +1,307 @@
+import math
+import time
+from array import array
+
+
+class OutcomeWindow:
+    """
+    Outcomes of the recent calls that tell whether the breaker should move into the failing state.
+    The breaker fails when at least *minimum_calls* calls are in the window
+    and the share of failed calls among them reaches *failure_rate_threshold*
+    or the share of slow calls reaches *slow_call_rate_threshold*
+    """
+
+    __slots__ = ("_failure_rate_threshold", "_slow_call_rate_threshold", "_minimum_calls")
+
+    def __init__(
+        self,
+        failure_rate_threshold: float,
+        minimum_calls: int,
+        slow_call_rate_threshold: float = 1.0,
+    ) -> None:
+        if not 0 < failure_rate_threshold <= 1:
+            raise ValueError(f'failure_rate_threshold should be in (0, 1] range ("{failure_rate_threshold}" given)')
+
+        if not 0 < slow_call_rate_threshold <= 1:
+            raise ValueError(f'slow_call_rate_threshold should be in (0, 1] range ("{slow_call_rate_threshold}" given)')
+
+        if minimum_calls <= 0:
+            raise ValueError(f'minimum_calls should be greater than zero ("{minimum_calls}" given)')
+
+        self._failure_rate_threshold = failure_rate_threshold
+        self._slow_call_rate_threshold = slow_call_rate_threshold
+        self._minimum_calls = minimum_calls
+
+    @property
+    def failure_rate_threshold(self) -> float:
+        return self._failure_rate_threshold
+
+    @property
+    def slow_call_rate_threshold(self) -> float:
+        return self._slow_call_rate_threshold
+
+    @property
+    def minimum_calls(self) -> int:
+        return self._minimum_calls
+
+    @property
+    def calls(self) -> int:
+        """
+        Number of calls in the window
+        """
+        raise NotImplementedError
+
+    @property
+    def failures(self) -> int:
+        """
+        Number of failed calls in the window
+        """
+        raise NotImplementedError
+
+    @property
+    def slow_calls(self) -> int:
+        """
+        Number of successful calls in the window that have been slow
+        """
+        raise NotImplementedError
+
+    @property
+    def failure_rate(self) -> float:
+        calls = self.calls
+
+        return self.failures / calls if calls else 0.0
+
+    @property
+    def slow_call_rate(self) -> float:
+        calls = self.calls
+
+        return self.slow_calls / calls if calls else 0.0
+
+    def record(self, failed: bool, slow: bool = False) -> bool:
+        """
+        Record the call outcome and tell whether the window has reached the failure or slow call rate threshold
+        """
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        """
+        Forget all recorded calls
+        """
+        raise NotImplementedError
+
+    def _exceeds_threshold(self, calls: int, failures: int, slow_calls: int) -> bool:
+        if calls < self._minimum_calls:
+            return False
+
+        return failures >= self._failure_rate_threshold * calls or slow_calls >= self._slow_call_rate_threshold * calls
+
+
+class TimeWindow(OutcomeWindow):
+    """
+    Time-based Outcome Window
+    Count calls, failures and slow calls over the last *window_secs* seconds in a ring of fixed time buckets.
+    Buckets that fall out of the window are cleared lazily as time goes on,
+    and running totals are kept next to them, so recording a call is O(1) and doesn't allocate
+    """
+
+    __slots__ = (
+        "_bucket_secs",
+        "_bucket_calls",
+        "_bucket_failures",
+        "_bucket_slow_calls",
+        "_calls",
+        "_failures",
+        "_slow_calls",
+        "_head_bucket",
+    )
+
+    def __init__(
+        self,
+        window_secs: float,
+        failure_rate_threshold: float,
+        minimum_calls: int,
+        bucket_secs: float = 1.0,
+        slow_call_rate_threshold: float = 1.0,
+    ) -> None:
+        super().__init__(failure_rate_threshold, minimum_calls, slow_call_rate_threshold)
+
+        if bucket_secs <= 0 or window_secs < bucket_secs:
+            raise ValueError(f'bucket_secs should be in (0, window_secs] range ("{bucket_secs}" given)')
+
+        self._bucket_secs = bucket_secs
+
+        buckets = math.ceil(window_secs / bucket_secs)
+
+        self._bucket_calls = array("q", [0]) * buckets
+        self._bucket_failures = array("q", [0]) * buckets
+        self._bucket_slow_calls = array("q", [0]) * buckets
+
+        self._calls = 0
+        self._failures = 0
+        self._slow_calls = 0
+
+        # the absolute number of the most recent bucket on the time.monotonic() clock
+        self._head_bucket = self._get_bucket(time.monotonic())
+
+    @property
+    def calls(self) -> int:
+        self._advance(self._get_bucket(time.monotonic()))
+        return self._calls
+
+    @property
+    def failures(self) -> int:
+        self._advance(self._get_bucket(time.monotonic()))
+        return self._failures
+
+    @property
+    def slow_calls(self) -> int:
+        self._advance(self._get_bucket(time.monotonic()))
+        return self._slow_calls
+
+    def record(self, failed: bool, slow: bool = False) -> bool:
+        self._advance(self._get_bucket(time.monotonic()))
+
+        idx = self._head_bucket % len(self._bucket_calls)
+
+        self._bucket_calls[idx] += 1
+        self._calls += 1
+
+        if failed:
+            self._bucket_failures[idx] += 1
+            self._failures += 1
+
+        if slow:
+            self._bucket_slow_calls[idx] += 1
+            self._slow_calls += 1
+
+        return self._exceeds_threshold(self._calls, self._failures, self._slow_calls)
+
+    def reset(self) -> None:
+        for idx in range(len(self._bucket_calls)):
+            self._bucket_calls[idx] = 0
+            self._bucket_failures[idx] = 0
+            self._bucket_slow_calls[idx] = 0
+
+        self._calls = 0
+        self._failures = 0
+        self._slow_calls = 0
+        self._head_bucket = self._get_bucket(time.monotonic())
+
+    def _get_bucket(self, now: float) -> int:
+        return int(now // self._bucket_secs)
+
+    def _advance(self, bucket: int) -> None:
+        """
+        Clear buckets that have left the window since the last call
+        """
+        if bucket <= self._head_bucket:
+            return
+
+        buckets = len(self._bucket_calls)
+        last_expired_bucket = min(bucket, self._head_bucket + buckets)
+
+        for expired_bucket in range(self._head_bucket + 1, last_expired_bucket + 1):
+            idx = expired_bucket % buckets
+
+            self._calls -= self._bucket_calls[idx]
+            self._failures -= self._bucket_failures[idx]
+            self._slow_calls -= self._bucket_slow_calls[idx]
+
+            self._bucket_calls[idx] = 0
+            self._bucket_failures[idx] = 0
+            self._bucket_slow_calls[idx] = 0
+
+        self._head_bucket = bucket
+
+
+class CountWindow(OutcomeWindow):
+    """
+    Count-based Outcome Window
+    Keep outcomes of the last *size* calls as bits of ring buffers (one bit per call is set for failures
+    and another one for slow calls) next to running counts, so the window takes *2 x size* bits
+    and recording a call is O(1)
+    """
+
+    __slots__ = ("_size", "_failed_outcomes", "_slow_outcomes", "_next_idx", "_calls", "_failures", "_slow_calls")
+
+    def __init__(
+        self,
+        size: int,
+        failure_rate_threshold: float,
+        minimum_calls: int | None = None,
+        slow_call_rate_threshold: float = 1.0,
+    ) -> None:
+        super().__init__(
+            failure_rate_threshold,
+            minimum_calls if minimum_calls is not None else size,
+            slow_call_rate_threshold,
+        )
+
+        if size < self._minimum_calls:
+            raise ValueError(f'size should not be less than minimum_calls ("{size}" given)')
+
+        self._size = size
+        self._failed_outcomes = bytearray((size + 7) // 8)
+        self._slow_outcomes = bytearray((size + 7) // 8)
+
+        self._next_idx = 0
+        self._calls = 0
+        self._failures = 0
+        self._slow_calls = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    @property
+    def failures(self) -> int:
+        return self._failures
+
+    @property
+    def slow_calls(self) -> int:
+        return self._slow_calls
+
+    def record(self, failed: bool, slow: bool = False) -> bool:
+        idx = self._next_idx
+        byte_idx, mask = idx >> 3, 1 << (idx & 7)
+
+        if self._calls < self._size:
+            self._calls += 1
+        else:
+            # the oldest outcome is overwritten once the ring is full
+            self._failures -= self._pop_outcome(self._failed_outcomes, byte_idx, mask)
+            self._slow_calls -= self._pop_outcome(self._slow_outcomes, byte_idx, mask)
+
+        if failed:
+            self._failed_outcomes[byte_idx] |= mask
+            self._failures += 1
+
+        if slow:
+            self._slow_outcomes[byte_idx] |= mask
+            self._slow_calls += 1
+
+        self._next_idx = idx + 1 if idx + 1 < self._size else 0
+
+        return self._exceeds_threshold(self._calls, self._failures, self._slow_calls)
+
+    def reset(self) -> None:
+        self._failed_outcomes[:] = bytes(len(self._failed_outcomes))
+        self._slow_outcomes[:] = bytes(len(self._slow_outcomes))
+
+        self._next_idx = 0
+        self._calls = 0
+        self._failures = 0
+        self._slow_calls = 0
+
+    @staticmethod
+    def _pop_outcome(outcomes: bytearray, byte_idx: int, mask: int) -> int:
+        if not outcomes[byte_idx] & mask:
+            return 0
+
+        outcomes[byte_idx] &= ~mask & 0xFF
+
+        return 1
@@ -1,10 +1,91 @@
-from hyx.ratelimit.api import ratelimiter, tokenbucket
-from hyx.ratelimit.buckets import TokenBucket
-from hyx.ratelimit.managers import TokenBucketLimiter
+from hyx.ratelimit.adaptive import AdaptiveThrottle
+from hyx.ratelimit.api import (
+    adaptive_throttle,
+    composite_tokenbucket,
+    distributed_tokenbucket,
+    dynamic_ratelimiter,
+    gcra,
+    keyed_gcra,
+    leakytokenbucket,
+    persistent_quota,
+    priority_tokenbucket,
+    ratelimiter,
+    shared_gcra,
+    sliding_window_counter,
+    sliding_window_log,
+    tokenbucket,
+    warmup_tokenbucket,
+)
+from hyx.ratelimit.buckets import TokenBucket, WarmUpTokenBucket
+from hyx.ratelimit.distributed import DistributedTokenBucket
+from hyx.ratelimit.dynamic import Quota, QuotaPacer
+from hyx.ratelimit.gcra import GCRA, KeyedGCRA, SharedGCRA
+from hyx.ratelimit.listeners import WarmUpBreakerListener
+from hyx.ratelimit.managers import (
+    AdaptiveThrottleLimiter,
+    CompositeTokenBucketLimiter,
+    DistributedTokenBucketLimiter,
+    DynamicRateLimiter,
+    GCRALimiter,
+    KeyedGCRALimiter,
+    LeakyTokenBucketLimiter,
+    PersistentQuotaLimiter,
+    PriorityTokenBucketLimiter,
+    SharedGCRALimiter,
+    SlidingWindowCounterLimiter,
+    SlidingWindowLogLimiter,
+    TokenBucketLimiter,
+    WarmUpTokenBucketLimiter,
+)
+from hyx.ratelimit.quotas import PersistentQuota
+from hyx.ratelimit.resp import RESPClient
+from hyx.ratelimit.streams import BandwidthThrottle, ThrottledReader
+from hyx.ratelimit.windows import SlidingWindowCounter, SlidingWindowLog
 
 __all__ = (
     "ratelimiter",
     "tokenbucket",
+    "leakytokenbucket",
+    "priority_tokenbucket",
+    "warmup_tokenbucket",
+    "composite_tokenbucket",
+    "adaptive_throttle",
+    "dynamic_ratelimiter",
+    "sliding_window_log",
+    "sliding_window_counter",
+    "gcra",
+    "shared_gcra",
+    "keyed_gcra",
+    "distributed_tokenbucket",
+    "persistent_quota",
     "TokenBucketLimiter",
+    "LeakyTokenBucketLimiter",
+    "PriorityTokenBucketLimiter",
+    "WarmUpTokenBucketLimiter",
+    "CompositeTokenBucketLimiter",
+    "AdaptiveThrottleLimiter",
+    "DynamicRateLimiter",
+    "SlidingWindowLogLimiter",
+    "SlidingWindowCounterLimiter",
+    "GCRALimiter",
+    "SharedGCRALimiter",
+    "KeyedGCRALimiter",
+    "DistributedTokenBucketLimiter",
+    "PersistentQuotaLimiter",
     "TokenBucket",
+    "WarmUpTokenBucket",
+    "AdaptiveThrottle",
+    "QuotaPacer",
+    "Quota",
+    "SlidingWindowLog",
+    "SlidingWindowCounter",
+    "GCRA",
+    "SharedGCRA",
+    "KeyedGCRA",
+    "DistributedTokenBucket",
+    "PersistentQuota",
+    "RESPClient",
+    "BandwidthThrottle",
+    "ThrottledReader",
+    "WarmUpBreakerListener",
 )
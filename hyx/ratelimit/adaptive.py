@@ -0,0 +1,105 @@
+import time
+from array import array
+
+
+class AdaptiveThrottle:
+    """
+    Client-side Adaptive Throttling Logic
+    Count requests and accepts (requests that the upstream has handled) over a rolling window.
+    While the upstream accepts requests, nothing is throttled. Once it starts rejecting them (e.g. being overloaded),
+    new requests are rejected locally with a probability that grows as the accept ratio drops:
+    `max(0, (requests - k * accepts) / (requests + 1))`
+
+    **Reference:**
+
+    * [Google SRE Book: Handling Overload](https://sre.google/sre-book/handling-overload/#eq2101)
+    """
+
+    __slots__ = (
+        "_k",
+        "_bucket_secs",
+        "_requests",
+        "_accepts",
+        "_total_requests",
+        "_total_accepts",
+        "_current_idx",
+        "_current_started_at",
+    )
+
+    def __init__(self, k: float = 2.0, window_secs: float = 120.0, window_buckets: int = 12) -> None:
+        if k <= 0:
+            raise ValueError(f'k should be greater than zero ("{k}" given)')
+
+        if window_buckets <= 0:
+            raise ValueError(f'window_buckets should be greater than zero ("{window_buckets}" given)')
+
+        self._k = k
+        self._bucket_secs = window_secs / window_buckets
+
+        # the window is split into buckets, so old counts leave it in bucket-sized steps in O(1)
+        self._requests = array("q", [0]) * window_buckets
+        self._accepts = array("q", [0]) * window_buckets
+
+        self._total_requests = 0
+        self._total_accepts = 0
+
+        self._current_idx = 0
+        self._current_started_at = time.monotonic()
+
+    @property
+    def requests(self) -> int:
+        """
+        Number of requests within the window
+        """
+        self._slide(time.monotonic())
+        return self._total_requests
+
+    @property
+    def accepts(self) -> int:
+        """
+        Number of requests the upstream has accepted within the window
+        """
+        self._slide(time.monotonic())
+        return self._total_accepts
+
+    @property
+    def rejection_probability(self) -> float:
+        """
+        Probability that a new request is rejected locally
+        """
+        self._slide(time.monotonic())
+
+        requests = self._total_requests
+
+        return max(0.0, (requests - self._k * self._total_accepts) / (requests + 1))
+
+    def record_request(self) -> None:
+        self._slide(time.monotonic())
+
+        self._requests[self._current_idx] += 1
+        self._total_requests += 1
+
+    def record_accept(self) -> None:
+        self._slide(time.monotonic())
+
+        self._accepts[self._current_idx] += 1
+        self._total_accepts += 1
+
+    def _slide(self, now: float) -> None:
+        elapsed_buckets = int((now - self._current_started_at) // self._bucket_secs)
+
+        if elapsed_buckets <= 0:
+            return
+
+        num_buckets = len(self._requests)
+
+        for _ in range(min(elapsed_buckets, num_buckets)):
+            self._current_idx = (self._current_idx + 1) % num_buckets
+
+            self._total_requests -= self._requests[self._current_idx]
+            self._total_accepts -= self._accepts[self._current_idx]
+
+            self._requests[self._current_idx] = 0
+            self._accepts[self._current_idx] = 0
+
+        self._current_started_at += elapsed_buckets * self._bucket_secs
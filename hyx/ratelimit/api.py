@@ -1,20 +1,92 @@
 import functools
+from collections.abc import AsyncIterator, Mapping, Sequence
+from contextlib import asynccontextmanager
 from types import TracebackType
 from typing import Any, cast
 
-from hyx.ratelimit.managers import RateLimiter, TokenBucketLimiter
-from hyx.typing import FuncT
+from hyx.ratelimit.dynamic import Quota
+from hyx.ratelimit.managers import (
+    AdaptiveThrottleLimiter,
+    CompositeTokenBucketLimiter,
+    DistributedTokenBucketLimiter,
+    DynamicRateLimiter,
+    GCRALimiter,
+    KeyedGCRALimiter,
+    LeakyTokenBucketLimiter,
+    PersistentQuotaLimiter,
+    PriorityTokenBucketLimiter,
+    RateLimiter,
+    SharedGCRALimiter,
+    SlidingWindowCounterLimiter,
+    SlidingWindowLogLimiter,
+    TokenBucketLimiter,
+    WarmUpTokenBucketLimiter,
+    WeightedRateLimiter,
+)
+from hyx.ratelimit.typing import (
+    CostT,
+    KeyFuncT,
+    LimitT,
+    PeriodT,
+    PriorityFuncT,
+    PriorityT,
+    QuotaFuncT,
+    ResultCostFuncT,
+    ScriptClientT,
+)
+from hyx.typing import ExceptionsT, FuncT
+
+
+def _get_cost(cost: CostT, *args: Any, **kwargs: Any) -> float:
+    if callable(cost):
+        return cost(*args, **kwargs)
+
+    return cost
 
 
 class ratelimiter:
-    __slots__ = ("_limiter",)
+    """
+    Apply a rate limiter as a decorator or a context manager.
+
+    **Parameters**
+
+    * **limiter** *(RateLimiter)* - The rate limiter to apply
+    * **cost** *(float | Callable)* - How many tokens each execution costs (e.g. rows, bytes or model tokens).
+        Can be a function that calculates the cost from arguments of the decorated function.
+        Costs other than one are supported by weighted rate limiters only (e.g. TokenBucketLimiter)
+    """
+
+    __slots__ = ("_limiter", "_cost")
+
+    def __init__(self, limiter: RateLimiter, cost: CostT = 1) -> None:
+        if (callable(cost) or cost != 1) and not isinstance(limiter, WeightedRateLimiter):
+            raise ValueError(f"{type(limiter).__name__} doesn't support execution costs")
 
-    def __init__(self, limiter: RateLimiter) -> None:
         self._limiter = limiter
+        self._cost = cost
+
+    async def _acquire(self, tokens: float) -> None:
+        if isinstance(self._limiter, WeightedRateLimiter):
+            await self._limiter.acquire(tokens)
+            return
+
+        if tokens != 1:
+            raise ValueError(f"{type(self._limiter).__name__} doesn't support execution costs")
 
-    async def __aenter__(self) -> "ratelimiter":
         await self._limiter.acquire()
 
+    @asynccontextmanager
+    async def weighted(self, tokens: float) -> AsyncIterator[None]:
+        """
+        Apply ratelimiter as a context manager with the given execution cost instead of the default one
+        """
+        await self._acquire(tokens)
+
+        yield
+
+    async def __aenter__(self) -> "ratelimiter":
+        await self._acquire(_get_cost(self._cost))
+
         return self
 
     async def __aexit__(
@@ -32,7 +104,7 @@ class ratelimiter:
 
         @functools.wraps(func)
         async def _wrapper(*args: Any, **kwargs: Any) -> Any:
-            await self._limiter.acquire()
+            await self._acquire(_get_cost(self._cost, *args, **kwargs))
 
             return await func(*args, **kwargs)
 
@@ -54,18 +126,297 @@ class tokenbucket:
         that are permitted to happen during bursts.
         The burst is when no executions have happened for a long time, and then you are receiving a
         bunch of them at the same time. Equal to *max_executions* by default.
+    * **timeout_secs** *(None | float)* - How long executions can wait for the next token when the bucket is empty.
+        Executions are rejected right away by default. Pass None to wait for as long as needed.
+    * **cost** *(float | Callable)* - How many tokens each execution costs (e.g. rows, bytes or model tokens).
+        Can be a function that calculates the cost from arguments of the decorated function.
+        The cost cannot exceed the bucket size
+    * **actual_cost** *(None | Callable)* - A function that gets the actual cost of the execution from the result
+        of the decorated function (e.g. the number of tokens an LLM has used).
+        If given, executions are admitted against their estimated *cost* and the bucket is corrected afterwards.
+        The balance can go negative, in which case the bucket needs proportionally longer to refill
     """
 
-    __slots__ = ("_limiter",)
+    __slots__ = ("_limiter", "_timeout_secs", "_cost", "_actual_cost")
 
-    def __init__(self, max_executions: float, per_time_secs: float, bucket_size: float | None = None) -> None:
+    def __init__(
+        self,
+        max_executions: float,
+        per_time_secs: float,
+        bucket_size: float | None = None,
+        timeout_secs: float | None = 0,
+        cost: CostT = 1,
+        actual_cost: ResultCostFuncT | None = None,
+    ) -> None:
         self._limiter = TokenBucketLimiter(
             max_executions=max_executions,
             per_time_secs=per_time_secs,
             bucket_size=bucket_size,
         )
+        self._timeout_secs = timeout_secs
+        self._cost = cost
+        self._actual_cost = actual_cost
+
+    def adjust(self, tokens: float) -> None:
+        """
+        Debit (positive values) or refund (negative values) the difference between the actual and the estimated cost
+        of an execution once it's known
+        """
+        self._limiter.adjust(tokens)
+
+    @asynccontextmanager
+    async def weighted(self, tokens: float) -> AsyncIterator[None]:
+        """
+        Apply ratelimiter as a context manager with the given execution cost instead of the default one
+        """
+        await self._limiter.acquire(tokens, self._timeout_secs)
+
+        yield
 
     async def __aenter__(self) -> "tokenbucket":
+        await self._limiter.acquire(_get_cost(self._cost), self._timeout_secs)
+
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> bool | None:
+        return None
+
+    def __call__(self, func: FuncT) -> FuncT:
+        """
+        Apply ratelimiter as a decorator
+        """
+
+        @functools.wraps(func)
+        async def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            estimated_cost = _get_cost(self._cost, *args, **kwargs)
+            await self._limiter.acquire(estimated_cost, self._timeout_secs)
+
+            result = await func(*args, **kwargs)
+
+            if self._actual_cost is not None:
+                self._limiter.adjust(self._actual_cost(result) - estimated_cost)
+
+            return result
+
+        _wrapper._original = func  # type: ignore[attr-defined]
+        _wrapper._manager = self._limiter  # type: ignore[attr-defined]
+
+        return cast(FuncT, _wrapper)
+
+
+class priority_tokenbucket:
+    """
+    Rate Limiting based on the Token Bucket algorithm with priority classes.
+
+    All executions share one token bucket, but each priority class keeps a share of the bucket reserved
+    for more important classes. When tokens run low, less important executions (e.g. background batch jobs)
+    are rejected first, so they cannot use up the whole budget of the user-facing ones.
+
+    **Parameters**
+
+    * **max_executions** *(float)* - How many executions are permitted?
+    * **per_time_secs** *(float)* - Per what time span? (in seconds)
+    * **bucket_size** *(None | float)* - The token bucket size. Equal to *max_executions* by default.
+    * **priority** *(str | Callable)* - The priority class of executions.
+        Can be a function that gets the priority from arguments of the decorated function
+    * **reserves** *(None | Mapping[str, float])* - Shares of the bucket (from 0 to 1) each priority class cannot use
+        (rounded down to whole tokens).
+        By default, `critical` executions can use the whole bucket, `default` ones can use 90% of it,
+        and `sheddable` ones can use half of it.
+    * **cost** *(float | Callable)* - How many tokens each execution costs.
+        Can be a function that calculates the cost from arguments of the decorated function
+    """
+
+    __slots__ = ("_limiter", "_priority", "_cost")
+
+    def __init__(
+        self,
+        max_executions: float,
+        per_time_secs: float,
+        bucket_size: float | None = None,
+        priority: PriorityT | PriorityFuncT = "default",
+        reserves: Mapping[PriorityT, float] | None = None,
+        cost: CostT = 1,
+    ) -> None:
+        self._limiter = PriorityTokenBucketLimiter(
+            max_executions=max_executions,
+            per_time_secs=per_time_secs,
+            bucket_size=bucket_size,
+            reserves=reserves,
+        )
+        self._priority = priority
+        self._cost = cost
+
+    def _get_priority(self, *args: Any, **kwargs: Any) -> PriorityT:
+        if callable(self._priority):
+            return self._priority(*args, **kwargs)
+
+        return self._priority
+
+    @asynccontextmanager
+    async def prioritized(self, priority: PriorityT, tokens: float | None = None) -> AsyncIterator[None]:
+        """
+        Apply ratelimiter as a context manager with the given priority class instead of the default one
+        """
+        await self._limiter.acquire(tokens if tokens is not None else _get_cost(self._cost), priority)
+
+        yield
+
+    async def __aenter__(self) -> "priority_tokenbucket":
+        await self._limiter.acquire(_get_cost(self._cost), self._get_priority())
+
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> bool | None:
+        return None
+
+    def __call__(self, func: FuncT) -> FuncT:
+        """
+        Apply ratelimiter as a decorator
+        """
+
+        @functools.wraps(func)
+        async def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            await self._limiter.acquire(
+                _get_cost(self._cost, *args, **kwargs),
+                self._get_priority(*args, **kwargs),
+            )
+
+            return await func(*args, **kwargs)
+
+        _wrapper._original = func  # type: ignore[attr-defined]
+        _wrapper._manager = self._limiter  # type: ignore[attr-defined]
+
+        return cast(FuncT, _wrapper)
+
+
+class leakytokenbucket(ratelimiter):
+    """
+    Constant Rate Pacing based on the Leaky Bucket algorithm (as a queue).
+
+    Executions are queued and released one by one at a steady rate, so they never happen in bursts.
+    When the queue is full, new executions are rejected.
+
+    **Parameters**
+
+    * **max_executions** *(float)* - How many executions are permitted?
+    * **per_time_secs** *(float)* - Per what time span? (in seconds)
+    * **bucket_size** *(None | float)* - The max number of executions that can wait in the queue.
+        Equal to *max_executions* by default.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, max_executions: float, per_time_secs: float, bucket_size: float | None = None) -> None:
+        super().__init__(
+            LeakyTokenBucketLimiter(
+                max_executions=max_executions,
+                per_time_secs=per_time_secs,
+                bucket_size=bucket_size,
+            )
+        )
+
+
+class warmup_tokenbucket(ratelimiter):
+    """
+    Rate Limiting with a smooth warm-up for cold caches, connection pools and freshly recovered upstreams.
+
+    After idleness, the permitted rate ramps up from the cold rate to the stable one over the warm-up period
+    instead of permitting a full burst. Call `cool_down()` (or use `WarmUpBreakerListener`)
+    to warm up again after the protected system has restarted or recovered.
+
+    **Parameters**
+
+    * **max_executions** *(float)* - How many executions are permitted at the stable rate?
+    * **per_time_secs** *(float)* - Per what time span? (in seconds)
+    * **warmup_period_secs** *(float)* - How long it takes to ramp up from the cold rate to the stable one
+    * **cold_factor** *(float)* - How many times the cold rate is slower than the stable one
+    """
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        max_executions: float,
+        per_time_secs: float,
+        warmup_period_secs: float,
+        cold_factor: float = 3.0,
+    ) -> None:
+        super().__init__(
+            WarmUpTokenBucketLimiter(
+                max_executions=max_executions,
+                per_time_secs=per_time_secs,
+                warmup_period_secs=warmup_period_secs,
+                cold_factor=cold_factor,
+            )
+        )
+
+    @property
+    def limiter(self) -> WarmUpTokenBucketLimiter:
+        return cast(WarmUpTokenBucketLimiter, self._limiter)
+
+    def cool_down(self) -> None:
+        """
+        Make the limiter warm up again
+        """
+        self.limiter.cool_down()
+
+
+class composite_tokenbucket(ratelimiter):
+    """
+    Enforce several rate limits at once (e.g. 10 per second, 500 per minute and 20k per day).
+
+    Unlike stacking several rate limiters, an execution consumes capacity only if all limits permit it,
+    so rejected executions don't leak capacity of the limits that have permitted them.
+
+    **Parameters**
+
+    * **limits** *(Sequence[tuple[float, float]])* - Pairs of max executions and the time span they are permitted per
+        (in seconds), e.g. `((10, 1), (500, 60), (20_000, 86_400))`. Each limit permits bursts of its max executions
+    * **cost** *(float | Callable)* - How many tokens each execution costs.
+        Can be a function that calculates the cost from arguments of the decorated function
+    """
+
+    __slots__ = ()
+
+    def __init__(self, limits: Sequence[LimitT], cost: CostT = 1) -> None:
+        super().__init__(CompositeTokenBucketLimiter(limits=limits), cost=cost)
+
+
+class adaptive_throttle:
+    """
+    Client-side adaptive throttling based on the accept ratio of the upstream (in the style of Google SRE).
+
+    Executions that raise any of the given exceptions are considered rejected by the upstream.
+    While the upstream accepts executions, nothing is throttled. Once it's overloaded, executions are rejected
+    locally with the probability of `max(0, (requests - k * accepts) / (requests + 1))`,
+    so the doomed traffic is shed smoothly without any static threshold.
+
+    **Parameters**
+
+    * **exceptions** *(type[Exception] | tuple[type[Exception], ...])* - Exceptions that mean
+        the upstream has rejected the execution (e.g. overload or timeout errors). Other exceptions count as accepts
+    * **k** *(float)* - How many requests are permitted per accepted one. Lower values throttle more aggressively
+    * **window_secs** *(float)* - The rolling window to count requests and accepts over (in seconds)
+    """
+
+    __slots__ = ("_limiter", "_exceptions")
+
+    def __init__(self, exceptions: ExceptionsT = Exception, k: float = 2.0, window_secs: float = 120.0) -> None:
+        self._limiter = AdaptiveThrottleLimiter(k=k, window_secs=window_secs)
+        self._exceptions = exceptions
+
+    async def __aenter__(self) -> "adaptive_throttle":
         await self._limiter.acquire()
 
         return self
@@ -76,6 +427,9 @@ class tokenbucket:
         exc_val: BaseException | None,
         exc_tb: TracebackType | None,
     ) -> bool | None:
+        if exc_val is None or not isinstance(exc_val, self._exceptions):
+            self._limiter.accept()
+
         return None
 
     def __call__(self, func: FuncT) -> FuncT:
@@ -87,6 +441,343 @@ class tokenbucket:
         async def _wrapper(*args: Any, **kwargs: Any) -> Any:
             await self._limiter.acquire()
 
+            try:
+                result = await func(*args, **kwargs)
+            except self._exceptions:
+                raise
+            except Exception:
+                self._limiter.accept()
+                raise
+
+            self._limiter.accept()
+
+            return result
+
+        _wrapper._original = func  # type: ignore[attr-defined]
+        _wrapper._manager = self._limiter  # type: ignore[attr-defined]
+
+        return cast(FuncT, _wrapper)
+
+
+class dynamic_ratelimiter:
+    """
+    Rate Limiting driven by the budget the upstream advertises in its responses
+    (e.g. X-RateLimit-Remaining and X-RateLimit-Reset headers).
+
+    Executions are spread evenly to use up the remaining budget exactly by the time it's reset,
+    so partner quotas are utilized fully and plan changes are picked up right away.
+    Until the upstream advertises its budget, executions are paced at the default rate.
+
+    **Parameters**
+
+    * **max_executions** *(float)* - How many executions are permitted by default?
+    * **per_time_secs** *(float)* - Per what time span? (in seconds)
+    * **quota** *(None | Callable)* - A function that extracts the advertised budget from the result
+        of the decorated function. It should return a `Quota` or None if the result doesn't have it.
+        Call `update()` to pass the budget manually (e.g. from a rejected response)
+    * **timeout_secs** *(None | float)* - How long executions can wait for their slot.
+        Executions wait for as long as needed by default
+    """
+
+    __slots__ = ("_limiter", "_quota", "_timeout_secs")
+
+    def __init__(
+        self,
+        max_executions: float,
+        per_time_secs: float,
+        quota: QuotaFuncT | None = None,
+        timeout_secs: float | None = None,
+    ) -> None:
+        self._limiter = DynamicRateLimiter(max_executions=max_executions, per_time_secs=per_time_secs)
+        self._quota = quota
+        self._timeout_secs = timeout_secs
+
+    def update(self, quota: Quota) -> None:
+        """
+        Pace the following executions according to the budget advertised by the upstream
+        """
+        self._limiter.update(quota)
+
+    async def __aenter__(self) -> "dynamic_ratelimiter":
+        await self._limiter.acquire(self._timeout_secs)
+
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> bool | None:
+        return None
+
+    def __call__(self, func: FuncT) -> FuncT:
+        """
+        Apply ratelimiter as a decorator
+        """
+
+        @functools.wraps(func)
+        async def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            await self._limiter.acquire(self._timeout_secs)
+
+            result = await func(*args, **kwargs)
+
+            if self._quota is not None and (quota := self._quota(result)) is not None:
+                self._limiter.update(quota)
+
+            return result
+
+        _wrapper._original = func  # type: ignore[attr-defined]
+        _wrapper._manager = self._limiter  # type: ignore[attr-defined]
+
+        return cast(FuncT, _wrapper)
+
+
+class sliding_window_log(ratelimiter):
+    """
+    Precise Rate Limiting based on the Sliding Window Log algorithm.
+
+    Permits at most *max_executions* during any time span of *per_time_secs*, so no bursts are possible
+    at the edges of time windows. Memory usage grows linearly with *max_executions*.
+
+    **Parameters**
+
+    * **max_executions** *(int)* - How many executions are permitted?
+    * **per_time_secs** *(float)* - Per what time span? (in seconds)
+    """
+
+    __slots__ = ()
+
+    def __init__(self, max_executions: int, per_time_secs: float) -> None:
+        super().__init__(SlidingWindowLogLimiter(max_executions=max_executions, per_time_secs=per_time_secs))
+
+
+class sliding_window_counter(ratelimiter):
+    """
+    Approximate Rate Limiting based on the Sliding Window Counter algorithm.
+
+    Estimates the number of executions during the last *per_time_secs* from counters of the current and
+    the previous fixed windows. Uses constant memory regardless of *max_executions*.
+
+    **Parameters**
+
+    * **max_executions** *(int)* - How many executions are permitted?
+    * **per_time_secs** *(float)* - Per what time span? (in seconds)
+    """
+
+    __slots__ = ()
+
+    def __init__(self, max_executions: int, per_time_secs: float) -> None:
+        super().__init__(SlidingWindowCounterLimiter(max_executions=max_executions, per_time_secs=per_time_secs))
+
+
+class gcra(ratelimiter):
+    """
+    Constant Rate Limiting based on the Generic Cell Rate Algorithm.
+
+    Permits the same executions as the token bucket, but keeps a single timestamp as its state
+    and knows exactly how long it takes until the next execution is permitted.
+
+    **Parameters**
+
+    * **max_executions** *(float)* - How many executions are permitted?
+    * **per_time_secs** *(float)* - Per what time span? (in seconds)
+    * **bucket_size** *(None | float)* - The burst size. Defines the max number of executions
+        that are permitted to happen at once. Equal to *max_executions* by default.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, max_executions: float, per_time_secs: float, bucket_size: float | None = None) -> None:
+        super().__init__(
+            GCRALimiter(
+                max_executions=max_executions,
+                per_time_secs=per_time_secs,
+                bucket_size=bucket_size,
+            )
+        )
+
+
+class shared_gcra(ratelimiter):
+    """
+    Host-wide Rate Limiting based on the Generic Cell Rate Algorithm.
+
+    The limiter state is kept in shared memory, so all processes on the host (e.g. gunicorn or uvicorn workers)
+    that use the same *name* share one rate limit. No network service is needed.
+
+    **Parameters**
+
+    * **name** *(str)* - The name of the shared limit on the host
+    * **max_executions** *(float)* - How many executions are permitted?
+    * **per_time_secs** *(float)* - Per what time span? (in seconds)
+    * **bucket_size** *(None | float)* - The burst size. Equal to *max_executions* by default.
+    """
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        name: str,
+        max_executions: float,
+        per_time_secs: float,
+        bucket_size: float | None = None,
+    ) -> None:
+        super().__init__(
+            SharedGCRALimiter(
+                name=name,
+                max_executions=max_executions,
+                per_time_secs=per_time_secs,
+                bucket_size=bucket_size,
+            )
+        )
+
+
+class keyed_gcra:
+    """
+    Per-key Rate Limiting based on the Generic Cell Rate Algorithm (e.g. per API key, IP, or tenant).
+
+    Every key gets its own limit, while the state of each key is a single timestamp,
+    so millions of keys can be tracked. Idle keys are forgotten once they are fully replenished.
+
+    **Parameters**
+
+    * **max_executions** *(float)* - How many executions are permitted per key?
+    * **per_time_secs** *(float)* - Per what time span? (in seconds)
+    * **key** *(Callable)* - Extracts the key from the decorated function arguments
+    * **bucket_size** *(None | float)* - The burst size per key. Equal to *max_executions* by default.
+    * **max_keys** *(None | int)* - The max number of keys to track.
+        When it's reached, keys that are the closest to full replenishment are forgotten. Unbounded by default.
+    """
+
+    __slots__ = ("_limiter", "_key")
+
+    def __init__(
+        self,
+        max_executions: float,
+        per_time_secs: float,
+        key: KeyFuncT,
+        bucket_size: float | None = None,
+        max_keys: int | None = None,
+    ) -> None:
+        self._limiter = KeyedGCRALimiter(
+            max_executions=max_executions,
+            per_time_secs=per_time_secs,
+            bucket_size=bucket_size,
+            max_keys=max_keys,
+        )
+        self._key = key
+
+    def __call__(self, func: FuncT) -> FuncT:
+        """
+        Apply keyed ratelimiter as a decorator
+        """
+
+        @functools.wraps(func)
+        async def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            await self._limiter.acquire(self._key(*args, **kwargs))
+
+            return await func(*args, **kwargs)
+
+        _wrapper._original = func  # type: ignore[attr-defined]
+        _wrapper._manager = self._limiter  # type: ignore[attr-defined]
+
+        return cast(FuncT, _wrapper)
+
+
+class distributed_tokenbucket(ratelimiter):
+    """
+    Distributed Rate Limiting based on the Token Bucket algorithm.
+
+    The bucket is stored in a Redis-protocol store (e.g. Redis, Valkey), so all processes
+    that use the same *key* share the limit regardless of how many of them are running.
+
+    **Parameters**
+
+    * **client** - Redis-protocol client that can run scripts (e.g. `RESPClient` or `redis.asyncio.Redis`)
+    * **key** *(str)* - The key of the shared bucket in the store
+    * **max_executions** *(float)* - How many executions are permitted?
+    * **per_time_secs** *(float)* - Per what time span? (in seconds)
+    * **bucket_size** *(None | float)* - The token bucket size. Equal to *max_executions* by default.
+    * **lease_size** *(int)* - How many tokens each process takes from the store at once and spends locally.
+        Larger leases save round trips to the store, but the limit becomes less precise
+        as up to *lease_size* tokens per process may stay unused. One token per round trip by default.
+    """
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        client: ScriptClientT,
+        key: str,
+        max_executions: float,
+        per_time_secs: float,
+        bucket_size: float | None = None,
+        lease_size: int = 1,
+    ) -> None:
+        super().__init__(
+            DistributedTokenBucketLimiter(
+                client=client,
+                key=key,
+                max_executions=max_executions,
+                per_time_secs=per_time_secs,
+                bucket_size=bucket_size,
+                lease_size=lease_size,
+            )
+        )
+
+
+class persistent_quota:
+    """
+    Per-key quotas over long windows (e.g. 1M executions per tenant per day) that survive process restarts.
+
+    The usage is counted in memory and checkpointed to a local SQLite database in the background,
+    so quota checks don't wait for the disk. Processes that share the database file share quotas
+    with a delay of up to one checkpoint interval.
+
+    **Parameters**
+
+    * **path** *(str)* - The SQLite database file to keep the usage in
+    * **limit** *(int)* - How many executions are permitted per key within a window?
+    * **key** *(Callable)* - Extracts the key from the decorated function arguments. Keys are stored as strings
+    * **period** *(str | int)* - The window length. One of "minute", "hour", "day", "month" (UTC calendar windows)
+        or a number of seconds.
+    * **checkpoint_interval_secs** *(float)* - How often the usage is persisted.
+        This much usage can be lost if the process crashes.
+    """
+
+    __slots__ = ("_limiter", "_key")
+
+    def __init__(
+        self,
+        path: str,
+        limit: int,
+        key: KeyFuncT,
+        period: PeriodT = "day",
+        checkpoint_interval_secs: float = 1.0,
+    ) -> None:
+        self._limiter = PersistentQuotaLimiter(
+            path=path,
+            limit=limit,
+            period=period,
+            checkpoint_interval_secs=checkpoint_interval_secs,
+        )
+        self._key = key
+
+    async def close(self) -> None:
+        """
+        Persist the remaining usage. Call it on shutdown
+        """
+        await self._limiter.close()
+
+    def __call__(self, func: FuncT) -> FuncT:
+        """
+        Apply persistent quota as a decorator
+        """
+
+        @functools.wraps(func)
+        async def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            await self._limiter.acquire(str(self._key(*args, **kwargs)))
+
             return await func(*args, **kwargs)
 
         _wrapper._original = func  # type: ignore[attr-defined]
@@ -1,83 +1,300 @@
-import asyncio
+import contextlib
+import math
+import threading
+import time
+from collections.abc import Sequence
+from fractions import Fraction
 
 from hyx.ratelimit.exceptions import EmptyBucket
 
+SECS_TO_NS = 1_000_000_000
+NS_TO_SECS = 1 / SECS_TO_NS
+
+# fractional rates are approximated by ratios with denominators up to this (e.g. 0.1 becomes 1/10)
+MAX_RATE_DENOMINATOR = 1_000_000
+
 
 class TokenBucket:
     """
     Token Bucket Logic
     Replenish tokens as time passes on. If tokens are available, executions can be allowed.
-    Otherwise, it's going to be rejected with an EmptyBucket error
+    Otherwise, it's going to be rejected with an EmptyBucket error.
+
+    The bucket doesn't depend on any event loop, so it can be created at import time and shared
+    by several event loops and threads. Time is tracked on the time.monotonic_ns() clock,
+    and state updates are done under a short lock, so they stay consistent in free-threaded builds as well
     """
 
     __slots__ = (
-        "_max_executions",
-        "_per_time_secs",
+        "_rate_numerator",
+        "_per_time_ns",
         "_bucket_size",
-        "_loop",
-        "_token_per_secs",
         "_tokens",
         "_next_replenish_at",
+        "_lock",
     )
 
     def __init__(self, max_executions: float, per_time_secs: float, bucket_size: float | None = None) -> None:
-        self._max_executions = max_executions
-        self._per_time_secs = per_time_secs
+        if max_executions <= 0:
+            raise ValueError(f'max_executions should be greater than zero ("{max_executions}" given)')
 
-        self._bucket_size = bucket_size if bucket_size else max_executions
+        # The rate is kept as an integer ratio of max_executions to per_time_ns.
+        # Time is scaled by the numerator, so one token is replenished per each (scaled) period of the scaled time.
+        # Integer math keeps the rate exact even for a token interval below a nanosecond at any uptime
+        rate = Fraction(max_executions).limit_denominator(MAX_RATE_DENOMINATOR)
 
-        self._loop = asyncio.get_running_loop()
-        self._token_per_secs = self._per_time_secs / self._max_executions
+        if rate <= 0:
+            raise ValueError(f'max_executions is too small to be represented ("{max_executions}" given)')
+
+        self._rate_numerator = rate.numerator
+        self._per_time_ns = max(1, round(per_time_secs * SECS_TO_NS)) * rate.denominator
+
+        self._bucket_size = bucket_size if bucket_size else max_executions
 
         self._tokens = self._bucket_size
-        self._next_replenish_at = self._loop.time() + self._token_per_secs
+        self._next_replenish_at = time.monotonic_ns() * self._rate_numerator + self._per_time_ns
+
+        self._lock = threading.Lock()
 
     @property
     def tokens(self) -> float:
-        self._replenish()
-        return self._tokens
+        with self._lock:
+            self._replenish(time.monotonic_ns())
+            return self._tokens
 
     @property
     def empty(self) -> bool:
-        self._replenish()
-        return self._tokens <= 0
+        return self.tokens < 1
 
-    async def take(self) -> None:
-        if not self.empty:
-            self._tokens -= 1
+    @property
+    def bucket_size(self) -> float:
+        return self._bucket_size
+
+    def time_until_available(self, tokens: float = 1) -> float:
+        """
+        Time in seconds until the given number of tokens are in the bucket (zero if they are available now)
+        """
+        with self._lock:
+            now = time.monotonic_ns()
+            self._replenish(now)
+
+            missing_tokens = tokens - self._tokens
+
+            if missing_tokens <= 0:
+                return 0.0
+
+            until_available = (
+                self._next_replenish_at
+                - now * self._rate_numerator
+                + (math.ceil(missing_tokens) - 1) * self._per_time_ns
+            )
+
+        return until_available / self._rate_numerator * NS_TO_SECS
+
+    def take_nowait(self, tokens: float = 1, keep: float = 0) -> None:
+        """
+        Take the given number of tokens from the bucket at once or raise EmptyBucket if there are not enough of them.
+        The check and the take happen atomically
+
+        **Parameters**
+
+        * **tokens** - How many tokens to take
+        * **keep** - How many tokens should be left in the bucket after the take
+        """
+        self._validate_take(tokens)
+
+        with self._lock:
+            self._replenish(time.monotonic_ns())
+
+            if self._tokens - tokens < keep:
+                raise EmptyBucket
+
+            self._tokens -= tokens
+
+    async def take(self, tokens: float = 1) -> None:
+        self.take_nowait(tokens)
+
+    @staticmethod
+    def take_all_nowait(buckets: Sequence["TokenBucket"], tokens: float = 1) -> None:
+        """
+        Take the given number of tokens from each bucket only if all of them have enough tokens.
+        Otherwise, raise EmptyBucket and take nothing.
+        All buckets are locked for the check and the take, so no one sees tokens of a rejected take as spent
+        """
+        for bucket in buckets:
+            bucket._validate_take(tokens)
+
+        # locks are always taken in the same order, so takes over overlapping sets of buckets can't deadlock
+        locked_buckets = sorted({id(bucket): bucket for bucket in buckets}.values(), key=id)
+
+        with contextlib.ExitStack() as stack:
+            for bucket in locked_buckets:
+                stack.enter_context(bucket._lock)
+
+            now = time.monotonic_ns()
+
+            for bucket in locked_buckets:
+                bucket._replenish(now)
+
+                if bucket._tokens < tokens:
+                    raise EmptyBucket
+
+            for bucket in locked_buckets:
+                bucket._tokens -= tokens
+
+    def adjust(self, tokens: float) -> None:
+        """
+        Correct the balance once the actual cost of an execution is known.
+        Positive values are debited even if there are not enough tokens, so the balance can go negative and
+        the bucket needs proportionally longer to refill. Negative values are refunded up to the bucket size
+        """
+        with self._lock:
+            self._replenish(time.monotonic_ns())
+
+            self._tokens = min(self._bucket_size, self._tokens - tokens)
+
+    def _validate_take(self, tokens: float) -> None:
+        if tokens <= 0:
+            raise ValueError(f'tokens should be greater than zero ("{tokens}" given)')
+
+        if tokens > self._bucket_size:
+            raise ValueError(f'tokens cannot exceed the bucket size of {self._bucket_size} ("{tokens}" given)')
+
+    def _replenish(self, now: int) -> None:
+        """
+        Add tokens for replenishments that have happened since the last check. Should be called under the lock
+        """
+        scaled_now = now * self._rate_numerator
+
+        if scaled_now < self._next_replenish_at:
             return
 
-        now = self._loop.time()
+        # one token is added on each replenishment that has happened since the last check
+        replenishments = 1 + (scaled_now - self._next_replenish_at) // self._per_time_ns
 
-        next_replenish = self._next_replenish_at
-        until_next_replenish = next_replenish - now
+        self._tokens = min(self._bucket_size, self._tokens + replenishments)
+        self._next_replenish_at += replenishments * self._per_time_ns
 
-        if until_next_replenish > 0:
-            raise EmptyBucket
 
-        tokens_to_add = min(self._bucket_size, 1 + abs(until_next_replenish / self._token_per_secs))
+class WarmUpTokenBucket:
+    """
+    Warm-up Token Bucket Logic (a.k.a. smooth warming up)
+    Accumulate unused tokens while executions are idle, but spend them slowly: the more tokens are stored,
+    the longer the interval until the next execution. After idleness, the permitted rate ramps up from
+    the cold rate (*cold_factor* times slower) to the stable rate over the warm-up period instead of permitting a burst.
+    Executions that come before the next one is permitted are rejected with an EmptyBucket error
+
+    **Reference:**
+
+    * [Guava's SmoothWarmingUp](https://github.com/google/guava/blob/master/guava/src/com/google/common/util/concurrent/SmoothRateLimiter.java)
+    """
+
+    __slots__ = (
+        "_stable_interval_secs",
+        "_threshold_tokens",
+        "_max_tokens",
+        "_slope",
+        "_cooldown_interval_secs",
+        "_stored_tokens",
+        "_next_free_at",
+    )
+
+    def __init__(
+        self,
+        max_executions: float,
+        per_time_secs: float,
+        warmup_period_secs: float,
+        cold_factor: float = 3.0,
+    ) -> None:
+        if warmup_period_secs <= 0:
+            raise ValueError(f'warmup_period_secs should be greater than zero ("{warmup_period_secs}" given)')
 
-        self._next_replenish_at = max(
-            next_replenish + tokens_to_add * self._token_per_secs,
-            now + self._token_per_secs,
+        if cold_factor < 1:
+            raise ValueError(f'cold_factor should be at least one ("{cold_factor}" given)')
+
+        self._stable_interval_secs = per_time_secs / max_executions
+        cold_interval_secs = self._stable_interval_secs * cold_factor
+
+        # executions take stable intervals below the threshold and cold intervals at max tokens,
+        # so spending all stored tokens takes as long as the warm-up period (the area under the interval graph)
+        self._threshold_tokens = 0.5 * warmup_period_secs / self._stable_interval_secs
+        self._max_tokens = self._threshold_tokens + 2 * warmup_period_secs / (
+            self._stable_interval_secs + cold_interval_secs
         )
+        self._slope = (cold_interval_secs - self._stable_interval_secs) / (self._max_tokens - self._threshold_tokens)
+        self._cooldown_interval_secs = warmup_period_secs / self._max_tokens
+
+        # start cold
+        self._stored_tokens = self._max_tokens
+        self._next_free_at = 0.0
+
+    @property
+    def stored_tokens(self) -> float:
+        self._sync(time.monotonic())
+        return self._stored_tokens
+
+    @property
+    def max_tokens(self) -> float:
+        return self._max_tokens
+
+    def time_until_available(self) -> float:
+        """
+        Time in seconds until the next execution is permitted (zero if it's permitted now)
+        """
+        return max(0.0, self._next_free_at - time.monotonic())
+
+    def cool_down(self) -> None:
+        """
+        Make the bucket cold as if executions have been idle for long, so the rate is going to warm up again
+        """
+        self._sync(time.monotonic())
+        self._stored_tokens = self._max_tokens
+
+    def take_nowait(self) -> None:
+        now = time.monotonic()
+
+        if now < self._next_free_at:
+            raise EmptyBucket
 
-        self._tokens = tokens_to_add - 1
-        return
+        self._sync(now)
 
-    def _replenish(self) -> None:
-        now = self._loop.time()
+        spent_tokens = min(1.0, self._stored_tokens)
+        fresh_tokens = 1 - spent_tokens
 
-        next_replenish = self._next_replenish_at
-        until_next_replenish = next_replenish - now
+        # the current execution is permitted now, the next one is going to wait for its interval
+        self._next_free_at = (
+            now + self._get_stored_tokens_wait_time(spent_tokens) + fresh_tokens * self._stable_interval_secs
+        )
+        self._stored_tokens -= spent_tokens
+
+    async def take(self) -> None:
+        self.take_nowait()
 
-        if until_next_replenish > 0:
+    def _sync(self, now: float) -> None:
+        if now <= self._next_free_at:
             return
 
-        tokens_to_add = min(self._bucket_size, 1 + abs(until_next_replenish / self._token_per_secs))
-        self._next_replenish_at = max(
-            next_replenish + tokens_to_add * self._token_per_secs,
-            now + self._token_per_secs,
+        self._stored_tokens = min(
+            self._max_tokens,
+            self._stored_tokens + (now - self._next_free_at) / self._cooldown_interval_secs,
         )
-        self._tokens = tokens_to_add
-        return
+        self._next_free_at = now
+
+    def _get_stored_tokens_wait_time(self, spent_tokens: float) -> float:
+        """
+        Time it takes to spend the given number of stored tokens from the top of the stored tokens
+        """
+        tokens_above_threshold = self._stored_tokens - self._threshold_tokens
+        wait_time = 0.0
+
+        if tokens_above_threshold > 0:
+            spent_above_threshold = min(tokens_above_threshold, spent_tokens)
+
+            # intervals grow linearly above the threshold, so the wait time is a trapezoid area
+            first_interval = self._stable_interval_secs + tokens_above_threshold * self._slope
+            last_interval = self._stable_interval_secs + (tokens_above_threshold - spent_above_threshold) * self._slope
+
+            wait_time = spent_above_threshold * (first_interval + last_interval) / 2
+            spent_tokens -= spent_above_threshold
+
+        return wait_time + spent_tokens * self._stable_interval_secs
@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import time
+
+from hyx.ratelimit.exceptions import EmptyBucket
+from hyx.ratelimit.typing import ScriptClientT
+
+SECS_TO_US = 1_000_000
+US_TO_SECS = 1 / SECS_TO_US
+
+# KEYS[1] - the bucket key
+# ARGV[1] - the bucket size
+# ARGV[2] - tokens replenished per microsecond
+# ARGV[3] - how many tokens to take at most
+# Returns the number of taken tokens and microseconds until the next token is available
+TOKEN_BUCKET_SCRIPT = """
+local bucket_size = tonumber(ARGV[1])
+local tokens_per_us = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+
+local server_time = redis.call('TIME')
+local now = tonumber(server_time[1]) * 1000000 + tonumber(server_time[2])
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or bucket_size
+local updated_at = tonumber(state[2]) or now
+
+tokens = math.min(bucket_size, tokens + math.max(0, now - updated_at) * tokens_per_us)
+
+local taken = math.min(requested, math.floor(tokens))
+tokens = tokens - taken
+
+redis.call('HSET', KEYS[1], 'tokens', string.format('%.17g', tokens), 'updated_at', string.format('%.0f', now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(bucket_size / tokens_per_us / 1000) + 1000)
+
+local until_next_token = 0
+
+if tokens < 1 then
+    until_next_token = math.ceil((1 - tokens) / tokens_per_us)
+end
+
+return {taken, until_next_token}
+"""
+
+TOKEN_BUCKET_SCRIPT_SHA = hashlib.sha1(TOKEN_BUCKET_SCRIPT.encode()).hexdigest()
+
+
+class DistributedTokenBucket:
+    """
+    Distributed Token Bucket Logic
+    Keep the bucket in a Redis-protocol store shared by all processes and update it atomically by a server-side script.
+    The store clock is used for replenishment, so clocks of the processes don't need to be in sync.
+
+    To avoid a round trip per execution, tokens are leased from the shared bucket in batches of *lease_size*
+    and spent locally. Leased tokens expire if they are not spent in time it takes to replenish them,
+    so idle processes cannot hoard tokens for later bursts.
+    When the shared bucket is empty, executions are rejected locally with an EmptyBucket error until the next token
+    """
+
+    __slots__ = (
+        "_client",
+        "_key",
+        "_bucket_size",
+        "_tokens_per_us",
+        "_lease_size",
+        "_lease_ttl_secs",
+        "_leased_tokens",
+        "_lease_expires_at",
+        "_empty_until",
+        "_lease_request",
+    )
+
+    def __init__(
+        self,
+        client: ScriptClientT,
+        key: str,
+        max_executions: float,
+        per_time_secs: float,
+        bucket_size: float | None = None,
+        lease_size: int = 1,
+    ) -> None:
+        if lease_size <= 0:
+            raise ValueError(f'lease_size should be greater than zero ("{lease_size}" given)')
+
+        self._client = client
+        self._key = key
+
+        self._bucket_size = bucket_size if bucket_size else max_executions
+        self._tokens_per_us = max_executions / (per_time_secs * SECS_TO_US)
+
+        self._lease_size = lease_size
+        self._lease_ttl_secs = lease_size * per_time_secs / max_executions
+
+        self._leased_tokens = 0
+        self._lease_expires_at = 0.0
+        self._empty_until = 0.0
+        self._lease_request: asyncio.Task[None] | None = None
+
+    @property
+    def leased_tokens(self) -> int:
+        """
+        Number of tokens leased by this process that have not been spent or expired yet
+        """
+        if time.monotonic() >= self._lease_expires_at:
+            return 0
+
+        return self._leased_tokens
+
+    async def take(self) -> None:
+        while True:
+            now = time.monotonic()
+
+            if self._leased_tokens > 0 and now < self._lease_expires_at:
+                self._leased_tokens -= 1
+                return
+
+            if now < self._empty_until:
+                raise EmptyBucket
+
+            if self._lease_request is None:
+                # concurrent executions share one lease request to the store
+                self._lease_request = asyncio.create_task(self._lease())
+
+            await asyncio.shield(self._lease_request)
+
+    async def _lease(self) -> None:
+        try:
+            taken, until_next_token_us = await self._eval_script(self._lease_size)
+            now = time.monotonic()
+
+            if taken > 0:
+                self._leased_tokens = int(taken)
+                self._lease_expires_at = now + self._lease_ttl_secs
+                return
+
+            self._empty_until = now + int(until_next_token_us) * US_TO_SECS
+        finally:
+            self._lease_request = None
+
+    async def _eval_script(self, requested_tokens: int) -> list[int]:
+        args = (self._key, repr(self._bucket_size), repr(self._tokens_per_us), requested_tokens)
+
+        try:
+            return await self._client.evalsha(TOKEN_BUCKET_SCRIPT_SHA, 1, *args)
+        except Exception as e:
+            if "NOSCRIPT" not in str(e):
+                raise
+
+        # the store has been restarted or flushed its script cache
+        await self._client.script_load(TOKEN_BUCKET_SCRIPT)
+
+        return await self._client.evalsha(TOKEN_BUCKET_SCRIPT_SHA, 1, *args)
@@ -0,0 +1,121 @@
+import dataclasses
+import time
+
+from hyx.ratelimit.exceptions import EmptyBucket
+
+
+@dataclasses.dataclass(frozen=True)
+class Quota:
+    """
+    Rate limit budget advertised by the upstream (e.g. via X-RateLimit-Remaining and X-RateLimit-Reset headers)
+    """
+
+    remaining: int
+    reset_after_secs: float
+
+
+class QuotaPacer:
+    """
+    Quota Pacing Logic
+    Spread executions evenly, so the remaining budget advertised by the upstream is used up exactly by its reset.
+    Once the budget is over, executions wait for the reset. Until the first quota and after the budget is reset,
+    executions are paced at the default rate.
+    Executions that would need to wait longer than permitted are rejected with an EmptyBucket error
+    """
+
+    __slots__ = (
+        "_default_interval_secs",
+        "_interval_secs",
+        "_remaining",
+        "_reset_at",
+        "_next_at",
+    )
+
+    def __init__(self, max_executions: float, per_time_secs: float) -> None:
+        if max_executions <= 0:
+            raise ValueError(f'max_executions should be greater than zero ("{max_executions}" given)')
+
+        self._default_interval_secs = per_time_secs / max_executions
+        self._interval_secs = self._default_interval_secs
+
+        self._remaining: int | None = None
+        self._reset_at: float | None = None
+        self._next_at = 0.0
+
+    @property
+    def remaining(self) -> int | None:
+        """
+        Budget left until the reset (None if the upstream has not advertised it or it's been reset)
+        """
+        self._expire(time.monotonic())
+        return self._remaining
+
+    @property
+    def interval_secs(self) -> float:
+        """
+        Current time between two executions
+        """
+        self._expire(time.monotonic())
+        return self._interval_secs
+
+    def update(self, quota: Quota) -> None:
+        """
+        Pace the following executions according to the recent budget advertised by the upstream
+        """
+        now = time.monotonic()
+
+        self._remaining = max(0, quota.remaining)
+        self._reset_at = now + max(0.0, quota.reset_after_secs)
+
+        if self._remaining:
+            self._interval_secs = (self._reset_at - now) / self._remaining
+
+    def time_until_available(self) -> float:
+        """
+        Time in seconds until the next execution is permitted (zero if it's permitted now)
+        """
+        now = time.monotonic()
+        self._expire(now)
+
+        return self._get_next_slot(now) - now
+
+    def reserve(self, max_wait_secs: float | None = None) -> float:
+        """
+        Reserve the next execution slot and get how long to wait for it (in seconds)
+        """
+        now = time.monotonic()
+        self._expire(now)
+
+        slot = self._get_next_slot(now)
+        wait_secs = slot - now
+
+        if max_wait_secs is not None and wait_secs > max_wait_secs:
+            raise EmptyBucket
+
+        if self._remaining == 0:
+            # the slot is right after the reset when the budget is unknown again
+            self._next_at = slot + self._default_interval_secs
+            return wait_secs
+
+        self._next_at = slot + self._interval_secs
+
+        if self._remaining is not None:
+            self._remaining -= 1
+
+        return wait_secs
+
+    def _get_next_slot(self, now: float) -> float:
+        slot = max(now, self._next_at)
+
+        if self._remaining == 0 and self._reset_at is not None:
+            slot = max(slot, self._reset_at)
+
+        return slot
+
+    def _expire(self, now: float) -> None:
+        if self._reset_at is None or now < self._reset_at:
+            return
+
+        self._remaining = None
+        self._reset_at = None
+        self._interval_secs = self._default_interval_secs
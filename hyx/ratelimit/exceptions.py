@@ -11,3 +11,15 @@ class EmptyBucket(HyxError):
     """
     Occurs when requester have exceeded the rate limit
     """
+
+
+class FullWindow(HyxError):
+    """
+    Occurs when requester have exceeded the rate limit within the sliding window
+    """
+
+
+class StoreError(HyxError):
+    """
+    Occurs when the rate limit store has failed to execute a command
+    """
@@ -0,0 +1,248 @@
+import heapq
+import operator
+import time
+from collections.abc import Hashable
+
+from hyx.ratelimit.exceptions import EmptyBucket
+from hyx.sharedmem import SharedSegment
+
+SECS_TO_NS = 1_000_000_000
+NS_TO_SECS = 1 / SECS_TO_NS
+
+MIN_SWEEP_SIZE = 1024
+
+
+def _get_gcra_params(max_executions: float, per_time_secs: float, bucket_size: float | None) -> tuple[int, int]:
+    """
+    Calculate the emission interval and the burst tolerance (in nanoseconds)
+    """
+    if max_executions <= 0:
+        raise ValueError(f'max_executions should be greater than zero ("{max_executions}" given)')
+
+    bucket_size = bucket_size if bucket_size else max_executions
+    emission_interval_ns = round(per_time_secs * SECS_TO_NS / max_executions)
+
+    return emission_interval_ns, round(emission_interval_ns * (bucket_size - 1))
+
+
+class GCRA:
+    """
+    Generic Cell Rate Algorithm Logic
+    Keep the theoretical arrival time (TAT) of the next execution only. An execution is allowed
+    if it doesn't arrive earlier than TAT minus the burst tolerance.
+    Otherwise, it's going to be rejected with an EmptyBucket error
+
+    **Reference:**
+
+    * [Rate limiting, Cells, and GCRA](https://brandur.org/rate-limiting)
+    """
+
+    __slots__ = (
+        "_emission_interval_ns",
+        "_burst_tolerance_ns",
+        "_tat_ns",
+    )
+
+    def __init__(self, max_executions: float, per_time_secs: float, bucket_size: float | None = None) -> None:
+        self._emission_interval_ns, self._burst_tolerance_ns = _get_gcra_params(
+            max_executions,
+            per_time_secs,
+            bucket_size,
+        )
+
+        self._tat_ns = 0
+
+    @property
+    def emission_interval_ns(self) -> int:
+        """
+        Time between two executions at the sustained rate
+        """
+        return self._emission_interval_ns
+
+    @property
+    def burst_tolerance_ns(self) -> int:
+        """
+        How much earlier than their theoretical arrival time executions can happen
+        """
+        return self._burst_tolerance_ns
+
+    @property
+    def tat_ns(self) -> int:
+        """
+        The theoretical arrival time of the next execution (on the time.monotonic_ns() clock)
+        """
+        return self._tat_ns
+
+    def time_until_available(self) -> float:
+        """
+        Time in seconds until the next conforming execution (zero if it conforms now)
+        """
+        return max(0, self._tat_ns - self._burst_tolerance_ns - time.monotonic_ns()) * NS_TO_SECS
+
+    def take_nowait(self) -> None:
+        now = time.monotonic_ns()
+        tat = self._tat_ns if self._tat_ns > now else now
+
+        if tat - now > self._burst_tolerance_ns:
+            raise EmptyBucket
+
+        self._tat_ns = tat + self._emission_interval_ns
+
+    async def take(self) -> None:
+        self.take_nowait()
+
+
+class SharedGCRA:
+    """
+    Shared Generic Cell Rate Algorithm Logic
+    Keep the theoretical arrival time (TAT) in a host-wide shared memory segment,
+    so all processes on the host that use the same *name* share one rate limit.
+    time.monotonic_ns() is a system-wide clock, so TAT means the same time for all processes
+    """
+
+    __slots__ = (
+        "_emission_interval_ns",
+        "_burst_tolerance_ns",
+        "_segment",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        max_executions: float,
+        per_time_secs: float,
+        bucket_size: float | None = None,
+    ) -> None:
+        self._emission_interval_ns, self._burst_tolerance_ns = _get_gcra_params(
+            max_executions,
+            per_time_secs,
+            bucket_size,
+        )
+
+        self._segment = SharedSegment(f"ratelimit-{name}", words=1)
+
+    @property
+    def segment(self) -> SharedSegment:
+        return self._segment
+
+    @property
+    def tat_ns(self) -> int:
+        return self._segment[0]
+
+    def time_until_available(self) -> float:
+        return max(0, self._segment[0] - self._burst_tolerance_ns - time.monotonic_ns()) * NS_TO_SECS
+
+    def take_nowait(self) -> None:
+        with self._segment.locked() as words:
+            now = time.monotonic_ns()
+            tat = words[0] if words[0] > now else now
+
+            if tat - now > self._burst_tolerance_ns:
+                raise EmptyBucket
+
+            words[0] = tat + self._emission_interval_ns
+
+    async def take(self) -> None:
+        self.take_nowait()
+
+
+class KeyedGCRA:
+    """
+    Keyed Generic Cell Rate Algorithm Logic
+    Apply the same rate limit to each key (e.g. API key, IP, tenant) independently.
+    The state of each key is one theoretical arrival time (TAT) in a plain dictionary.
+
+    Once TAT of a key is in the past, the key has fully replenished and its state doesn't differ from a new key.
+    Such idle keys are dropped when the dictionary grows twice since the last sweep,
+    so memory is bounded by the number of recently active keys.
+    If *max_keys* is given and it's reached, keys that are the closest to full replenishment are forgotten as well
+    """
+
+    __slots__ = (
+        "_emission_interval_ns",
+        "_burst_tolerance_ns",
+        "_max_keys",
+        "_tats",
+        "_next_sweep_size",
+    )
+
+    def __init__(
+        self,
+        max_executions: float,
+        per_time_secs: float,
+        bucket_size: float | None = None,
+        max_keys: int | None = None,
+    ) -> None:
+        if max_keys is not None and max_keys <= 0:
+            raise ValueError(f'max_keys should be greater than zero ("{max_keys}" given)')
+
+        self._emission_interval_ns, self._burst_tolerance_ns = _get_gcra_params(
+            max_executions,
+            per_time_secs,
+            bucket_size,
+        )
+
+        self._max_keys = max_keys
+        self._tats: dict[Hashable, int] = {}
+        self._next_sweep_size = self._get_next_sweep_size(0)
+
+    def __len__(self) -> int:
+        """
+        Number of currently tracked keys
+        """
+        return len(self._tats)
+
+    def time_until_available(self, key: Hashable) -> float:
+        """
+        Time in seconds until the next conforming execution for the key (zero if it conforms now)
+        """
+        tat = self._tats.get(key, 0)
+
+        return max(0, tat - self._burst_tolerance_ns - time.monotonic_ns()) * NS_TO_SECS
+
+    def take_nowait(self, key: Hashable) -> None:
+        now = time.monotonic_ns()
+        tats = self._tats
+
+        tat = tats.get(key, now)
+
+        if tat < now:
+            tat = now
+
+        if tat - now > self._burst_tolerance_ns:
+            raise EmptyBucket
+
+        tats[key] = tat + self._emission_interval_ns
+
+        if len(tats) >= self._next_sweep_size:
+            self._sweep(now, key)
+
+    async def take(self, key: Hashable) -> None:
+        self.take_nowait(key)
+
+    def _get_next_sweep_size(self, tracked_keys: int) -> int:
+        next_sweep_size = max(MIN_SWEEP_SIZE, 2 * tracked_keys)
+
+        if self._max_keys is not None:
+            return min(next_sweep_size, self._max_keys + 1)
+
+        return next_sweep_size
+
+    def _sweep(self, now: int, charged_key: Hashable) -> None:
+        """
+        Drop fully replenished keys. Sweeps are triggered by the dictionary growth, so they are O(1) amortized
+        """
+        tats = {key: tat for key, tat in self._tats.items() if tat > now}
+
+        max_tracked_keys = max(1, self._max_keys * 3 // 4) if self._max_keys is not None else None
+
+        if max_tracked_keys is not None and len(tats) > max_tracked_keys:
+            # Leave some room below max_keys, so we don't sweep again on each new key when most keys are active.
+            # Keys with the earliest TAT are the closest to full replenishment, so forgetting them loses the least.
+            # The key that has just been charged is always kept, otherwise its execution would be free
+            charged_tat = tats.pop(charged_key)
+            tats = dict(heapq.nlargest(max_tracked_keys - 1, tats.items(), key=operator.itemgetter(1)))
+            tats[charged_key] = charged_tat
+
+        self._tats = tats
+        self._next_sweep_size = self._get_next_sweep_size(len(tats))
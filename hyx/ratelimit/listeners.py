@@ -0,0 +1,28 @@
+from hyx.circuitbreaker.context import BreakerContext
+from hyx.circuitbreaker.events import BreakerListener
+from hyx.circuitbreaker.states import BreakerState, WorkingState
+from hyx.ratelimit.managers import WarmUpTokenBucketLimiter
+
+
+class WarmUpBreakerListener(BreakerListener):
+    """
+    Make a warm-up rate limiter warm up again when a circuit breaker moves back to the working state,
+    so the freshly recovered system doesn't get a full burst of executions
+
+    **Parameters:**
+
+    * **limiter** - The warm-up rate limiter that protects the same system as the breaker
+    """
+
+    __slots__ = ("_limiter",)
+
+    def __init__(self, limiter: WarmUpTokenBucketLimiter) -> None:
+        self._limiter = limiter
+
+    async def on_working(
+        self,
+        context: BreakerContext,
+        current_state: BreakerState,
+        next_state: WorkingState,
+    ) -> None:
+        self._limiter.cool_down()
@@ -1,5 +1,33 @@
-from hyx.ratelimit.buckets import TokenBucket
-from hyx.ratelimit.exceptions import EmptyBucket, RateLimitExceeded
+import asyncio
+import math
+import random
+import threading
+from collections import deque
+from collections.abc import Hashable, Mapping, Sequence
+
+from hyx.ratelimit.adaptive import AdaptiveThrottle
+from hyx.ratelimit.buckets import TokenBucket, WarmUpTokenBucket
+from hyx.ratelimit.distributed import DistributedTokenBucket
+from hyx.ratelimit.dynamic import Quota, QuotaPacer
+from hyx.ratelimit.exceptions import EmptyBucket, FullWindow, RateLimitExceeded
+from hyx.ratelimit.gcra import GCRA, KeyedGCRA, SharedGCRA
+from hyx.ratelimit.quotas import PersistentQuota
+from hyx.ratelimit.typing import LimitT, PeriodT, PriorityT, ScriptClientT
+from hyx.ratelimit.windows import SlidingWindowCounter, SlidingWindowLog
+
+# shares of the bucket each priority class cannot use, so they are left for more important classes
+DEFAULT_PRIORITY_RESERVES: Mapping[PriorityT, float] = {
+    "critical": 0.0,
+    "default": 0.1,
+    "sheddable": 0.5,
+}
+
+
+def _get_running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
 
 
 class RateLimiter:
@@ -7,22 +35,655 @@ class RateLimiter:
         raise NotImplementedError
 
 
-class TokenBucketLimiter(RateLimiter):
+class WeightedRateLimiter(RateLimiter):
+    """
+    A rate limiter where executions may have different costs (e.g. rows, bytes or model tokens they consume)
+    """
+
+    async def acquire(self, tokens: float = 1) -> None:
+        raise NotImplementedError
+
+
+class TokenBucketLimiter(WeightedRateLimiter):
     """
     Token Bucket Rate Limiter
     Replenish tokens as time passes on. If tokens are available, executions can be allowed.
-    Otherwise, it's going to be rejected with RateLimitExceeded
+    Otherwise, executions can wait for the next tokens in the FIFO order or be rejected with RateLimitExceeded.
+
+    The limiter can be shared by several event loops and threads.
+    The wakeup that hands out tokens always runs on the event loop of the execution at the head of the queue
     """
 
-    __slots__ = ("_token_bucket",)
+    __slots__ = ("_token_bucket", "_waiters", "_queued_tokens", "_wakeup_generation", "_lock")
 
     def __init__(self, max_executions: float, per_time_secs: float, bucket_size: float | None = None) -> None:
         self._token_bucket = TokenBucket(max_executions, per_time_secs, bucket_size)
 
+        self._waiters: deque[tuple[asyncio.Future[None], float]] = deque()
+        self._queued_tokens: float = 0
+
+        # wakeups scheduled before the latest one are stale and do nothing
+        self._wakeup_generation = 0
+        self._lock = threading.Lock()
+
     @property
     def bucket(self) -> TokenBucket:
         return self._token_bucket
 
+    def time_until_available(self, tokens: float = 1) -> float:
+        """
+        Time in seconds until a new execution is going to be permitted, given executions that are already waiting
+        """
+        return self._token_bucket.time_until_available(self._queued_tokens + tokens)
+
+    async def acquire(self, tokens: float = 1, timeout_secs: float | None = 0) -> None:
+        """
+        Take tokens from the bucket
+
+        **Parameters**
+
+        * **tokens** *(float)* - How many tokens the execution costs. It cannot exceed the bucket size
+        * **timeout_secs** *(None | float)* - How long to wait for the next tokens if the bucket is empty.
+            Zero means no waiting at all, None means waiting for as long as needed.
+            Executions that cannot get tokens in time are rejected right away
+        """
+        if tokens <= 0:
+            raise ValueError(f'tokens should be greater than zero ("{tokens}" given)')
+
+        if tokens > self._token_bucket.bucket_size:
+            # such executions would block the queue forever
+            raise ValueError(
+                f'tokens cannot exceed the bucket size of {self._token_bucket.bucket_size} ("{tokens}" given)'
+            )
+
+        waiter = self._take_or_enqueue(tokens, timeout_secs)
+
+        if waiter is None:
+            return
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            self._dequeue(waiter, tokens)
+            raise
+
+    def _take_or_enqueue(self, tokens: float, timeout_secs: float | None) -> asyncio.Future[None] | None:
+        """
+        Take tokens right away or put the execution into the queue if it can get them in time
+        """
+        with self._lock:
+            if not self._waiters:
+                try:
+                    self._token_bucket.take_nowait(tokens)
+                    return None
+                except EmptyBucket as e:
+                    if timeout_secs is not None and timeout_secs <= 0:
+                        raise RateLimitExceeded from e
+
+            if (
+                timeout_secs is not None
+                and self._token_bucket.time_until_available(self._queued_tokens + tokens) > timeout_secs
+            ):
+                raise RateLimitExceeded
+
+            waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            self._waiters.append((waiter, tokens))
+            self._queued_tokens += tokens
+
+            if len(self._waiters) == 1:
+                self._schedule_wakeup()
+
+            return waiter
+
+    def _dequeue(self, waiter: asyncio.Future[None], tokens: float) -> None:
+        """
+        Remove a cancelled execution from the queue, so it doesn't hold a place there
+        """
+        with self._lock:
+            if (waiter, tokens) not in self._waiters:
+                return
+
+            was_head = self._waiters[0][0] is waiter
+
+            self._waiters.remove((waiter, tokens))
+            self._queued_tokens -= tokens
+
+            if was_head:
+                # the wakeup should move to the loop of the next execution
+                self._schedule_wakeup()
+
+    def adjust(self, tokens: float) -> None:
+        """
+        Debit (positive values) or refund (negative values) the difference between the actual and the estimated cost
+        of an execution once it's known (e.g. from the response of an LLM or search backend)
+        """
+        self._token_bucket.adjust(tokens)
+
+        if tokens < 0:
+            # refunded tokens may be enough for waiting executions already
+            with self._lock:
+                self._schedule_wakeup()
+
+    def _schedule_wakeup(self) -> None:
+        """
+        Schedule the wakeup on the event loop of the execution at the head of the queue,
+        so it cannot die with another event loop. Should be called under the lock
+        """
+        self._wakeup_generation += 1
+
+        if not self._waiters:
+            return
+
+        waiter, tokens = self._waiters[0]
+        waiter_loop = waiter.get_loop()
+        delay_secs = self._token_bucket.time_until_available(tokens)
+
+        if waiter_loop is _get_running_loop():
+            waiter_loop.call_later(delay_secs, self._wakeup, self._wakeup_generation)
+            return
+
+        waiter_loop.call_soon_threadsafe(waiter_loop.call_later, delay_secs, self._wakeup, self._wakeup_generation)
+
+    def _wakeup(self, generation: int) -> None:
+        """
+        Hand out replenished tokens to waiting executions in the FIFO order
+        """
+        with self._lock:
+            if generation != self._wakeup_generation:
+                return
+
+            while self._waiters:
+                waiter, tokens = self._waiters[0]
+
+                if waiter.done():
+                    self._waiters.popleft()
+                    self._queued_tokens -= tokens
+                    continue
+
+                try:
+                    self._token_bucket.take_nowait(tokens)
+                except EmptyBucket:
+                    # costly executions at the head of the queue are not overtaken by cheaper ones, so they don't starve
+                    self._schedule_wakeup()
+                    return
+
+                self._waiters.popleft()
+                self._queued_tokens -= tokens
+                self._notify(waiter, tokens)
+
+    def _notify(self, waiter: asyncio.Future[None], tokens: float) -> None:
+        """
+        Let the waiting execution proceed. Waiters of other event loops are notified in a thread-safe way
+        """
+        waiter_loop = waiter.get_loop()
+
+        if waiter_loop is _get_running_loop():
+            waiter.set_result(None)
+            return
+
+        waiter_loop.call_soon_threadsafe(self._hand_over, waiter, tokens)
+
+    def _hand_over(self, waiter: asyncio.Future[None], tokens: float) -> None:
+        if waiter.done():
+            # the execution has been cancelled while the tokens were on their way
+            self.adjust(-tokens)
+            return
+
+        waiter.set_result(None)
+
+
+class LeakyTokenBucketLimiter(RateLimiter):
+    """
+    Leaky Token Bucket Rate Limiter
+    Queue executions in a bounded FIFO and let them leak out at a constant rate,
+    one execution per tick. If the queue is full, executions are rejected with RateLimitExceeded
+    """
+
+    __slots__ = (
+        "_bucket_size",
+        "_leak_interval_secs",
+        "_next_leak_at",
+        "_waiters",
+        "_leak_handle",
+    )
+
+    def __init__(self, max_executions: float, per_time_secs: float, bucket_size: float | None = None) -> None:
+        if max_executions <= 0:
+            raise ValueError(f'max_executions should be greater than zero ("{max_executions}" given)')
+
+        if per_time_secs <= 0:
+            raise ValueError(f'per_time_secs should be greater than zero ("{per_time_secs}" given)')
+
+        self._bucket_size = bucket_size if bucket_size else max_executions
+        self._leak_interval_secs = per_time_secs / max_executions
+
+        self._next_leak_at: float = 0.0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._leak_handle: asyncio.TimerHandle | None = None
+
+    @property
+    def queue_size(self) -> int:
+        """
+        Number of executions waiting in the queue
+        """
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+
+        if not self._waiters and now >= self._next_leak_at:
+            self._next_leak_at = now + self._leak_interval_secs
+            return
+
+        if len(self._waiters) >= self._bucket_size:
+            raise RateLimitExceeded
+
+        waiter: asyncio.Future[None] = loop.create_future()
+        self._waiters.append(waiter)
+
+        if self._leak_handle is None:
+            self._leak_handle = loop.call_at(self._next_leak_at, self._leak)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # a cancelled execution should not hold a place in the queue
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+            raise
+
+    def _leak(self) -> None:
+        """
+        Wake up exactly one queued execution per tick
+        """
+        self._leak_handle = None
+
+        while self._waiters:
+            waiter = self._waiters.popleft()
+
+            if waiter.done():
+                continue
+
+            loop = waiter.get_loop()
+            waiter.set_result(None)
+
+            # ticks follow the schedule rather than the previous tick, so callback delays don't add up,
+            # but the loop that has fallen behind by more than a tick doesn't release a burst to catch up
+            self._next_leak_at = max(self._next_leak_at + self._leak_interval_secs, loop.time())
+
+            if self._waiters:
+                self._leak_handle = loop.call_at(self._next_leak_at, self._leak)
+
+            return
+
+
+class PriorityTokenBucketLimiter(WeightedRateLimiter):
+    """
+    Priority-aware Token Bucket Rate Limiter
+    Share one token bucket between priority classes (e.g. critical, default and sheddable executions).
+    Each class can take tokens only while the bucket keeps its reserved share for more important classes,
+    so less important executions are rejected with RateLimitExceeded first as tokens run low
+    """
+
+    __slots__ = ("_token_bucket", "_reserved_tokens")
+
+    def __init__(
+        self,
+        max_executions: float,
+        per_time_secs: float,
+        bucket_size: float | None = None,
+        reserves: Mapping[PriorityT, float] | None = None,
+    ) -> None:
+        reserves = reserves if reserves is not None else DEFAULT_PRIORITY_RESERVES
+
+        for priority, reserve in reserves.items():
+            if not 0 <= reserve < 1:
+                raise ValueError(f'Reserve of the "{priority}" priority should be in [0, 1) range ("{reserve}" given)')
+
+        self._token_bucket = TokenBucket(max_executions, per_time_secs, bucket_size)
+        # reserves are rounded down to whole tokens, so each class can be admitted even with small buckets
+        self._reserved_tokens = {
+            priority: math.floor(reserve * self._token_bucket.bucket_size) for priority, reserve in reserves.items()
+        }
+
+    @property
+    def bucket(self) -> TokenBucket:
+        return self._token_bucket
+
+    async def acquire(self, tokens: float = 1, priority: PriorityT = "default") -> None:
+        """
+        Take tokens from the bucket on behalf of the priority class
+
+        **Parameters**
+
+        * **tokens** *(float)* - How many tokens the execution costs
+        * **priority** *(str)* - The priority class of the execution
+        """
+        try:
+            reserved_tokens = self._reserved_tokens[priority]
+        except KeyError as e:
+            raise ValueError(f'Unknown priority "{priority}" (known ones: {", ".join(self._reserved_tokens)})') from e
+
+        try:
+            self._token_bucket.take_nowait(tokens, keep=reserved_tokens)
+        except EmptyBucket as e:
+            raise RateLimitExceeded from e
+
+
+class WarmUpTokenBucketLimiter(RateLimiter):
+    """
+    Warm-up Token Bucket Rate Limiter
+    Ramp the permitted rate from the cold rate to the stable one after idleness or cool-downs.
+    Executions that come earlier than permitted are rejected with RateLimitExceeded
+    """
+
+    __slots__ = ("_token_bucket",)
+
+    def __init__(
+        self,
+        max_executions: float,
+        per_time_secs: float,
+        warmup_period_secs: float,
+        cold_factor: float = 3.0,
+    ) -> None:
+        self._token_bucket = WarmUpTokenBucket(max_executions, per_time_secs, warmup_period_secs, cold_factor)
+
+    @property
+    def bucket(self) -> WarmUpTokenBucket:
+        return self._token_bucket
+
+    def time_until_available(self) -> float:
+        return self._token_bucket.time_until_available()
+
+    def cool_down(self) -> None:
+        """
+        Make the limiter warm up again (e.g. after the protected upstream has recovered)
+        """
+        self._token_bucket.cool_down()
+
+    async def acquire(self) -> None:
+        try:
+            self._token_bucket.take_nowait()
+        except EmptyBucket as e:
+            raise RateLimitExceeded from e
+
+
+class CompositeTokenBucketLimiter(WeightedRateLimiter):
+    """
+    Composite Token Bucket Rate Limiter
+    Enforce several limits at once (e.g. 10 per second, 500 per minute and 20k per day) with a token bucket per limit.
+    Tokens are taken from all buckets only if all of them have enough tokens.
+    Otherwise, the execution is rejected with RateLimitExceeded and keeps no tokens
+    """
+
+    __slots__ = ("_buckets",)
+
+    def __init__(self, limits: Sequence[LimitT]) -> None:
+        if not limits:
+            raise ValueError("At least one limit should be given")
+
+        self._buckets = tuple(TokenBucket(max_executions, per_time_secs) for max_executions, per_time_secs in limits)
+
+    @property
+    def buckets(self) -> tuple[TokenBucket, ...]:
+        return self._buckets
+
+    def time_until_available(self, tokens: float = 1) -> float:
+        """
+        Time in seconds until all limits permit the execution (zero if they permit it now)
+        """
+        return max(bucket.time_until_available(tokens) for bucket in self._buckets)
+
+    async def acquire(self, tokens: float = 1) -> None:
+        try:
+            # the limits are checked and taken at once, so concurrent executions never see a partial take
+            TokenBucket.take_all_nowait(self._buckets, tokens)
+        except EmptyBucket as e:
+            raise RateLimitExceeded from e
+
+
+class AdaptiveThrottleLimiter(RateLimiter):
+    """
+    Adaptive Throttling Rate Limiter
+    Reject executions locally with RateLimitExceeded with the probability that grows
+    as the upstream accepts fewer of them, so doomed requests don't leave the process
+    """
+
+    __slots__ = ("_throttle",)
+
+    def __init__(self, k: float = 2.0, window_secs: float = 120.0) -> None:
+        self._throttle = AdaptiveThrottle(k, window_secs)
+
+    @property
+    def throttle(self) -> AdaptiveThrottle:
+        return self._throttle
+
+    async def acquire(self) -> None:
+        rejection_probability = self._throttle.rejection_probability
+        self._throttle.record_request()
+
+        if rejection_probability and random.random() < rejection_probability:
+            raise RateLimitExceeded
+
+    def accept(self) -> None:
+        """
+        Record that the upstream has accepted the execution
+        """
+        self._throttle.record_accept()
+
+
+class DynamicRateLimiter(RateLimiter):
+    """
+    Dynamic Rate Limiter
+    Pace executions to use the budget advertised by the upstream exactly. Executions wait for their slots
+    or get rejected with RateLimitExceeded if they would need to wait longer than permitted
+    """
+
+    __slots__ = ("_pacer",)
+
+    def __init__(self, max_executions: float, per_time_secs: float) -> None:
+        self._pacer = QuotaPacer(max_executions, per_time_secs)
+
+    @property
+    def pacer(self) -> QuotaPacer:
+        return self._pacer
+
+    def time_until_available(self) -> float:
+        return self._pacer.time_until_available()
+
+    def update(self, quota: Quota) -> None:
+        """
+        Pace the following executions according to the budget advertised by the upstream
+        """
+        self._pacer.update(quota)
+
+    async def acquire(self, timeout_secs: float | None = None) -> None:
+        """
+        Reserve the next execution slot and wait for it
+
+        **Parameters**
+
+        * **timeout_secs** *(None | float)* - How long to wait for the slot at most.
+            None means waiting for as long as needed
+        """
+        try:
+            wait_secs = self._pacer.reserve(timeout_secs)
+        except EmptyBucket as e:
+            raise RateLimitExceeded from e
+
+        if wait_secs > 0:
+            await asyncio.sleep(wait_secs)
+
+
+class SlidingWindowLogLimiter(RateLimiter):
+    """
+    Sliding Window Log Rate Limiter
+    Permit at most max_executions during any time span of per_time_secs.
+    Otherwise, executions are going to be rejected with RateLimitExceeded
+    """
+
+    __slots__ = ("_window",)
+
+    def __init__(self, max_executions: int, per_time_secs: float) -> None:
+        self._window = SlidingWindowLog(max_executions, per_time_secs)
+
+    @property
+    def window(self) -> SlidingWindowLog:
+        return self._window
+
+    async def acquire(self) -> None:
+        try:
+            self._window.take_nowait()
+        except FullWindow as e:
+            raise RateLimitExceeded from e
+
+
+class SlidingWindowCounterLimiter(RateLimiter):
+    """
+    Sliding Window Counter Rate Limiter
+    Permit approximately max_executions during any time span of per_time_secs using constant memory.
+    Otherwise, executions are going to be rejected with RateLimitExceeded
+    """
+
+    __slots__ = ("_window",)
+
+    def __init__(self, max_executions: int, per_time_secs: float) -> None:
+        self._window = SlidingWindowCounter(max_executions, per_time_secs)
+
+    @property
+    def window(self) -> SlidingWindowCounter:
+        return self._window
+
+    async def acquire(self) -> None:
+        try:
+            self._window.take_nowait()
+        except FullWindow as e:
+            raise RateLimitExceeded from e
+
+
+class GCRALimiter(RateLimiter):
+    """
+    Generic Cell Rate Algorithm Rate Limiter
+    Track the theoretical arrival time of the next execution. If executions arrive earlier than permitted
+    by the burst tolerance, they are going to be rejected with RateLimitExceeded
+    """
+
+    __slots__ = ("_gcra",)
+
+    def __init__(self, max_executions: float, per_time_secs: float, bucket_size: float | None = None) -> None:
+        self._gcra = GCRA(max_executions, per_time_secs, bucket_size)
+
+    @property
+    def gcra(self) -> GCRA:
+        return self._gcra
+
+    def time_until_available(self) -> float:
+        return self._gcra.time_until_available()
+
+    async def acquire(self) -> None:
+        try:
+            self._gcra.take_nowait()
+        except EmptyBucket as e:
+            raise RateLimitExceeded from e
+
+
+class SharedGCRALimiter(RateLimiter):
+    """
+    Shared Generic Cell Rate Algorithm Rate Limiter
+    Share one rate limit between all processes on the host via shared memory.
+    Over the limit executions are rejected with RateLimitExceeded
+    """
+
+    __slots__ = ("_gcra",)
+
+    def __init__(
+        self,
+        name: str,
+        max_executions: float,
+        per_time_secs: float,
+        bucket_size: float | None = None,
+    ) -> None:
+        self._gcra = SharedGCRA(name, max_executions, per_time_secs, bucket_size)
+
+    @property
+    def gcra(self) -> SharedGCRA:
+        return self._gcra
+
+    def time_until_available(self) -> float:
+        return self._gcra.time_until_available()
+
+    async def acquire(self) -> None:
+        try:
+            self._gcra.take_nowait()
+        except EmptyBucket as e:
+            raise RateLimitExceeded from e
+
+
+class KeyedGCRALimiter:
+    """
+    Keyed Generic Cell Rate Algorithm Rate Limiter
+    Limit executions per key (e.g. API key, IP, tenant). Each key has the same rate limit,
+    but executions of one key don't affect other keys. Over the limit executions are rejected with RateLimitExceeded
+    """
+
+    __slots__ = ("_gcra",)
+
+    def __init__(
+        self,
+        max_executions: float,
+        per_time_secs: float,
+        bucket_size: float | None = None,
+        max_keys: int | None = None,
+    ) -> None:
+        self._gcra = KeyedGCRA(max_executions, per_time_secs, bucket_size, max_keys)
+
+    @property
+    def gcra(self) -> KeyedGCRA:
+        return self._gcra
+
+    def time_until_available(self, key: Hashable) -> float:
+        return self._gcra.time_until_available(key)
+
+    async def acquire(self, key: Hashable) -> None:
+        try:
+            self._gcra.take_nowait(key)
+        except EmptyBucket as e:
+            raise RateLimitExceeded from e
+
+
+class DistributedTokenBucketLimiter(RateLimiter):
+    """
+    Distributed Token Bucket Rate Limiter
+    Share one token bucket between all processes via a Redis-protocol store.
+    If the shared bucket is empty, executions are rejected with RateLimitExceeded
+    """
+
+    __slots__ = ("_token_bucket",)
+
+    def __init__(
+        self,
+        client: ScriptClientT,
+        key: str,
+        max_executions: float,
+        per_time_secs: float,
+        bucket_size: float | None = None,
+        lease_size: int = 1,
+    ) -> None:
+        self._token_bucket = DistributedTokenBucket(
+            client,
+            key,
+            max_executions,
+            per_time_secs,
+            bucket_size,
+            lease_size,
+        )
+
+    @property
+    def bucket(self) -> DistributedTokenBucket:
+        return self._token_bucket
+
     async def acquire(self) -> None:
         try:
             await self._token_bucket.take()
@@ -30,7 +691,33 @@ class TokenBucketLimiter(RateLimiter):
             raise RateLimitExceeded from e
 
 
-class LeakyTokenBucketLimiter(RateLimiter):
-    def __init__(self) -> None: ...
+class PersistentQuotaLimiter:
+    """
+    Persistent Quota Rate Limiter
+    Limit executions per key (e.g. tenant) within long calendar windows (e.g. 1M executions per day).
+    The usage survives process restarts. Over the quota executions are rejected with RateLimitExceeded
+    """
+
+    __slots__ = ("_quota",)
+
+    def __init__(
+        self,
+        path: str,
+        limit: int,
+        period: PeriodT = "day",
+        checkpoint_interval_secs: float = 1.0,
+    ) -> None:
+        self._quota = PersistentQuota(path, limit, period, checkpoint_interval_secs)
+
+    @property
+    def quota(self) -> PersistentQuota:
+        return self._quota
+
+    async def acquire(self, key: str, tokens: int = 1) -> None:
+        try:
+            self._quota.take_nowait(key, tokens)
+        except FullWindow as e:
+            raise RateLimitExceeded from e
 
-    async def acquire(self) -> None: ...
+    async def close(self) -> None:
+        await self._quota.close()
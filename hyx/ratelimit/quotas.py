@@ -0,0 +1,237 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from hyx.ratelimit.exceptions import FullWindow
+from hyx.ratelimit.typing import PeriodT
+
+PERIOD_SECS: dict[str, int] = {
+    "minute": 60,
+    "hour": 60 * 60,
+    "day": 24 * 60 * 60,
+}
+
+CREATE_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS quota_usage (
+    key TEXT NOT NULL,
+    window_start INTEGER NOT NULL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (key, window_start)
+)
+"""
+
+ADD_USAGE_QUERY = """
+INSERT INTO quota_usage (key, window_start, used) VALUES (?, ?, ?)
+ON CONFLICT (key, window_start) DO UPDATE SET used = used + excluded.used
+"""
+
+DELETE_EXPIRED_QUERY = "DELETE FROM quota_usage WHERE window_start < ?"
+
+GET_USAGE_QUERY = "SELECT key, used FROM quota_usage WHERE window_start = ?"
+
+
+def _get_window(now: float, period: PeriodT) -> tuple[int, float]:
+    """
+    Get the start (in whole seconds) and the end of the UTC calendar window the timestamp belongs to
+    """
+    if period == "month":
+        date = datetime.fromtimestamp(now, timezone.utc)
+        month_start = datetime(date.year, date.month, 1, tzinfo=timezone.utc)
+        month_end = datetime(date.year + date.month // 12, date.month % 12 + 1, 1, tzinfo=timezone.utc)
+
+        return int(month_start.timestamp()), month_end.timestamp()
+
+    period_secs = PERIOD_SECS[period] if isinstance(period, str) else period
+    start = int(now // period_secs * period_secs)
+
+    return start, start + period_secs
+
+
+class PersistentQuota:
+    """
+    Persistent Quota Logic
+    Count executions per key (e.g. tenant) within UTC calendar windows (e.g. a day or a month)
+    and reject them with a FullWindow error once the key has used up its quota.
+
+    The usage is checkpointed to a local SQLite database in batches from a worker thread,
+    so process restarts don't reset quotas, and quota checks never touch the disk.
+    Processes that share the database file add their usage up on each checkpoint and see the usage of others after it.
+    If the process crashes, usage since the last checkpoint is lost
+    """
+
+    __slots__ = (
+        "_limit",
+        "_period",
+        "_checkpoint_interval_secs",
+        "_connection",
+        "_connection_lock",
+        "_window_start",
+        "_window_end",
+        "_used",
+        "_pending",
+        "_checkpoint_handle",
+        "_checkpoint_task",
+    )
+
+    def __init__(
+        self,
+        path: str,
+        limit: int,
+        period: PeriodT = "day",
+        checkpoint_interval_secs: float = 1.0,
+    ) -> None:
+        if limit <= 0:
+            raise ValueError(f'limit should be greater than zero ("{limit}" given)')
+
+        if isinstance(period, str) and period != "month" and period not in PERIOD_SECS:
+            raise ValueError(f'period should be one of minute, hour, day, month or seconds ("{period}" given)')
+
+        if not isinstance(period, str) and period <= 0:
+            raise ValueError(f'period should be greater than zero ("{period}" given)')
+
+        self._limit = limit
+        self._period = period
+        self._checkpoint_interval_secs = checkpoint_interval_secs
+
+        # checkpoints run in worker threads, one at a time
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection_lock = threading.Lock()
+
+        self._window_start, self._window_end = _get_window(time.time(), period)
+
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(CREATE_TABLE_QUERY)
+            self._used: dict[str, int] = dict(self._connection.execute(GET_USAGE_QUERY, (self._window_start,)))
+
+        # usage that has not been checkpointed yet by (window_start, key)
+        self._pending: dict[tuple[int, str], int] = {}
+
+        self._checkpoint_handle: asyncio.TimerHandle | None = None
+        self._checkpoint_task: asyncio.Task[None] | None = None
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def remaining(self, key: str) -> int:
+        """
+        Executions the key has left in the current window, as far as this process knows
+        """
+        self._roll_over(time.time())
+
+        return max(0, self._limit - self._used.get(key, 0))
+
+    def time_until_reset(self) -> float:
+        """
+        Time in seconds until the current window is over and quotas are renewed
+        """
+        return max(0.0, self._window_end - time.time())
+
+    def take_nowait(self, key: str, tokens: int = 1) -> None:
+        self._roll_over(time.time())
+
+        used = self._used.get(key, 0) + tokens
+
+        if used > self._limit:
+            raise FullWindow
+
+        self._used[key] = used
+
+        pending_key = (self._window_start, key)
+        self._pending[pending_key] = self._pending.get(pending_key, 0) + tokens
+
+        self._schedule_checkpoint()
+
+    async def take(self, key: str, tokens: int = 1) -> None:
+        self.take_nowait(key, tokens)
+
+    async def checkpoint(self) -> None:
+        """
+        Persist the usage collected since the last checkpoint and refresh the usage of other processes
+        """
+        batch, self._pending = self._pending, {}
+        window_start = self._window_start
+
+        try:
+            usage = await asyncio.get_running_loop().run_in_executor(None, self._write, batch, window_start)
+        except BaseException:
+            # the batch is going to be retried by the next checkpoint
+            for pending_key, tokens in batch.items():
+                self._pending[pending_key] = self._pending.get(pending_key, 0) + tokens
+
+            raise
+
+        if window_start != self._window_start:
+            return
+
+        for key, used in usage.items():
+            # the usage only grows within a window, so results of overlapping checkpoints can't move it back
+            self._used[key] = max(self._used.get(key, 0), used + self._pending.get((window_start, key), 0))
+
+    async def close(self) -> None:
+        """
+        Checkpoint the remaining usage and close the database
+        """
+        if self._checkpoint_handle is not None:
+            self._checkpoint_handle.cancel()
+            self._checkpoint_handle = None
+
+        if self._checkpoint_task is not None:
+            await asyncio.gather(self._checkpoint_task, return_exceptions=True)
+
+            if self._checkpoint_handle is not None:
+                self._checkpoint_handle.cancel()
+                self._checkpoint_handle = None
+
+        await self.checkpoint()
+
+        self._connection.close()
+
+    def _roll_over(self, now: float) -> None:
+        if now < self._window_end:
+            return
+
+        # pending usage keeps its window, so it's still checkpointed
+        self._window_start, self._window_end = _get_window(now, self._period)
+        self._used = {}
+
+    def _schedule_checkpoint(self) -> None:
+        if self._checkpoint_handle is not None or self._checkpoint_task is not None:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # the usage is going to be persisted by the next checkpoint
+            return
+
+        self._checkpoint_handle = loop.call_later(self._checkpoint_interval_secs, self._start_checkpoint)
+
+    def _start_checkpoint(self) -> None:
+        self._checkpoint_handle = None
+        self._checkpoint_task = asyncio.create_task(self._run_checkpoint())
+
+    async def _run_checkpoint(self) -> None:
+        try:
+            await self.checkpoint()
+        except (sqlite3.Error, OSError):
+            # the disk may be temporarily unavailable, the batch stays pending and is retried later
+            pass
+        finally:
+            self._checkpoint_task = None
+
+            if self._pending:
+                self._schedule_checkpoint()
+
+    def _write(self, batch: dict[tuple[int, str], int], window_start: int) -> dict[str, int]:
+        with self._connection_lock, self._connection:
+            self._connection.executemany(
+                ADD_USAGE_QUERY,
+                [(key, batch_window_start, tokens) for (batch_window_start, key), tokens in batch.items()],
+            )
+            self._connection.execute(DELETE_EXPIRED_QUERY, (window_start,))
+
+            return dict(self._connection.execute(GET_USAGE_QUERY, (window_start,)))
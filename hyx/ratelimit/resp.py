@@ -0,0 +1,114 @@
+import asyncio
+from typing import Any
+
+from hyx.ratelimit.exceptions import StoreError
+
+CRLF = b"\r\n"
+
+
+def encode_command(*args: str | int | float | bytes) -> bytes:
+    """
+    Encode a command as a RESP array of bulk strings
+    """
+    chunks = [b"*%d\r\n" % len(args)]
+
+    for arg in args:
+        value = arg if isinstance(arg, bytes) else str(arg).encode()
+        chunks.append(b"$%d\r\n%s\r\n" % (len(value), value))
+
+    return b"".join(chunks)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """
+    Read and decode one RESP2 reply. Error replies are returned as StoreError instances
+    """
+    line = await reader.readuntil(CRLF)
+    reply_type, payload = line[:1], line[1:-2]
+
+    if reply_type == b"+":
+        return payload.decode()
+
+    if reply_type == b"-":
+        return StoreError(payload.decode())
+
+    if reply_type == b":":
+        return int(payload)
+
+    if reply_type == b"$":
+        length = int(payload)
+
+        if length == -1:
+            return None
+
+        data = await reader.readexactly(length + 2)
+
+        return data[:-2].decode()
+
+    if reply_type == b"*":
+        length = int(payload)
+
+        if length == -1:
+            return None
+
+        return [await read_reply(reader) for _ in range(length)]
+
+    raise StoreError(f"Unknown RESP reply type: {line!r}")
+
+
+class RESPClient:
+    """
+    A minimal client for Redis-protocol (RESP2) stores like Redis, Valkey, KeyDB or Dragonfly.
+
+    It implements just enough commands to run rate limiting scripts and keeps one lazily opened connection.
+    Any client with compatible `script_load()` and `evalsha()` methods (e.g. `redis.asyncio.Redis`) can be used instead
+    """
+
+    __slots__ = ("_host", "_port", "_reader", "_writer", "_lock")
+
+    def __init__(self, host: str = "localhost", port: int = 6379) -> None:
+        self._host = host
+        self._port = port
+
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+
+    async def execute(self, *args: str | int | float | bytes) -> Any:
+        async with self._lock:
+            try:
+                if self._reader is None or self._writer is None:
+                    self._reader, self._writer = await asyncio.open_connection(self._host, self._port)
+
+                self._writer.write(encode_command(*args))
+                await self._writer.drain()
+
+                reply = await read_reply(self._reader)
+            except (OSError, asyncio.IncompleteReadError):
+                # the connection is in unknown state, so it's going to be reopened by the next command
+                await self.close()
+                raise
+
+        if isinstance(reply, StoreError):
+            raise reply
+
+        return reply
+
+    async def script_load(self, script: str) -> str:
+        return await self.execute("SCRIPT", "LOAD", script)
+
+    async def evalsha(self, sha: str, numkeys: int, *keys_and_args: str | int | float) -> Any:
+        return await self.execute("EVALSHA", sha, numkeys, *keys_and_args)
+
+    async def close(self) -> None:
+        writer, self._reader, self._writer = self._writer, None, None
+
+        if writer is None:
+            return
+
+        writer.close()
+
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
@@ -0,0 +1,99 @@
+from collections.abc import AsyncIterable, AsyncIterator
+
+from hyx.ratelimit.managers import TokenBucketLimiter
+from hyx.ratelimit.typing import ByteReaderT, BytesLikeT
+
+
+class BandwidthThrottle:
+    """
+    Limit throughput of byte streams (e.g. replication or export traffic) in bytes per second.
+
+    Each byte costs one token of the token bucket. Chunks larger than the bucket are passed through
+    as `memoryview` slices, so they are throttled smoothly without copying.
+    Streams wait for their bytes in the FIFO order, so all streams throttled together share the bandwidth fairly
+
+    **Parameters:**
+
+    * **bytes_per_sec** - Max throughput
+    * **burst_bytes** - How many bytes can pass at once after idleness. Equal to *bytes_per_sec* by default.
+        It's also the max size of chunks that are passed through
+    """
+
+    __slots__ = ("_limiter", "_max_chunk_size")
+
+    def __init__(self, bytes_per_sec: float, burst_bytes: float | None = None) -> None:
+        if bytes_per_sec <= 0:
+            raise ValueError(f'bytes_per_sec should be greater than zero ("{bytes_per_sec}" given)')
+
+        self._limiter = TokenBucketLimiter(max_executions=bytes_per_sec, per_time_secs=1, bucket_size=burst_bytes)
+        self._max_chunk_size = max(1, int(self._limiter.bucket.bucket_size))
+
+    @property
+    def limiter(self) -> TokenBucketLimiter:
+        return self._limiter
+
+    @property
+    def max_chunk_size(self) -> int:
+        return self._max_chunk_size
+
+    async def consume(self, num_bytes: int) -> None:
+        """
+        Wait until the given number of bytes can be transferred
+        """
+        while num_bytes > 0:
+            chunk_size = min(num_bytes, self._max_chunk_size)
+            await self._limiter.acquire(chunk_size, timeout_secs=None)
+
+            num_bytes -= chunk_size
+
+    async def iterate(self, stream: AsyncIterable[BytesLikeT]) -> AsyncIterator[memoryview]:
+        """
+        Throttle an async iterator of byte chunks
+        """
+        max_chunk_size = self._max_chunk_size
+
+        async for chunk in stream:
+            view = memoryview(chunk).cast("B")
+
+            for offset in range(0, len(view), max_chunk_size):
+                piece = view[offset : offset + max_chunk_size]
+                await self._limiter.acquire(len(piece), timeout_secs=None)
+
+                yield piece
+
+    def reader(self, reader: ByteReaderT) -> "ThrottledReader":
+        """
+        Throttle a byte reader (e.g. asyncio.StreamReader)
+        """
+        return ThrottledReader(reader, self)
+
+
+class ThrottledReader:
+    """
+    A byte reader that doesn't read faster than its bandwidth throttle permits
+    """
+
+    __slots__ = ("_reader", "_throttle")
+
+    def __init__(self, reader: ByteReaderT, throttle: BandwidthThrottle) -> None:
+        self._reader = reader
+        self._throttle = throttle
+
+    async def read(self, n: int = -1) -> bytes:
+        """
+        Read up to n bytes (or up to the max chunk size of the throttle if n is not given)
+        """
+        max_chunk_size = self._throttle.max_chunk_size
+        data = await self._reader.read(max_chunk_size if n < 0 or n > max_chunk_size else n)
+
+        if data:
+            await self._throttle.limiter.acquire(len(data), timeout_secs=None)
+
+        return data
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[bytes]:
+        while data := await self.read():
+            yield data
@@ -0,0 +1,42 @@
+from collections.abc import Callable, Hashable
+from typing import TYPE_CHECKING, Any, Literal, Protocol
+
+if TYPE_CHECKING:
+    from hyx.ratelimit.dynamic import Quota
+
+KeyFuncT = Callable[..., Hashable]
+CostFuncT = Callable[..., float]
+CostT = float | CostFuncT
+ResultCostFuncT = Callable[[Any], float]
+
+# (max_executions, per_time_secs)
+LimitT = tuple[float, float]
+
+PriorityT = str
+PriorityFuncT = Callable[..., PriorityT]
+
+QuotaFuncT = Callable[[Any], "Quota | None"]
+
+# a UTC calendar period or a number of seconds
+PeriodT = Literal["minute", "hour", "day", "month"] | int
+
+
+class ScriptClientT(Protocol):
+    """
+    A Redis-protocol client that can run server-side scripts (e.g. RESPClient or redis.asyncio.Redis)
+    """
+
+    async def script_load(self, script: str) -> str: ...
+
+    async def evalsha(self, sha: str, numkeys: int, *keys_and_args: str | int | float) -> Any: ...
+
+
+BytesLikeT = bytes | bytearray | memoryview
+
+
+class ByteReaderT(Protocol):
+    """
+    An async byte reader (e.g. asyncio.StreamReader)
+    """
+
+    async def read(self, n: int = -1) -> bytes: ...
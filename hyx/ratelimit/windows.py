@@ -0,0 +1,152 @@
+import math
+import time
+from array import array
+
+from hyx.ratelimit.exceptions import FullWindow
+
+
+class SlidingWindowLog:
+    """
+    Sliding Window Log Logic
+    Keep timestamps of the last executions in a ring buffer. A new execution is allowed
+    if the oldest of the last *max_executions* executions has already left the window.
+    Otherwise, it's going to be rejected with a FullWindow error
+    """
+
+    __slots__ = (
+        "_max_executions",
+        "_per_time_secs",
+        "_log",
+        "_oldest_idx",
+    )
+
+    def __init__(self, max_executions: int, per_time_secs: float) -> None:
+        if max_executions <= 0:
+            raise ValueError(f'max_executions should be greater than zero ("{max_executions}" given)')
+
+        self._max_executions = max_executions
+        self._per_time_secs = per_time_secs
+
+        self._log = array("d", [-math.inf]) * max_executions
+        self._oldest_idx = 0
+
+    @property
+    def executions(self) -> int:
+        """
+        Number of executions that happened within the current window
+        """
+        window_start = time.monotonic() - self._per_time_secs
+
+        return sum(1 for executed_at in self._log if executed_at > window_start)
+
+    def time_until_available(self) -> float:
+        """
+        Time in seconds until a new execution is going to be allowed (zero if it is allowed now)
+        """
+        return max(0.0, self._log[self._oldest_idx] + self._per_time_secs - time.monotonic())
+
+    def take_nowait(self) -> None:
+        now = time.monotonic()
+        oldest_idx = self._oldest_idx
+
+        if now - self._log[oldest_idx] < self._per_time_secs:
+            raise FullWindow
+
+        self._log[oldest_idx] = now
+        self._oldest_idx = (oldest_idx + 1) % self._max_executions
+
+    async def take(self) -> None:
+        self.take_nowait()
+
+
+class SlidingWindowCounter:
+    """
+    Sliding Window Counter Logic
+    Count executions in two adjacent fixed windows and approximate the number of executions
+    in the sliding window by weighting the previous window count by its overlap with the sliding window.
+    If the estimate exceeds *max_executions*, the execution is rejected with a FullWindow error
+    """
+
+    __slots__ = (
+        "_max_executions",
+        "_per_time_secs",
+        "_window_start",
+        "_current_executions",
+        "_previous_executions",
+    )
+
+    def __init__(self, max_executions: int, per_time_secs: float) -> None:
+        if max_executions <= 0:
+            raise ValueError(f'max_executions should be greater than zero ("{max_executions}" given)')
+
+        self._max_executions = max_executions
+        self._per_time_secs = per_time_secs
+
+        self._window_start = time.monotonic()
+        self._current_executions = 0
+        self._previous_executions = 0
+
+    @property
+    def executions(self) -> float:
+        """
+        Estimated number of executions that happened within the sliding window
+        """
+        now = time.monotonic()
+        self._slide(now)
+
+        return self._estimate(now)
+
+    def time_until_available(self) -> float:
+        """
+        Time in seconds until a new execution is going to be allowed (zero if it is allowed now)
+        """
+        now = time.monotonic()
+        self._slide(now)
+
+        window_secs = self._per_time_secs
+        until_next_window = self._window_start + window_secs - now
+
+        previous_executions = self._previous_executions
+        current_executions = self._current_executions
+
+        if current_executions + 1 > self._max_executions:
+            # the current window is full, so we need to wait until it becomes the previous one
+            wait_secs = until_next_window
+            previous_executions, current_executions = current_executions, 0
+        else:
+            wait_secs = until_next_window - window_secs
+
+        spare_executions = self._max_executions - current_executions - 1
+
+        if previous_executions <= spare_executions:
+            return max(0.0, wait_secs)
+
+        # the previous window should slide out enough, so its weighted count fits the spare executions
+        return max(0.0, wait_secs + window_secs * (1 - spare_executions / previous_executions))
+
+    def take_nowait(self) -> None:
+        now = time.monotonic()
+        self._slide(now)
+
+        if self._estimate(now) + 1 > self._max_executions:
+            raise FullWindow
+
+        self._current_executions += 1
+
+    async def take(self) -> None:
+        self.take_nowait()
+
+    def _estimate(self, now: float) -> float:
+        previous_window_weight = 1 - (now - self._window_start) / self._per_time_secs
+
+        return self._previous_executions * previous_window_weight + self._current_executions
+
+    def _slide(self, now: float) -> None:
+        passed_windows = int((now - self._window_start) // self._per_time_secs)
+
+        if passed_windows <= 0:
+            return
+
+        self._previous_executions = self._current_executions if passed_windows == 1 else 0
+        self._current_executions = 0
+        self._window_start += passed_windows * self._per_time_secs
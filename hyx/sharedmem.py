@@ -0,0 +1,161 @@
+"""
+Host-wide state shared between processes (e.g. gunicorn or uvicorn workers) without any network service.
+
+The state is kept in a memory-mapped file (in /dev/shm when available) as an array of 64-bit integers.
+Updates happen in short critical sections guarded by an fcntl record lock,
+which the OS releases automatically if the process holding it dies.
+
+The state often refers to the time.monotonic_ns() clock that restarts on boot,
+so segments left from the previous boot are reset on open.
+"""
+
+import mmap
+import os
+import re
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+WORD_SIZE = 8
+SHM_DIR = "/dev/shm"
+BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+
+# the first word of each segment keeps the id of the boot it has been written during
+HEADER_WORDS = 1
+
+
+def _get_segment_path(name: str) -> str:
+    directory = SHM_DIR if os.path.isdir(SHM_DIR) else tempfile.gettempdir()
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+
+    return os.path.join(directory, f"hyx-{safe_name}")
+
+
+def _get_boot_id() -> int:
+    """
+    Get a 64-bit id of the current boot
+    """
+    try:
+        with open(BOOT_ID_PATH) as boot_id_file:
+            return int.from_bytes(bytes.fromhex(boot_id_file.read().strip().replace("-", "")[:16]), "big", signed=True)
+    except (OSError, ValueError):
+        # the boot time in minutes is stable enough to tell boots apart
+        return int((time.time() - time.monotonic()) // 60)
+
+
+class SharedSegment:
+    """
+    A named host-wide memory segment of 64-bit integer words.
+    All processes that open a segment with the same name and size see the same words.
+
+    **Parameters:**
+
+    * **name** - The segment name. It's shared by all processes on the host
+    * **words** - How many 64-bit words the segment holds. All words are zero when the segment is created
+    """
+
+    __slots__ = ("_name", "_path", "_fd", "_mmap", "_view", "_words", "_thread_lock")
+
+    def __init__(self, name: str, words: int) -> None:
+        if fcntl is None:  # pragma: no cover
+            raise RuntimeError("Shared memory state requires a POSIX system with fcntl support (e.g. Linux or macOS)")
+
+        self._name = name
+        self._path = _get_segment_path(name)
+
+        # the segment directory is usually writable by all users, so don't trust files of others
+        self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+
+        try:
+            if os.fstat(self._fd).st_uid != os.getuid():
+                raise PermissionError(f"The shared memory segment {self._path} is owned by another user")
+
+            size = (HEADER_WORDS + words) * WORD_SIZE
+
+            with self._locked_file():
+                if os.fstat(self._fd).st_size < size:
+                    os.ftruncate(self._fd, size)
+
+                self._mmap = mmap.mmap(self._fd, size)
+                self._view = memoryview(self._mmap).cast("q")
+
+                boot_id = _get_boot_id()
+
+                if self._view[0] != boot_id:
+                    # the state of the previous boot refers to the clock that has been restarted since then
+                    self._mmap[:] = bytes(size)
+                    self._view[0] = boot_id
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+        self._words = self._view[HEADER_WORDS:]
+
+        # fcntl locks are held by processes, so threads of one process need their own lock
+        self._thread_lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __getitem__(self, idx: int) -> int:
+        return self._words[idx]
+
+    @contextmanager
+    def _locked_file(self) -> Iterator[None]:
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def locked(self) -> Iterator[memoryview]:
+        """
+        Get exclusive access to the segment words across all processes and threads on the host.
+        Keep critical sections short as other processes are blocked until the lock is released
+        """
+        with self._thread_lock, self._locked_file():
+            yield self._words
+
+    def compare_and_swap(self, idx: int, expected: int, new: int) -> bool:
+        """
+        Atomically set the word to the new value if it's still equal to the expected one
+        """
+        with self.locked() as words:
+            if words[idx] != expected:
+                return False
+
+            words[idx] = new
+
+            return True
+
+    def close(self) -> None:
+        self._words.release()
+        self._view.release()
+        self._mmap.close()
+        os.close(self._fd)
+
+    def unlink(self) -> None:
+        """
+        Remove the segment from the host. Processes that have it open keep using their mapping
+        """
+        try:
+            os.unlink(self._path)
+        except FileNotFoundError:
+            pass
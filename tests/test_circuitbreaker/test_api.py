@@ -1,14 +1,25 @@
 import asyncio
+import contextlib
+import random
+import time
 from typing import cast
 from unittest.mock import Mock
 
 import pytest
 
-from hyx.circuitbreaker import BreakerListener, consecutive_breaker
+from hyx.circuitbreaker import (
+    BreakerListener,
+    HealthCheck,
+    consecutive_breaker,
+    count_window_breaker,
+    time_window_breaker,
+)
 from hyx.circuitbreaker.context import BreakerContext
 from hyx.circuitbreaker.exceptions import BreakerFailing
+from hyx.circuitbreaker.managers import WindowCircuitBreaker
 from hyx.circuitbreaker.states import BreakerState, FailingState, RecoveringState, WorkingState
 from hyx.events import EventManager
+from hyx.retry.backoffs import expo
 
 
 class Listener(BreakerListener):
@@ -180,3 +191,621 @@ async def test__circuitbreaker__consecutive__state_transitions_with_failure_in_t
         await faulty()
 
     assert isinstance(breaker.state, FailingState)
+
+
+async def test__circuitbreaker__time_window__fail_on_failure_rate() -> None:
+    event_manager = EventManager()
+    listener = Listener()
+
+    breaker = time_window_breaker(
+        exceptions=RuntimeError,
+        failure_rate_threshold=0.5,
+        window_secs=10,
+        minimum_calls=10,
+        recovery_time_secs=0.1,
+        recovery_threshold=1,
+        listeners=(listener,),
+        event_manager=event_manager,
+    )
+    calls = 0
+    recovered = False
+
+    @breaker
+    async def flaky() -> float:
+        nonlocal calls
+        calls += 1
+
+        # 60% of calls fail, but never more than two in a row
+        if not recovered and calls % 5 in (1, 2, 4):
+            raise RuntimeError("upstream has failed")
+
+        return 42
+
+    for _ in range(9):
+        with contextlib.suppress(RuntimeError):
+            await flaky()
+
+        assert isinstance(breaker.state, WorkingState)
+
+    with contextlib.suppress(RuntimeError):
+        await flaky()
+
+    assert isinstance(breaker.state, FailingState)
+
+    with pytest.raises(BreakerFailing):
+        await flaky()
+
+    await asyncio.sleep(0.1)
+    recovered = True
+
+    # the window starts over after recovering
+    assert await flaky() == 42
+    assert isinstance(breaker.state, WorkingState)
+    assert cast(WindowCircuitBreaker, breaker._manager).window.calls == 0
+
+    await event_manager.wait_for_tasks()
+
+    assert listener.state_history[-3:] == ["recovering", "recovering", "working"]
+
+
+async def test__circuitbreaker__time_window__context_manager() -> None:
+    breaker = time_window_breaker(exceptions=RuntimeError, minimum_calls=2, recovery_time_secs=0.1)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            async with breaker:
+                raise RuntimeError("upstream has failed")
+
+    assert isinstance(breaker.state, FailingState)
+
+
+async def test__circuitbreaker__count_window__fail_on_failure_rate() -> None:
+    event_manager = EventManager()
+    listener = Listener()
+
+    breaker = count_window_breaker(
+        exceptions=RuntimeError,
+        failure_rate_threshold=0.5,
+        window_size=4,
+        recovery_time_secs=0.1,
+        listeners=(listener,),
+        event_manager=event_manager,
+    )
+
+    @breaker
+    async def faulty(fail: bool) -> float:
+        if fail:
+            raise RuntimeError("upstream has failed")
+
+        return 42
+
+    for fail in (True, False, True):
+        with contextlib.suppress(RuntimeError):
+            await faulty(fail)
+
+    assert isinstance(breaker.state, WorkingState)
+
+    assert await faulty(False) == 42
+    assert isinstance(breaker.state, FailingState)
+
+    with pytest.raises(BreakerFailing):
+        await faulty(False)
+
+    await event_manager.wait_for_tasks()
+
+    assert listener.state_history[-1] == "failing"
+
+
+async def test__circuitbreaker__consecutive__slow_calls_are_failures() -> None:
+    breaker = consecutive_breaker(failure_threshold=2, recovery_time_secs=0.1, slow_call_secs=0.05)
+
+    @breaker
+    async def slow() -> float:
+        await asyncio.sleep(0.06)
+        return 42
+
+    assert await slow() == 42
+    assert cast(WorkingState, breaker.state).consecutive_exceptions == 1
+
+    async with breaker:
+        await asyncio.sleep(0.06)
+
+    assert isinstance(breaker.state, FailingState)
+
+
+async def test__circuitbreaker__consecutive__fast_calls_reset_failures() -> None:
+    breaker = consecutive_breaker(failure_threshold=2, slow_call_secs=0.05)
+
+    @breaker
+    async def calc(delay: float) -> float:
+        await asyncio.sleep(delay)
+        return 42
+
+    assert await calc(0.06) == 42
+    assert await calc(0) == 42
+
+    assert cast(WorkingState, breaker.state).consecutive_exceptions == 0
+
+
+async def test__circuitbreaker__time_window__slow_call_rate() -> None:
+    breaker = time_window_breaker(
+        minimum_calls=4,
+        slow_call_secs=0.05,
+        slow_call_rate_threshold=0.5,
+    )
+
+    @breaker
+    async def calc(delay: float) -> float:
+        await asyncio.sleep(delay)
+        return 42
+
+    for delay in (0.06, 0, 0.06):
+        assert await calc(delay) == 42
+
+    assert isinstance(breaker.state, WorkingState)
+
+    assert await calc(0) == 42
+    assert isinstance(breaker.state, FailingState)
+
+
+async def test__circuitbreaker__recovering__slow_call_fails_recovery() -> None:
+    breaker = consecutive_breaker(failure_threshold=1, recovery_time_secs=0.05, slow_call_secs=0.05)
+
+    @breaker
+    async def calc(delay: float) -> float:
+        await asyncio.sleep(delay)
+        return 42
+
+    assert await calc(0.06) == 42
+    assert isinstance(breaker.state, FailingState)
+
+    await asyncio.sleep(0.05)
+
+    assert await calc(0.06) == 42
+    assert isinstance(breaker.state, FailingState)
+
+
+async def test__circuitbreaker__nested_context_managers__slow_calls() -> None:
+    outer_breaker = consecutive_breaker(failure_threshold=1, slow_call_secs=0.05)
+    inner_breaker = consecutive_breaker(failure_threshold=1, slow_call_secs=0.05)
+
+    async with outer_breaker:
+        async with inner_breaker:
+            pass
+
+        await asyncio.sleep(0.06)
+
+    assert isinstance(inner_breaker.state, WorkingState)
+    assert isinstance(outer_breaker.state, FailingState)
+
+
+async def test__circuitbreaker__consecutive__reuse_states() -> None:
+    breaker = consecutive_breaker(exceptions=RuntimeError, failure_threshold=1, recovery_time_secs=0.05)
+    working_state = breaker.state
+
+    @breaker
+    async def faulty(fail: bool) -> float:
+        if fail:
+            raise RuntimeError("upstream has failed")
+
+        return 42
+
+    with pytest.raises(RuntimeError):
+        await faulty(True)
+
+    failing_state = breaker.state
+
+    await asyncio.sleep(0.05)
+
+    for _ in range(3):
+        assert await faulty(False) == 42
+
+    assert breaker.state is working_state
+
+    with pytest.raises(RuntimeError):
+        await faulty(True)
+
+    assert breaker.state is failing_state
+
+
+async def test__circuitbreaker__consecutive__immune_to_wall_clock_jumps(monkeypatch: pytest.MonkeyPatch) -> None:
+    breaker = consecutive_breaker(exceptions=RuntimeError, failure_threshold=1, recovery_time_secs=60)
+
+    with pytest.raises(RuntimeError):
+        async with breaker:
+            raise RuntimeError("upstream has failed")
+
+    failing_state = cast(FailingState, breaker.state)
+    now = time.time()
+
+    monkeypatch.setattr(time, "time", lambda: now + 3600)
+
+    with pytest.raises(BreakerFailing):
+        async with breaker:
+            pass
+
+    remain = failing_state.remain
+
+    assert remain is not None
+    assert 59 < remain.total_seconds() <= 60
+
+
+async def test__circuitbreaker__recovering__bounded_probes() -> None:
+    breaker = consecutive_breaker(
+        exceptions=RuntimeError,
+        failure_threshold=1,
+        recovery_time_secs=0.05,
+        recovery_threshold=2,
+        recovery_max_probes=2,
+    )
+    healthy = False
+
+    @breaker
+    async def calc() -> float:
+        if not healthy:
+            raise RuntimeError("upstream has failed")
+
+        await asyncio.sleep(0.05)
+        return 42
+
+    with pytest.raises(RuntimeError):
+        await calc()
+
+    await asyncio.sleep(0.05)
+    healthy = True
+
+    results = await asyncio.gather(*[calc() for _ in range(5)], return_exceptions=True)
+
+    rejections = [result for result in results if result != 42]
+
+    assert results.count(42) == 2
+    assert all(isinstance(rejection, BreakerFailing) for rejection in rejections)
+    # each rejection carries its own traceback
+    assert len({id(rejection) for rejection in rejections}) == len(rejections)
+    assert isinstance(breaker.state, WorkingState)
+
+
+async def test__circuitbreaker__recovering__ignore_executions_started_before() -> None:
+    breaker = consecutive_breaker(
+        exceptions=RuntimeError,
+        failure_threshold=1,
+        recovery_time_secs=0.05,
+        recovery_threshold=1,
+        recovery_max_probes=1,
+    )
+
+    @breaker
+    async def calc(delay: float, fail: bool = False) -> float:
+        await asyncio.sleep(delay)
+
+        if fail:
+            raise RuntimeError("upstream has failed")
+
+        return 42
+
+    # a long execution is started while the breaker is still working
+    long_execution = asyncio.create_task(calc(0.1))
+    await asyncio.sleep(0)
+
+    with pytest.raises(RuntimeError):
+        await calc(0, fail=True)
+
+    await asyncio.sleep(0.06)
+
+    probe = asyncio.create_task(calc(0.1, fail=True))
+    await asyncio.sleep(0)
+
+    assert isinstance(breaker.state, RecoveringState)
+
+    # the execution started before the failure is not a trial one
+    assert await long_execution == 42
+    assert isinstance(breaker.state, RecoveringState)
+    assert cast(RecoveringState, breaker.state).probes == 1
+
+    with pytest.raises(RuntimeError):
+        await probe
+
+    assert isinstance(breaker.state, FailingState)
+
+
+async def test__circuitbreaker__recovering__free_probes_on_unknown_exceptions() -> None:
+    breaker = consecutive_breaker(
+        exceptions=RuntimeError,
+        failure_threshold=1,
+        recovery_time_secs=0.05,
+        recovery_max_probes=1,
+    )
+
+    @breaker
+    async def calc(exception: Exception | None = None) -> float:
+        if exception is not None:
+            raise exception
+
+        return 42
+
+    with pytest.raises(RuntimeError):
+        await calc(RuntimeError("upstream has failed"))
+
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(ValueError):
+        await calc(ValueError("invalid input"))
+
+    assert cast(RecoveringState, breaker.state).probes == 0
+    assert await calc() == 42
+
+
+async def test__circuitbreaker__recovering__cancelled_probe_is_not_success() -> None:
+    breaker = consecutive_breaker(
+        exceptions=RuntimeError,
+        failure_threshold=1,
+        recovery_time_secs=0.05,
+        recovery_threshold=1,
+        recovery_max_probes=1,
+    )
+
+    with contextlib.suppress(RuntimeError):
+        async with breaker:
+            raise RuntimeError("upstream has failed")
+
+    await asyncio.sleep(0.05)
+
+    async def probe() -> None:
+        async with breaker:
+            await asyncio.sleep(1)
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(0.01)
+
+    probe_task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await probe_task
+
+    assert isinstance(breaker.state, RecoveringState)
+    assert cast(RecoveringState, breaker.state).probes == 0
+
+    with pytest.raises(ValueError):
+        async with breaker:
+            raise ValueError("invalid input")
+
+    assert isinstance(breaker.state, RecoveringState)
+    assert cast(RecoveringState, breaker.state).probes == 0
+
+
+async def test__circuitbreaker__recovering__invalid_max_probes() -> None:
+    with pytest.raises(ValueError):
+        consecutive_breaker(recovery_max_probes=0)
+
+
+async def test__circuitbreaker__health_check__recover_in_background() -> None:
+    event_manager = EventManager()
+    listener = Listener()
+
+    healthy = False
+    probes = 0
+
+    async def ping() -> None:
+        nonlocal probes
+        probes += 1
+
+        if not healthy:
+            raise RuntimeError("upstream is still down")
+
+    breaker = consecutive_breaker(
+        exceptions=RuntimeError,
+        failure_threshold=1,
+        recovery_time_secs=0.01,
+        recovery_threshold=2,
+        health_check=HealthCheck(ping, interval_secs=0.02, jitter=0),
+        listeners=(listener,),
+        event_manager=event_manager,
+    )
+
+    @breaker
+    async def calc() -> float:
+        if not healthy:
+            raise RuntimeError("upstream has failed")
+
+        return 42
+
+    with pytest.raises(RuntimeError):
+        await calc()
+
+    await asyncio.sleep(0.05)
+
+    # executions are not let through after the recovery delay
+    with pytest.raises(BreakerFailing):
+        await calc()
+
+    assert probes >= 2
+    assert isinstance(breaker.state, FailingState)
+
+    healthy = True
+    await asyncio.sleep(0.1)
+
+    assert isinstance(breaker.state, WorkingState)
+    assert await calc() == 42
+
+    await event_manager.wait_for_tasks()
+
+    assert listener.state_history == ["failing", "working", "working"]
+
+
+async def test__circuitbreaker__health_check__probe_timeout() -> None:
+    async def hanging_ping() -> None:
+        await asyncio.sleep(1)
+
+    health_check = HealthCheck(hanging_ping, interval_secs=0.01, timeout_secs=0.01)
+
+    assert not await health_check.check()
+
+
+@pytest.mark.parametrize("kwargs", [{"interval_secs": 0}, {"jitter": 1}, {"jitter": -0.1}])
+def test__circuitbreaker__health_check__invalid_params(kwargs: dict) -> None:
+    async def ping() -> None: ...
+
+    with pytest.raises(ValueError):
+        HealthCheck(ping, **kwargs)
+
+
+async def test__circuitbreaker__recovery_backoff__escalate_and_reset() -> None:
+    breaker = consecutive_breaker(
+        exceptions=RuntimeError,
+        failure_threshold=1,
+        recovery_threshold=1,
+        recovery_backoff=expo(min_delay_secs=0.01, base=2, max_delay_secs=0.04),
+        recovery_reset_secs=0.1,
+    )
+    healthy = False
+
+    @breaker
+    async def calc() -> float:
+        if not healthy:
+            raise RuntimeError("upstream has failed")
+
+        return 42
+
+    recovery_times = []
+
+    for _ in range(4):
+        with pytest.raises(RuntimeError):
+            await calc()
+
+        failing_state = cast(FailingState, breaker.state)
+        recovery_times.append(failing_state.recovery_time_secs)
+
+        await asyncio.sleep(failing_state.recovery_time_secs)
+
+    # each failed recovery attempt doubles the delay up to the cap
+    assert recovery_times == pytest.approx([0.01, 0.02, 0.04, 0.04])
+
+    healthy = True
+    assert await calc() == 42
+
+    # the breaker has been working for a short time only, so it's still the same outage
+    healthy = False
+
+    with pytest.raises(RuntimeError):
+        await calc()
+
+    assert cast(FailingState, breaker.state).recovery_time_secs == pytest.approx(0.04)
+
+    await asyncio.sleep(0.04)
+    healthy = True
+    assert await calc() == 42
+
+    # a new outage after a stable working period starts with the initial delay
+    await asyncio.sleep(0.1)
+    healthy = False
+
+    with pytest.raises(RuntimeError):
+        await calc()
+
+    assert cast(FailingState, breaker.state).recovery_time_secs == pytest.approx(0.01)
+
+
+async def test__circuitbreaker__ramp_up__reject_beyond_admitted_share(monkeypatch: pytest.MonkeyPatch) -> None:
+    breaker = consecutive_breaker(
+        exceptions=RuntimeError,
+        failure_threshold=1,
+        recovery_time_secs=0.01,
+        recovery_threshold=1,
+        ramp_up_secs=0.1,
+    )
+    healthy = False
+
+    @breaker
+    async def calc() -> float:
+        if not healthy:
+            raise RuntimeError("upstream has failed")
+
+        return 42
+
+    # the breaker starts with the full traffic
+    assert cast(WorkingState, breaker.state).admitted_share == 1.0
+
+    with pytest.raises(RuntimeError):
+        await calc()
+
+    await asyncio.sleep(0.01)
+    healthy = True
+
+    assert await calc() == 42
+
+    working_state = cast(WorkingState, breaker.state)
+    assert isinstance(working_state, WorkingState)
+    assert 0 < working_state.admitted_share < 1
+
+    # an execution beyond the admitted share is rejected without moving the breaker
+    monkeypatch.setattr(random, "random", lambda: 0.99)
+
+    rejections = []
+
+    for _ in range(2):
+        with pytest.raises(BreakerFailing) as e:
+            await calc()
+
+        rejections.append(e.value)
+
+    assert rejections[0] is not rejections[1]
+    assert breaker.state is working_state
+
+    await asyncio.sleep(0.1)
+
+    assert working_state.admitted_share == 1.0
+    assert await calc() == 42
+
+
+async def test__circuitbreaker__ramp_up__exponential() -> None:
+    breaker = consecutive_breaker(
+        exceptions=RuntimeError,
+        failure_threshold=1,
+        recovery_time_secs=0.01,
+        recovery_threshold=1,
+        ramp_up_secs=10,
+        ramp_up="exponential",
+    )
+
+    with contextlib.suppress(RuntimeError):
+        async with breaker:
+            raise RuntimeError
+
+    await asyncio.sleep(0.01)
+
+    async with breaker:
+        pass
+
+    # the share starts low and grows slowly at first
+    assert cast(WorkingState, breaker.state).admitted_share == pytest.approx(0.05, abs=0.01)
+
+
+async def test__circuitbreaker__ramp_up__invalid_params() -> None:
+    with pytest.raises(ValueError):
+        consecutive_breaker(ramp_up_secs=0)
+
+    with pytest.raises(ValueError):
+        consecutive_breaker(ramp_up_secs=1, ramp_up="quadratic")  # type: ignore[arg-type]
+
+
+async def test__circuitbreaker__failing__rejections_dont_share_context() -> None:
+    breaker = consecutive_breaker(exceptions=RuntimeError, failure_threshold=1, recovery_time_secs=10)
+
+    with contextlib.suppress(RuntimeError):
+        async with breaker:
+            raise RuntimeError
+
+    with pytest.raises(BreakerFailing) as first_rejection:
+        try:
+            raise KeyError("unrelated")
+        except KeyError:
+            async with breaker:
+                pass
+
+    with pytest.raises(BreakerFailing) as second_rejection:
+        async with breaker:
+            pass
+
+    assert first_rejection.value is not second_rejection.value
+    assert isinstance(first_rejection.value.__context__, KeyError)
+    assert second_rejection.value.__context__ is None
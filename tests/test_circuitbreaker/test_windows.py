@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+
+from hyx.circuitbreaker.windows import CountWindow, TimeWindow
+
+
+def test__time_window__failure_rate() -> None:
+    window = TimeWindow(window_secs=60, failure_rate_threshold=0.5, minimum_calls=4)
+
+    assert not window.record(failed=True)
+    assert not window.record(failed=False)
+    assert not window.record(failed=True)
+
+    # the minimum number of calls is reached
+    assert window.record(failed=False)
+
+    assert window.calls == 4
+    assert window.failures == 2
+    assert window.failure_rate == 0.5
+
+
+def test__time_window__occasional_successes_dont_reset_failures() -> None:
+    window = TimeWindow(window_secs=60, failure_rate_threshold=0.5, minimum_calls=10)
+    tripped = False
+
+    for call in range(10):
+        # 60% of calls fail, but never more than two in a row
+        tripped = window.record(failed=call % 5 in (0, 1, 3))
+
+    assert tripped
+
+
+async def test__time_window__expire_old_buckets() -> None:
+    window = TimeWindow(window_secs=0.2, failure_rate_threshold=0.5, minimum_calls=2, bucket_secs=0.05)
+
+    window.record(failed=True)
+    await asyncio.sleep(0.1)
+    window.record(failed=False)
+
+    assert window.calls == 2
+    assert window.failures == 1
+
+    # the first call leaves the window, while the second one is still there
+    await asyncio.sleep(0.15)
+
+    assert window.calls == 1
+    assert window.failures == 0
+
+    await asyncio.sleep(0.3)
+
+    assert window.calls == 0
+    assert not window.record(failed=True)
+
+
+def test__time_window__reset() -> None:
+    window = TimeWindow(window_secs=60, failure_rate_threshold=0.5, minimum_calls=1)
+
+    assert window.record(failed=True)
+
+    window.reset()
+
+    assert window.calls == 0
+    assert not window.record(failed=False)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"failure_rate_threshold": 0},
+        {"failure_rate_threshold": 1.5},
+        {"minimum_calls": 0},
+        {"bucket_secs": 0},
+        {"bucket_secs": 120},
+    ],
+)
+def test__time_window__invalid_params(kwargs: dict) -> None:
+    params = {"window_secs": 60, "failure_rate_threshold": 0.5, "minimum_calls": 10, **kwargs}
+
+    with pytest.raises(ValueError):
+        TimeWindow(**params)
+
+
+def test__count_window__last_calls_only() -> None:
+    window = CountWindow(size=10, failure_rate_threshold=0.5)
+
+    for _ in range(4):
+        assert not window.record(failed=True)
+
+    for _ in range(6):
+        assert not window.record(failed=False)
+
+    assert window.calls == 10
+    assert window.failures == 4
+
+    # failures of the first calls are pushed out of the window by successes
+    for _ in range(4):
+        assert not window.record(failed=False)
+
+    assert window.calls == 10
+    assert window.failures == 0
+
+    for _ in range(4):
+        assert not window.record(failed=True)
+
+    assert window.record(failed=True)
+    assert window.failure_rate == 0.5
+
+
+def test__count_window__minimum_calls() -> None:
+    window = CountWindow(size=100, failure_rate_threshold=0.5, minimum_calls=3)
+
+    assert not window.record(failed=True)
+    assert not window.record(failed=False)
+    assert window.record(failed=True)
+
+
+def test__count_window__one_bit_per_call() -> None:
+    window = CountWindow(size=1000, failure_rate_threshold=0.5)
+
+    for call in range(2500):
+        window.record(failed=call % 2 == 0)
+
+    assert len(window._failed_outcomes) == 125
+    assert window.calls == 1000
+    assert window.failures == 500
+
+
+def test__count_window__reset() -> None:
+    window = CountWindow(size=2, failure_rate_threshold=0.5)
+
+    window.record(failed=True)
+    assert window.record(failed=True)
+
+    window.reset()
+
+    assert window.calls == 0
+    assert window.failures == 0
+    assert not window.record(failed=True)
+
+
+def test__time_window__slow_call_rate() -> None:
+    window = TimeWindow(window_secs=60, failure_rate_threshold=0.5, minimum_calls=4, slow_call_rate_threshold=0.75)
+
+    assert not window.record(failed=False, slow=True)
+    assert not window.record(failed=False, slow=True)
+    assert not window.record(failed=True)
+    assert window.record(failed=False, slow=True)
+
+    assert window.slow_calls == 3
+    assert window.slow_call_rate == 0.75
+
+
+def test__count_window__slow_calls_leave_window() -> None:
+    window = CountWindow(size=3, failure_rate_threshold=1, slow_call_rate_threshold=0.6)
+
+    window.record(failed=False, slow=True)
+    window.record(failed=False)
+    assert not window.record(failed=False)
+
+    # the first slow call is pushed out by the new one
+    assert not window.record(failed=False, slow=True)
+    assert window.slow_calls == 1
+
+    assert window.record(failed=False, slow=True)
+    assert window.slow_calls == 2
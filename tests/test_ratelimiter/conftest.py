@@ -0,0 +1,71 @@
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+from collections.abc import AsyncIterator, Iterator
+
+import pytest
+
+from hyx.ratelimit import RESPClient
+from tests.test_ratelimiter.resp_stand_in import RESPStandIn
+
+
+@pytest.fixture
+async def resp_store() -> AsyncIterator[RESPStandIn]:
+    store = RESPStandIn()
+    await store.start()
+
+    yield store
+
+    await store.stop()
+
+
+@pytest.fixture
+def redis_port() -> Iterator[int]:
+    """
+    Runs a throwaway redis-server when it's installed, so scripts are checked against the real Lua interpreter.
+    CI provides a Redis service via HYX_TEST_REDIS_PORT instead, so the tests can't be skipped there
+    """
+    if external_port := os.environ.get("HYX_TEST_REDIS_PORT"):
+        yield int(external_port)
+        return
+
+    redis_server = shutil.which("redis-server")
+
+    if redis_server is None:
+        pytest.skip("redis-server is not installed")
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    process = subprocess.Popen(
+        [redis_server, "--port", str(port), "--bind", "127.0.0.1", "--save", "", "--appendonly", "no"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        yield port
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@pytest.fixture
+async def redis_client(redis_port: int) -> AsyncIterator[RESPClient]:
+    client = RESPClient(host="127.0.0.1", port=redis_port)
+
+    for _ in range(50):
+        try:
+            await client.execute("PING")
+            break
+        except OSError:
+            await asyncio.sleep(0.1)
+    else:
+        pytest.fail("redis-server hasn't started in time")
+
+    yield client
+
+    await client.close()
@@ -0,0 +1,106 @@
+import asyncio
+import hashlib
+import math
+import time
+
+from hyx.ratelimit.distributed import TOKEN_BUCKET_SCRIPT
+from hyx.ratelimit.resp import encode_command, read_reply
+
+
+def encode_reply(reply: object) -> bytes:
+    if isinstance(reply, Exception):
+        return b"-%s\r\n" % str(reply).encode()
+
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+
+    if isinstance(reply, list):
+        return b"*%d\r\n" % len(reply) + b"".join(encode_reply(item) for item in reply)
+
+    return encode_command(str(reply))[4:]  # reuse bulk string encoding, but skip the array header
+
+
+class RESPStandIn:
+    """
+    An in-process stand-in for a Redis-protocol store.
+    It understands the commands and scripts used by Hyx, emulating scripts in Python
+    """
+
+    def __init__(self) -> None:
+        self.server: asyncio.Server | None = None
+        self.commands: list[str] = []
+
+        self._connections: set[asyncio.Task] = set()
+
+        self._scripts: dict[str, str] = {}
+        self._buckets: dict[str, tuple[float, int]] = {}
+
+    @property
+    def port(self) -> int:
+        assert self.server is not None
+        return self.server.sockets[0].getsockname()[1]
+
+    def flush_scripts(self) -> None:
+        self._scripts.clear()
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self._handle_connection, "127.0.0.1", 0)
+
+    async def stop(self) -> None:
+        assert self.server is not None
+        self.server.close()
+
+        for connection in self._connections:
+            connection.cancel()
+
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self.server.wait_closed()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = asyncio.current_task()
+        assert connection is not None
+        self._connections.add(connection)
+
+        try:
+            while True:
+                command = await read_reply(reader)
+                writer.write(encode_reply(self._execute(*command)))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            self._connections.discard(connection)
+            writer.close()
+
+    def _execute(self, name: str, *args: str) -> object:
+        self.commands.append(name.upper())
+
+        if name.upper() == "SCRIPT" and args[0].upper() == "LOAD":
+            sha = hashlib.sha1(args[1].encode()).hexdigest()
+            self._scripts[sha] = args[1]
+            return sha
+
+        if name.upper() == "EVALSHA":
+            sha, _, key, *script_args = args
+
+            if sha not in self._scripts:
+                return Exception("NOSCRIPT No matching script. Please use EVAL.")
+
+            assert self._scripts[sha] == TOKEN_BUCKET_SCRIPT
+            return self._run_token_bucket_script(key, *script_args)
+
+        return Exception(f"ERR unknown command '{name}'")
+
+    def _run_token_bucket_script(self, key: str, bucket_size: str, tokens_per_us: str, requested: str) -> list[int]:
+        now = time.time_ns() // 1000
+        max_tokens, rate = float(bucket_size), float(tokens_per_us)
+
+        tokens, updated_at = self._buckets.get(key, (max_tokens, now))
+        tokens = min(max_tokens, tokens + max(0, now - updated_at) * rate)
+
+        taken = min(int(requested), math.floor(tokens))
+        tokens -= taken
+
+        self._buckets[key] = (tokens, now)
+
+        return [taken, math.ceil((1 - tokens) / rate) if tokens < 1 else 0]
@@ -0,0 +1,48 @@
+import asyncio
+
+from hyx.ratelimit.adaptive import AdaptiveThrottle
+
+
+async def test__adaptive_throttle__no_rejections_while_upstream_accepts() -> None:
+    throttle = AdaptiveThrottle(k=2)
+
+    for _ in range(100):
+        throttle.record_request()
+        throttle.record_accept()
+
+    assert throttle.rejection_probability == 0
+
+
+async def test__adaptive_throttle__rejection_probability_grows_with_rejects() -> None:
+    throttle = AdaptiveThrottle(k=2)
+
+    for idx in range(100):
+        throttle.record_request()
+
+        if idx < 10:
+            throttle.record_accept()
+
+    assert throttle.requests == 100
+    assert throttle.accepts == 10
+    assert throttle.rejection_probability == (100 - 2 * 10) / 101
+
+
+async def test__adaptive_throttle__old_counts_leave_window() -> None:
+    throttle = AdaptiveThrottle(k=2, window_secs=0.2, window_buckets=2)
+
+    for _ in range(10):
+        throttle.record_request()
+
+    await asyncio.sleep(0.1)
+    throttle.record_request()
+
+    assert throttle.requests == 11
+
+    await asyncio.sleep(0.1)
+
+    assert throttle.requests == 1
+
+    await asyncio.sleep(0.2)
+
+    assert throttle.requests == 0
+    assert throttle.rejection_probability == 0
@@ -1,9 +1,30 @@
 import asyncio
+import threading
+import time
 
 import pytest
 
-from hyx.ratelimit import TokenBucketLimiter, ratelimiter, tokenbucket
+from hyx.circuitbreaker import consecutive_breaker
+from hyx.events import EventManager
+from hyx.ratelimit import (
+    CompositeTokenBucketLimiter,
+    LeakyTokenBucketLimiter,
+    PriorityTokenBucketLimiter,
+    TokenBucketLimiter,
+    adaptive_throttle,
+    composite_tokenbucket,
+    gcra,
+    keyed_gcra,
+    leakytokenbucket,
+    priority_tokenbucket,
+    ratelimiter,
+    sliding_window_counter,
+    sliding_window_log,
+    tokenbucket,
+    warmup_tokenbucket,
+)
 from hyx.ratelimit.exceptions import RateLimitExceeded
+from hyx.ratelimit.listeners import WarmUpBreakerListener
 
 
 async def test__ratelimiter__decorator() -> None:
@@ -75,3 +96,457 @@ async def test__ratelimiter__fully_replenish_after_time_period() -> None:
 
     for _ in range(3):
         assert await calc() == 42
+
+
+async def test__ratelimiter__leaky_bucket_decorator() -> None:
+    @leakytokenbucket(max_executions=10, per_time_secs=1, bucket_size=4)
+    async def calc() -> float:
+        return 42
+
+    assert await asyncio.gather(*[calc() for _ in range(4)]) == [42] * 4
+
+
+async def test__ratelimiter__leaky_bucket_context_manager() -> None:
+    limiter = leakytokenbucket(max_executions=10, per_time_secs=1, bucket_size=4)
+
+    for _ in range(4):
+        async with limiter:
+            assert True
+
+
+async def test__ratelimiter__leaky_bucket_paces_executions() -> None:
+    limiter = LeakyTokenBucketLimiter(max_executions=10, per_time_secs=1, bucket_size=10)
+    loop = asyncio.get_running_loop()
+    executed_at: list[float] = []
+
+    async def calc() -> None:
+        await limiter.acquire()
+        executed_at.append(loop.time())
+
+    await asyncio.gather(*[calc() for _ in range(4)])
+
+    intervals = [later - earlier for earlier, later in zip(executed_at, executed_at[1:], strict=False)]
+
+    assert len(executed_at) == 4
+    assert all(interval >= 0.09 for interval in intervals)
+
+
+async def test__ratelimiter__leaky_bucket_late_ticks_dont_add_up() -> None:
+    limiter = LeakyTokenBucketLimiter(max_executions=10, per_time_secs=1, bucket_size=10)
+    loop = asyncio.get_running_loop()
+    executed_at: list[float] = []
+
+    started_at = loop.time()
+    await limiter.acquire()
+
+    async def calc() -> None:
+        await limiter.acquire()
+        executed_at.append(loop.time())
+
+    tasks = [asyncio.create_task(calc()) for _ in range(3)]
+    await asyncio.sleep(0.05)
+
+    # block the loop, so the first tick is late
+    time.sleep(0.08)
+
+    await asyncio.gather(*tasks)
+
+    assert executed_at[0] - started_at >= 0.12
+    # the following ticks keep the original schedule
+    assert executed_at[1] - started_at < 0.22
+    assert executed_at[2] - started_at < 0.32
+
+
+async def test__ratelimiter__leaky_bucket_queue_is_full() -> None:
+    limiter = LeakyTokenBucketLimiter(max_executions=10, per_time_secs=1, bucket_size=2)
+
+    await limiter.acquire()
+
+    queued = [asyncio.create_task(limiter.acquire()) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    assert limiter.queue_size == 2
+
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire()
+
+    await asyncio.gather(*queued)
+
+    assert limiter.queue_size == 0
+
+
+async def test__ratelimiter__leaky_bucket_cancelled_execution_leaves_queue() -> None:
+    limiter = LeakyTokenBucketLimiter(max_executions=10, per_time_secs=1, bucket_size=2)
+
+    await limiter.acquire()
+
+    cancelled = asyncio.create_task(limiter.acquire())
+    queued = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+    await asyncio.sleep(0)
+
+    assert limiter.queue_size == 1
+
+    await queued
+    assert cancelled.cancelled()
+
+
+async def test__ratelimiter__token_bucket_waits_for_tokens_in_fifo_order() -> None:
+    limiter = TokenBucketLimiter(max_executions=20, per_time_secs=1, bucket_size=1)
+    executed: list[int] = []
+
+    async def calc(idx: int) -> None:
+        await limiter.acquire(timeout_secs=1)
+        executed.append(idx)
+
+    await asyncio.gather(*[calc(idx) for idx in range(4)])
+
+    assert executed == [0, 1, 2, 3]
+
+
+async def test__ratelimiter__token_bucket_rejects_waits_beyond_timeout() -> None:
+    limiter = TokenBucketLimiter(max_executions=10, per_time_secs=1, bucket_size=1)
+
+    await limiter.acquire()
+
+    assert 0 < limiter.time_until_available() <= 0.1
+
+    waiter = asyncio.create_task(limiter.acquire(timeout_secs=0.2))
+    await asyncio.sleep(0)
+
+    assert 0.1 < limiter.time_until_available() <= 0.2
+
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire(timeout_secs=0.15)
+
+    await waiter
+
+
+async def test__ratelimiter__token_bucket_decorator_with_timeout() -> None:
+    @tokenbucket(max_executions=10, per_time_secs=1, bucket_size=2, timeout_secs=None)
+    async def calc() -> float:
+        return 42
+
+    assert await asyncio.gather(*[calc() for _ in range(4)]) == [42] * 4
+
+
+async def test__ratelimiter__token_bucket_cost_from_arguments() -> None:
+    @tokenbucket(max_executions=10, per_time_secs=1, cost=lambda rows: len(rows))
+    async def insert(rows: list[int]) -> int:
+        return len(rows)
+
+    assert await insert(list(range(6))) == 6
+    assert await insert(list(range(4))) == 4
+
+    with pytest.raises(RateLimitExceeded):
+        await insert([1])
+
+
+async def test__ratelimiter__token_bucket_weighted_context_manager() -> None:
+    limiter = tokenbucket(max_executions=10, per_time_secs=1, cost=4)
+
+    async with limiter:
+        pass
+
+    async with limiter.weighted(6):
+        pass
+
+    with pytest.raises(RateLimitExceeded):
+        async with limiter.weighted(1):
+            pass
+
+
+async def test__ratelimiter__weighted_waiters_keep_fifo_order() -> None:
+    limiter = TokenBucketLimiter(max_executions=20, per_time_secs=1, bucket_size=3)
+    executed: list[int] = []
+
+    async def calc(idx: int, tokens: float) -> None:
+        await limiter.acquire(tokens, timeout_secs=1)
+        executed.append(idx)
+
+    await limiter.acquire(3)
+    await asyncio.gather(calc(0, 3), calc(1, 1))
+
+    assert executed == [0, 1]
+
+
+async def test__ratelimiter__cost_requires_weighted_limiter() -> None:
+    limiter = ratelimiter(limiter=TokenBucketLimiter(max_executions=10, per_time_secs=1), cost=5)
+
+    async with limiter:
+        pass
+
+    async with limiter.weighted(5):
+        pass
+
+    with pytest.raises(RateLimitExceeded):
+        async with limiter:
+            pass
+
+    with pytest.raises(ValueError):
+        ratelimiter(limiter=LeakyTokenBucketLimiter(max_executions=10, per_time_secs=1), cost=5)
+
+
+async def test__ratelimiter__token_bucket_post_paid_cost() -> None:
+    limiter = tokenbucket(max_executions=100, per_time_secs=1, cost=10, actual_cost=lambda usage: usage)
+
+    @limiter
+    async def complete(usage: int) -> int:
+        return usage
+
+    assert await complete(95) == 95
+
+    with pytest.raises(RateLimitExceeded):
+        await complete(10)
+
+    limiter.adjust(-50)
+
+    assert await complete(5) == 5
+
+
+async def test__ratelimiter__token_bucket_refund_wakes_up_waiters() -> None:
+    limiter = TokenBucketLimiter(max_executions=1, per_time_secs=10, bucket_size=5)
+
+    await limiter.acquire(5)
+
+    waiter = asyncio.create_task(limiter.acquire(3, timeout_secs=None))
+    await asyncio.sleep(0)
+
+    limiter.adjust(-3)
+
+    await asyncio.wait_for(waiter, timeout=0.1)
+
+
+async def test__ratelimiter__priority_token_bucket_sheds_low_priorities_first() -> None:
+    limiter = PriorityTokenBucketLimiter(max_executions=10, per_time_secs=60)
+
+    for _ in range(5):
+        await limiter.acquire(priority="sheddable")
+
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire(priority="sheddable")
+
+    for _ in range(4):
+        await limiter.acquire()
+
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire()
+
+    await limiter.acquire(priority="critical")
+
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire(priority="critical")
+
+    with pytest.raises(ValueError):
+        await limiter.acquire(priority="unknown")
+
+
+async def test__ratelimiter__priority_token_bucket_admits_all_classes_with_small_buckets() -> None:
+    @priority_tokenbucket(max_executions=1, per_time_secs=60)
+    async def calc() -> float:
+        return 42
+
+    assert await calc() == 42
+
+    with pytest.raises(RateLimitExceeded):
+        await calc()
+
+
+async def test__ratelimiter__priority_token_bucket_decorator() -> None:
+    limiter = priority_tokenbucket(
+        max_executions=4,
+        per_time_secs=60,
+        priority=lambda user: "critical" if user == "admin" else "sheddable",
+    )
+
+    @limiter
+    async def calc(user: str) -> float:
+        return 42
+
+    assert await calc("guest") == 42
+    assert await calc("guest") == 42
+
+    with pytest.raises(RateLimitExceeded):
+        await calc("guest")
+
+    assert await calc("admin") == 42
+
+    async with limiter.prioritized("critical"):
+        pass
+
+    with pytest.raises(RateLimitExceeded):
+        await calc("admin")
+
+
+async def test__ratelimiter__warmup_token_bucket_cools_down_on_breaker_recovery() -> None:
+    limiter = warmup_tokenbucket(max_executions=100, per_time_secs=1, warmup_period_secs=0.1)
+    event_manager = EventManager()
+
+    breaker = consecutive_breaker(
+        exceptions=RuntimeError,
+        failure_threshold=1,
+        recovery_time_secs=0.05,
+        recovery_threshold=1,
+        listeners=(WarmUpBreakerListener(limiter.limiter),),
+        event_manager=event_manager,
+    )
+
+    with pytest.raises(RuntimeError):
+        async with breaker:
+            raise RuntimeError
+
+    await asyncio.sleep(0.06)
+
+    # drain stored tokens, so the limiter is warm
+    for _ in range(20):
+        await asyncio.sleep(limiter.limiter.time_until_available())
+
+        async with limiter:
+            pass
+
+    assert limiter.limiter.bucket.stored_tokens < 1
+
+    async with breaker:
+        pass
+
+    await event_manager.wait_for_tasks()
+
+    assert limiter.limiter.bucket.stored_tokens == limiter.limiter.bucket.max_tokens
+
+
+async def test__ratelimiter__composite_token_bucket_decorator() -> None:
+    @composite_tokenbucket(limits=((3, 1), (4, 60)))
+    async def calc() -> float:
+        return 42
+
+    for _ in range(3):
+        assert await calc() == 42
+
+    with pytest.raises(RateLimitExceeded):
+        await calc()
+
+    await asyncio.sleep(0.4)
+
+    assert await calc() == 42
+
+    with pytest.raises(RateLimitExceeded):
+        await calc()
+
+
+async def test__ratelimiter__composite_token_bucket_rejection_keeps_capacity() -> None:
+    limiter = CompositeTokenBucketLimiter(limits=((10, 1), (3, 60)))
+
+    await limiter.acquire(3)
+
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire()
+
+    first_bucket, second_bucket = limiter.buckets
+
+    assert first_bucket.tokens == 7
+    assert second_bucket.tokens == 0
+    assert 19 < limiter.time_until_available() <= 20
+
+
+async def test__ratelimiter__adaptive_throttle_sheds_rejected_traffic() -> None:
+    limiter = adaptive_throttle(exceptions=ConnectionError, k=1.5)
+    throttled = 0
+
+    @limiter
+    async def calc() -> float:
+        raise ConnectionError
+
+    for _ in range(100):
+        try:
+            await calc()
+        except ConnectionError:
+            pass
+        except RateLimitExceeded:
+            throttled += 1
+
+    assert throttled > 50
+
+
+async def test__ratelimiter__adaptive_throttle_counts_other_exceptions_as_accepts() -> None:
+    limiter = adaptive_throttle(exceptions=ConnectionError)
+
+    for _ in range(100):
+        try:
+            async with limiter:
+                raise ValueError
+        except ValueError:
+            pass
+
+
+def test__ratelimiter__token_bucket_shared_by_event_loops() -> None:
+    limiter = tokenbucket(max_executions=20, per_time_secs=1, bucket_size=1, timeout_secs=None)
+
+    @limiter
+    async def calc() -> float:
+        return 42
+
+    async def calc_many() -> list[float]:
+        return await asyncio.gather(*[calc() for _ in range(2)])
+
+    results: list[list[float]] = []
+    threads = [threading.Thread(target=lambda: results.append(asyncio.run(calc_many()))) for _ in range(2)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert results == [[42, 42], [42, 42]]
+
+
+async def test__ratelimiter__sliding_window_log_decorator() -> None:
+    @sliding_window_log(max_executions=3, per_time_secs=1)
+    async def calc() -> float:
+        return 42
+
+    for _ in range(3):
+        assert await calc() == 42
+
+    with pytest.raises(RateLimitExceeded):
+        await calc()
+
+
+async def test__ratelimiter__sliding_window_counter_context_manager() -> None:
+    limiter = sliding_window_counter(max_executions=3, per_time_secs=1)
+
+    for _ in range(3):
+        async with limiter:
+            assert True
+
+    with pytest.raises(RateLimitExceeded):
+        async with limiter:
+            assert True
+
+
+async def test__ratelimiter__gcra_decorator() -> None:
+    @gcra(max_executions=3, per_time_secs=1)
+    async def calc() -> float:
+        return 42
+
+    for _ in range(3):
+        assert await calc() == 42
+
+    with pytest.raises(RateLimitExceeded):
+        await calc()
+
+
+async def test__ratelimiter__keyed_gcra_decorator() -> None:
+    @keyed_gcra(max_executions=2, per_time_secs=1, key=lambda tenant: tenant)
+    async def calc(tenant: str) -> float:
+        return 42
+
+    for _ in range(2):
+        assert await calc("tenant-a") == 42
+
+    with pytest.raises(RateLimitExceeded):
+        await calc("tenant-a")
+
+    assert await calc("tenant-b") == 42
@@ -1,8 +1,10 @@
 import asyncio
+import threading
+import time
 
 import pytest
 
-from hyx.ratelimit.buckets import TokenBucket
+from hyx.ratelimit.buckets import TokenBucket, WarmUpTokenBucket
 from hyx.ratelimit.exceptions import EmptyBucket
 
 
@@ -33,3 +35,199 @@ async def test__token_bucket__fully_replenish_after_time_period() -> None:
 
     assert bucket.tokens == 3
     assert bucket.empty is False
+
+
+async def test__token_bucket__time_until_available() -> None:
+    bucket = TokenBucket(10, 1, 2)
+
+    assert bucket.time_until_available() == 0
+
+    for _ in range(2):
+        await bucket.take()
+
+    assert 0 < bucket.time_until_available() <= 0.1
+    assert 0.1 < bucket.time_until_available(2) <= 0.2
+    assert 0.2 < bucket.time_until_available(3) <= 0.3
+
+
+async def test__token_bucket__replenish_keeps_remaining_tokens() -> None:
+    bucket = TokenBucket(10, 1, 3)
+
+    await bucket.take()
+    await bucket.take()
+
+    await asyncio.sleep(0.1)
+
+    assert bucket.tokens == 2
+
+
+async def test__token_bucket__take_weighted() -> None:
+    bucket = TokenBucket(10, 1, 10)
+
+    await bucket.take(7)
+
+    assert bucket.tokens == 3
+
+    with pytest.raises(EmptyBucket):
+        await bucket.take(4)
+
+    assert bucket.tokens == 3
+
+    with pytest.raises(ValueError):
+        await bucket.take(11)
+
+
+async def test__token_bucket__adjust_allows_negative_balance() -> None:
+    bucket = TokenBucket(10, 1, 10)
+
+    await bucket.take(5)
+    bucket.adjust(10)
+
+    assert bucket.tokens == -5
+    assert bucket.empty is True
+    assert 0.5 < bucket.time_until_available() <= 0.6
+
+    bucket.adjust(-20)
+
+    assert bucket.tokens == 10
+
+
+async def test__warmup_token_bucket__ramps_up_from_cold_rate() -> None:
+    bucket = WarmUpTokenBucket(max_executions=10, per_time_secs=1, warmup_period_secs=1)
+
+    assert bucket.stored_tokens == bucket.max_tokens == 10
+
+    await bucket.take()
+
+    with pytest.raises(EmptyBucket):
+        await bucket.take()
+
+    # the first intervals are close to the cold one (0.3s)
+    assert 0.25 < bucket.time_until_available() <= 0.3
+
+    bucket.cool_down()
+
+    assert bucket.stored_tokens == bucket.max_tokens
+
+
+async def test__warmup_token_bucket__stable_rate_when_warm() -> None:
+    bucket = WarmUpTokenBucket(max_executions=100, per_time_secs=1, warmup_period_secs=0.1)
+
+    while bucket.stored_tokens > 0.01:
+        await asyncio.sleep(bucket.time_until_available())
+        await bucket.take()
+
+    await asyncio.sleep(bucket.time_until_available())
+    await bucket.take()
+
+    assert 0 < bucket.time_until_available() <= 0.01
+
+
+def test__token_bucket__created_outside_event_loop() -> None:
+    bucket = TokenBucket(10, 1, 10)
+
+    bucket.take_nowait()
+
+    assert asyncio.run(bucket.take()) is None
+    assert bucket.tokens == 8
+
+
+def test__token_bucket__shared_by_threads() -> None:
+    bucket = TokenBucket(1, 60, 1000)
+    taken: list[int] = []
+
+    def take_all() -> None:
+        count = 0
+
+        while True:
+            try:
+                bucket.take_nowait()
+            except EmptyBucket:
+                break
+
+            count += 1
+
+        taken.append(count)
+
+    threads = [threading.Thread(target=take_all) for _ in range(4)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert sum(taken) == 1000
+
+
+async def test__token_bucket__exact_rate_below_nanosecond_per_token() -> None:
+    bucket = TokenBucket(700_000_000, 1)
+
+    bucket.adjust(700_000_000)
+
+    assert 0.99 < bucket.time_until_available(700_000_000) <= 1
+
+
+async def test__token_bucket__take_keeps_tokens() -> None:
+    bucket = TokenBucket(10, 60, 10)
+
+    bucket.take_nowait(5, keep=5)
+
+    with pytest.raises(EmptyBucket):
+        bucket.take_nowait(1, keep=5)
+
+    assert bucket.tokens == 5
+
+
+def test__token_bucket__take_all_is_atomic() -> None:
+    shared_bucket = TokenBucket(1000, 3600, 1000)
+    empty_bucket = TokenBucket(1, 3600, 1)
+    empty_bucket.take_nowait()
+
+    done = threading.Event()
+    rejected = []
+
+    def take_both() -> None:
+        while not done.is_set():
+            with pytest.raises(EmptyBucket):
+                TokenBucket.take_all_nowait((shared_bucket, empty_bucket))
+
+    def take_shared() -> None:
+        for _ in range(1000):
+            try:
+                shared_bucket.take_nowait()
+            except EmptyBucket:
+                rejected.append(1)
+
+        done.set()
+
+    threads = [threading.Thread(target=take_both), threading.Thread(target=take_shared)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    # rejected takes over both buckets never hold tokens of the shared one
+    assert not rejected
+    assert shared_bucket.tokens < 1
+
+
+def test__token_bucket__exact_fractional_rate_at_long_uptime(monkeypatch: pytest.MonkeyPatch) -> None:
+    # about four months of uptime on the monotonic clock
+    now = 10**16
+    monkeypatch.setattr(time, "monotonic_ns", lambda: now)
+
+    # one token per 999.9995ns
+    bucket = TokenBucket(1_000_000.5, 1, 1)
+    bucket.take_nowait()
+
+    for _ in range(1000):
+        now += 999
+
+        with pytest.raises(EmptyBucket):
+            bucket.take_nowait()
+
+        now += 1
+        bucket.take_nowait()
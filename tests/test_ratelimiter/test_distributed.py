@@ -0,0 +1,140 @@
+import asyncio
+import uuid
+
+import pytest
+
+from hyx.ratelimit import DistributedTokenBucketLimiter, RESPClient, distributed_tokenbucket
+from hyx.ratelimit.distributed import DistributedTokenBucket
+from hyx.ratelimit.exceptions import EmptyBucket, RateLimitExceeded
+from tests.test_ratelimiter.resp_stand_in import RESPStandIn
+
+
+async def test__distributed_token_bucket__shared_between_processes(resp_store: RESPStandIn) -> None:
+    client = RESPClient(port=resp_store.port)
+
+    first_process = DistributedTokenBucket(client, "partner-quota", 3, 60)
+    second_process = DistributedTokenBucket(client, "partner-quota", 3, 60)
+
+    await first_process.take()
+    await second_process.take()
+    await first_process.take()
+
+    with pytest.raises(EmptyBucket):
+        await second_process.take()
+
+    await client.close()
+
+
+async def test__distributed_token_bucket__spend_leased_tokens_locally(resp_store: RESPStandIn) -> None:
+    client = RESPClient(port=resp_store.port)
+    bucket = DistributedTokenBucket(client, "partner-quota", 10, 60, lease_size=5)
+
+    await asyncio.gather(*[bucket.take() for _ in range(5)])
+
+    assert resp_store.commands.count("EVALSHA") == 2  # the first one is rejected with NOSCRIPT
+    assert bucket.leased_tokens == 0
+
+    await bucket.take()
+
+    assert resp_store.commands.count("EVALSHA") == 3
+    assert bucket.leased_tokens == 4
+
+    await client.close()
+
+
+async def test__distributed_token_bucket__reject_locally_until_next_token(resp_store: RESPStandIn) -> None:
+    client = RESPClient(port=resp_store.port)
+    bucket = DistributedTokenBucket(client, "partner-quota", 10, 1, bucket_size=1)
+
+    await bucket.take()
+
+    for _ in range(3):
+        with pytest.raises(EmptyBucket):
+            await bucket.take()
+
+    assert resp_store.commands.count("EVALSHA") == 3
+
+    await asyncio.sleep(0.1)
+    await bucket.take()
+
+    await client.close()
+
+
+async def test__distributed_token_bucket__reload_flushed_script(resp_store: RESPStandIn) -> None:
+    client = RESPClient(port=resp_store.port)
+    bucket = DistributedTokenBucket(client, "partner-quota", 10, 60)
+
+    await bucket.take()
+    resp_store.flush_scripts()
+    await bucket.take()
+
+    assert resp_store.commands.count("SCRIPT") == 2
+
+    await client.close()
+
+
+async def test__distributed_token_bucket__limiter(resp_store: RESPStandIn) -> None:
+    client = RESPClient(port=resp_store.port)
+    limiter = DistributedTokenBucketLimiter(client, "partner-quota", 2, 60)
+
+    @distributed_tokenbucket(client, "partner-quota", 2, 60)
+    async def calc() -> float:
+        return 42
+
+    await limiter.acquire()
+
+    assert await calc() == 42
+
+    with pytest.raises(RateLimitExceeded):
+        await calc()
+
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire()
+
+    await client.close()
+
+
+@pytest.fixture
+def redis_key() -> str:
+    # the Redis server may be shared by test runs
+    return f"partner-quota-{uuid.uuid4().hex}"
+
+
+async def test__distributed_token_bucket__real_script(redis_client: RESPClient, redis_key: str) -> None:
+    first_process = DistributedTokenBucket(redis_client, redis_key, 3, 60)
+    second_process = DistributedTokenBucket(redis_client, redis_key, 3, 60, lease_size=2)
+
+    await second_process.take()
+    await first_process.take()
+
+    assert second_process.leased_tokens == 1
+
+    with pytest.raises(EmptyBucket):
+        await first_process.take()
+
+    # the leased token is still spendable locally
+    await second_process.take()
+
+    with pytest.raises(EmptyBucket):
+        await second_process.take()
+
+
+async def test__distributed_token_bucket__real_script_refill(redis_client: RESPClient, redis_key: str) -> None:
+    bucket = DistributedTokenBucket(redis_client, redis_key, 10, 1, bucket_size=2)
+
+    await bucket.take()
+    await bucket.take()
+
+    with pytest.raises(EmptyBucket):
+        await bucket.take()
+
+    await asyncio.sleep(0.15)
+    await bucket.take()
+
+
+async def test__distributed_token_bucket__real_script_reload(redis_client: RESPClient, redis_key: str) -> None:
+    bucket = DistributedTokenBucket(redis_client, redis_key, 10, 60)
+
+    await bucket.take()
+    await redis_client.execute("SCRIPT", "FLUSH")
+    await bucket.take()
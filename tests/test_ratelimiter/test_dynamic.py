@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from hyx.ratelimit import Quota, QuotaPacer, dynamic_ratelimiter
+from hyx.ratelimit.exceptions import EmptyBucket, RateLimitExceeded
+
+
+async def test__quota_pacer__default_rate() -> None:
+    pacer = QuotaPacer(max_executions=10, per_time_secs=1)
+
+    assert pacer.reserve() == 0
+    assert 0.09 < pacer.reserve() <= 0.1
+    assert pacer.remaining is None
+
+
+async def test__quota_pacer__spreads_remaining_budget() -> None:
+    pacer = QuotaPacer(max_executions=10, per_time_secs=1)
+
+    pacer.update(Quota(remaining=4, reset_after_secs=2))
+
+    assert pacer.interval_secs == 0.5
+    assert pacer.reserve() == 0
+    assert pacer.remaining == 3
+    assert 0.49 < pacer.reserve() <= 0.5
+
+
+async def test__quota_pacer__waits_for_reset_when_budget_is_over() -> None:
+    pacer = QuotaPacer(max_executions=10, per_time_secs=1)
+
+    pacer.update(Quota(remaining=0, reset_after_secs=0.1))
+
+    assert 0.09 < pacer.time_until_available() <= 0.1
+
+    with pytest.raises(EmptyBucket):
+        pacer.reserve(max_wait_secs=0.05)
+
+    assert 0.09 < pacer.reserve() <= 0.1
+
+    await asyncio.sleep(0.1)
+
+    assert pacer.remaining is None
+    assert pacer.interval_secs == 0.1
+
+
+async def test__dynamic_ratelimiter__updates_from_results() -> None:
+    limiter = dynamic_ratelimiter(
+        max_executions=100,
+        per_time_secs=1,
+        quota=lambda headers: Quota(int(headers["X-RateLimit-Remaining"]), float(headers["X-RateLimit-Reset"])),
+        timeout_secs=0.5,
+    )
+
+    @limiter
+    async def fetch() -> dict[str, str]:
+        return {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "60"}
+
+    await fetch()
+
+    with pytest.raises(RateLimitExceeded):
+        await fetch()
+
+    limiter.update(Quota(remaining=10, reset_after_secs=0.1))
+
+    async with limiter:
+        pass
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from hyx.ratelimit.exceptions import EmptyBucket
+from hyx.ratelimit.gcra import GCRA, MIN_SWEEP_SIZE, KeyedGCRA
+
+
+async def test__gcra__burst() -> None:
+    gcra = GCRA(3, 1, 3)
+
+    for _ in range(3):
+        assert gcra.time_until_available() == 0
+        await gcra.take()
+
+    with pytest.raises(EmptyBucket):
+        await gcra.take()
+
+
+async def test__gcra__sustained_rate_without_burst() -> None:
+    gcra = GCRA(10, 1, 1)
+
+    await gcra.take()
+
+    with pytest.raises(EmptyBucket):
+        await gcra.take()
+
+    assert 0.09 < gcra.time_until_available() <= 0.1
+
+    await asyncio.sleep(gcra.time_until_available())
+
+    await gcra.take()
+
+
+async def test__gcra__fully_replenish_after_time_period() -> None:
+    gcra = GCRA(10, 1, 3)
+
+    for _ in range(3):
+        await gcra.take()
+
+    assert 0 < gcra.time_until_available() <= 0.1
+
+    await asyncio.sleep(0.3)
+
+    for _ in range(3):
+        await gcra.take()
+
+
+async def test__keyed_gcra__keys_are_limited_independently() -> None:
+    gcra = KeyedGCRA(2, 1, 2)
+
+    for _ in range(2):
+        await gcra.take("tenant-a")
+
+    with pytest.raises(EmptyBucket):
+        await gcra.take("tenant-a")
+
+    assert gcra.time_until_available("tenant-a") > 0
+    assert gcra.time_until_available("tenant-b") == 0
+
+    await gcra.take("tenant-b")
+
+
+async def test__keyed_gcra__drop_replenished_keys() -> None:
+    gcra = KeyedGCRA(100, 1, 1)
+
+    for key in range(MIN_SWEEP_SIZE - 1):
+        await gcra.take(key)
+
+    assert len(gcra) == MIN_SWEEP_SIZE - 1
+
+    await asyncio.sleep(0.02)
+    await gcra.take("new-key")
+
+    # only the new key is still replenishing
+    assert len(gcra) == 1
+
+
+async def test__keyed_gcra__max_keys() -> None:
+    gcra = KeyedGCRA(1, 60, 1, max_keys=8)
+
+    for key in range(20):
+        await gcra.take(key)
+        assert len(gcra) <= 8
+
+    # the most recent keys are still tracked
+    with pytest.raises(EmptyBucket):
+        await gcra.take(19)
+
+
+async def test__keyed_gcra__max_keys__keeps_hot_keys() -> None:
+    gcra = KeyedGCRA(1, 60, 4, max_keys=8)
+
+    # the first key is drained the most, so it's the furthest from replenishment
+    for _ in range(4):
+        await gcra.take("hot")
+
+    for key in range(20):
+        await gcra.take(key)
+
+    # the hot key is the oldest one, but it's still tracked and limited
+    with pytest.raises(EmptyBucket):
+        await gcra.take("hot")
+
+
+@pytest.mark.parametrize("max_keys", [1, 2])
+async def test__keyed_gcra__small_max_keys(max_keys: int) -> None:
+    gcra = KeyedGCRA(1, 60, 1, max_keys=max_keys)
+
+    for key in range(5):
+        await gcra.take(key)
+
+        # the key that has just been charged is never forgotten
+        with pytest.raises(EmptyBucket):
+            await gcra.take(key)
+
+        assert 1 <= len(gcra) <= max_keys
@@ -0,0 +1,147 @@
+import asyncio
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from hyx.ratelimit import persistent_quota
+from hyx.ratelimit.exceptions import FullWindow, RateLimitExceeded
+from hyx.ratelimit.quotas import PersistentQuota, _get_window
+
+
+def get_persisted_usage(path: Path) -> dict[str, int]:
+    with sqlite3.connect(path) as connection:
+        return dict(connection.execute("SELECT key, used FROM quota_usage"))
+
+
+async def test__persistent_quota__per_key(tmp_path: Path) -> None:
+    quota = PersistentQuota(str(tmp_path / "quotas.db"), limit=3)
+
+    await quota.take("tenant-a", tokens=2)
+    await quota.take("tenant-a")
+
+    with pytest.raises(FullWindow):
+        await quota.take("tenant-a")
+
+    await quota.take("tenant-b")
+
+    assert quota.remaining("tenant-a") == 0
+    assert quota.remaining("tenant-b") == 2
+
+    await quota.close()
+
+
+async def test__persistent_quota__survive_restarts(tmp_path: Path) -> None:
+    path = str(tmp_path / "quotas.db")
+
+    quota = PersistentQuota(path, limit=3)
+    await quota.take("tenant-a", tokens=2)
+    await quota.close()
+
+    restarted_quota = PersistentQuota(path, limit=3)
+
+    assert restarted_quota.remaining("tenant-a") == 1
+
+    await restarted_quota.take("tenant-a")
+
+    with pytest.raises(FullWindow):
+        await restarted_quota.take("tenant-a")
+
+    await restarted_quota.close()
+
+
+async def test__persistent_quota__checkpoint_in_background(tmp_path: Path) -> None:
+    path = tmp_path / "quotas.db"
+    quota = PersistentQuota(str(path), limit=100, checkpoint_interval_secs=0.05)
+
+    for _ in range(10):
+        await quota.take("tenant-a")
+
+    # nothing is written on the hot path
+    assert get_persisted_usage(path) == {}
+
+    await asyncio.sleep(0.2)
+
+    assert get_persisted_usage(path) == {"tenant-a": 10}
+
+    await quota.take("tenant-a")
+    await asyncio.sleep(0.2)
+
+    assert get_persisted_usage(path) == {"tenant-a": 11}
+
+    await quota.close()
+
+
+async def test__persistent_quota__shared_by_processes(tmp_path: Path) -> None:
+    path = str(tmp_path / "quotas.db")
+
+    first_process = PersistentQuota(path, limit=4)
+    second_process = PersistentQuota(path, limit=4)
+
+    await first_process.take("tenant-a", tokens=2)
+    await second_process.take("tenant-a", tokens=1)
+
+    await first_process.checkpoint()
+    await second_process.checkpoint()
+
+    assert second_process.remaining("tenant-a") == 1
+
+    await first_process.checkpoint()
+
+    assert first_process.remaining("tenant-a") == 1
+
+    await first_process.close()
+    await second_process.close()
+
+
+async def test__persistent_quota__renew_in_next_window(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 1_700_000_000.0
+    monkeypatch.setattr(time, "time", lambda: now)
+
+    quota = PersistentQuota(str(tmp_path / "quotas.db"), limit=1, period="hour")
+    await quota.take("tenant-a")
+
+    with pytest.raises(FullWindow):
+        await quota.take("tenant-a")
+
+    now += quota.time_until_reset()
+
+    await quota.take("tenant-a")
+    await quota.close()
+
+    # usage of expired windows is cleaned up
+    assert get_persisted_usage(tmp_path / "quotas.db") == {"tenant-a": 1}
+
+
+@pytest.mark.parametrize(
+    "now, expected_start, expected_end",
+    [
+        (datetime(2024, 2, 10, 5, 30), datetime(2024, 2, 1), datetime(2024, 3, 1)),
+        (datetime(2024, 12, 31, 23, 59), datetime(2024, 12, 1), datetime(2025, 1, 1)),
+    ],
+)
+def test__persistent_quota__monthly_window(now: datetime, expected_start: datetime, expected_end: datetime) -> None:
+    start, end = _get_window(now.replace(tzinfo=timezone.utc).timestamp(), "month")
+
+    assert start == expected_start.replace(tzinfo=timezone.utc).timestamp()
+    assert end == expected_end.replace(tzinfo=timezone.utc).timestamp()
+
+
+async def test__persistent_quota__decorator(tmp_path: Path) -> None:
+    quota = persistent_quota(str(tmp_path / "quotas.db"), limit=2, key=lambda tenant: tenant)
+
+    @quota
+    async def calc(tenant: str) -> float:
+        return 42
+
+    for _ in range(2):
+        assert await calc("tenant-a") == 42
+
+    with pytest.raises(RateLimitExceeded):
+        await calc("tenant-a")
+
+    assert await calc("tenant-b") == 42
+
+    await quota.close()
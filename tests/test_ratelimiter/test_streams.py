@@ -0,0 +1,53 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+
+from hyx.ratelimit import BandwidthThrottle
+
+
+async def produce(chunks: list[bytes]) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def test__bandwidth_throttle__iterate_slices_large_chunks() -> None:
+    throttle = BandwidthThrottle(bytes_per_sec=1000, burst_bytes=100)
+    chunk = bytes(range(250))
+
+    pieces = [piece async for piece in throttle.iterate(produce([chunk]))]
+
+    assert [len(piece) for piece in pieces] == [100, 100, 50]
+    assert all(isinstance(piece, memoryview) for piece in pieces)
+    assert b"".join(pieces) == chunk
+
+
+async def test__bandwidth_throttle__limits_throughput() -> None:
+    throttle = BandwidthThrottle(bytes_per_sec=1000, burst_bytes=100)
+
+    started_at = time.monotonic()
+    transferred = sum([len(piece) async for piece in throttle.iterate(produce([b"x" * 300]))])
+
+    assert transferred == 300
+    assert 0.15 < time.monotonic() - started_at < 0.3
+
+
+async def test__bandwidth_throttle__reader() -> None:
+    throttle = BandwidthThrottle(bytes_per_sec=10_000, burst_bytes=64)
+
+    stream_reader = asyncio.StreamReader()
+    stream_reader.feed_data(b"x" * 200)
+    stream_reader.feed_eof()
+
+    reader = throttle.reader(stream_reader)
+
+    assert len(await reader.read(10)) == 10
+    assert [len(data) async for data in reader] == [64, 64, 62]
+
+
+async def test__bandwidth_throttle__consume() -> None:
+    throttle = BandwidthThrottle(bytes_per_sec=1000, burst_bytes=100)
+
+    started_at = time.monotonic()
+    await throttle.consume(200)
+
+    assert 0.05 < time.monotonic() - started_at < 0.2
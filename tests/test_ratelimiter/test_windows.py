@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from hyx.ratelimit.exceptions import FullWindow
+from hyx.ratelimit.windows import SlidingWindowCounter, SlidingWindowLog
+
+
+async def test__sliding_window_log__success() -> None:
+    window = SlidingWindowLog(3, 1)
+
+    for i in range(3):
+        assert window.executions == i
+        await window.take()
+
+    assert window.executions == 3
+
+
+async def test__sliding_window_log__limit_exceeded() -> None:
+    window = SlidingWindowLog(3, 1)
+
+    with pytest.raises(FullWindow):
+        for _ in range(4):
+            await window.take()
+
+
+async def test__sliding_window_log__no_bursts_on_window_edges() -> None:
+    window = SlidingWindowLog(2, 0.4)
+
+    await window.take()
+    await asyncio.sleep(0.2)
+    await window.take()
+    await asyncio.sleep(0.25)
+
+    # the first execution has left the window, but the second one has not
+    await window.take()
+
+    with pytest.raises(FullWindow):
+        await window.take()
+
+    assert 0.1 < window.time_until_available() <= 0.2
+
+
+async def test__sliding_window_counter__success() -> None:
+    window = SlidingWindowCounter(3, 1)
+
+    for i in range(3):
+        assert window.executions == i
+        await window.take()
+
+    with pytest.raises(FullWindow):
+        await window.take()
+
+
+async def test__sliding_window_counter__weights_previous_window() -> None:
+    window = SlidingWindowCounter(4, 0.4)
+
+    for _ in range(4):
+        await window.take()
+
+    assert 0.4 - window.time_until_available() < 0.05
+
+    await asyncio.sleep(0.6)
+
+    # half of the previous window still overlaps with the sliding window
+    assert window.executions == pytest.approx(2, abs=0.5)
+    assert window.time_until_available() == 0
+
+    await window.take()
+
+
+async def test__sliding_window_counter__reset_after_idle_windows() -> None:
+    window = SlidingWindowCounter(2, 0.1)
+
+    await window.take()
+    await window.take()
+
+    await asyncio.sleep(0.25)
+
+    assert window.executions == 0
@@ -0,0 +1,217 @@
+import asyncio
+import multiprocessing
+import os
+import pathlib
+import sys
+import uuid
+from collections.abc import Iterator
+
+import pytest
+
+from hyx.bulkhead import bulkhead
+from hyx.bulkhead.exceptions import BulkheadFull
+from hyx.bulkhead.manager import PROCESS_SLOTS, SLOT_ADMITTED, SLOT_EXECUTING, SLOT_PID, SLOT_WORDS
+from hyx.circuitbreaker import HealthCheck, consecutive_breaker
+from hyx.circuitbreaker.exceptions import BreakerFailing
+from hyx.ratelimit import shared_gcra
+from hyx.ratelimit.exceptions import RateLimitExceeded
+from hyx.sharedmem import SharedSegment
+
+
+@pytest.fixture
+def name() -> Iterator[str]:
+    segment_name = f"test-{uuid.uuid4().hex}"
+
+    yield segment_name
+
+    for prefix in ("", "ratelimit-", "breaker-", "bulkhead-"):
+        SharedSegment(f"{prefix}{segment_name}", words=1).unlink()
+
+
+def _increment(name: str, times: int) -> None:
+    segment = SharedSegment(name, words=1)
+
+    for _ in range(times):
+        with segment.locked() as words:
+            words[0] += 1
+
+
+def test__sharedmem__segments_with_same_name_share_words(name: str) -> None:
+    segment = SharedSegment(name, words=2)
+    another_segment = SharedSegment(name, words=2)
+
+    assert len(segment) == 2
+    assert segment[0] == 0
+
+    with segment.locked() as words:
+        words[1] = 42
+
+    assert another_segment[1] == 42
+
+
+def test__sharedmem__compare_and_swap(name: str) -> None:
+    segment = SharedSegment(name, words=1)
+
+    assert segment.compare_and_swap(0, expected=0, new=10)
+    assert not segment.compare_and_swap(0, expected=0, new=20)
+    assert segment[0] == 10
+
+
+def test__sharedmem__locked_updates_across_processes(name: str) -> None:
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_increment, args=(name, 500)) for _ in range(4)]
+
+    for worker in workers:
+        worker.start()
+
+    for worker in workers:
+        worker.join()
+
+    assert SharedSegment(name, words=1)[0] == 2000
+
+
+async def test__sharedmem__gcra_limit_is_shared(name: str) -> None:
+    first_limiter = shared_gcra(max_executions=2, per_time_secs=60, name=name)
+    second_limiter = shared_gcra(max_executions=2, per_time_secs=60, name=name)
+
+    async with first_limiter:
+        pass
+
+    async with second_limiter:
+        pass
+
+    with pytest.raises(RateLimitExceeded):
+        async with first_limiter:
+            pass
+
+
+async def test__sharedmem__breaker_follows_shared_failure(name: str) -> None:
+    first_breaker = consecutive_breaker(
+        exceptions=RuntimeError,
+        failure_threshold=1,
+        recovery_time_secs=0.2,
+        name=name,
+        shared=True,
+    )
+    second_breaker = consecutive_breaker(
+        exceptions=RuntimeError,
+        failure_threshold=1,
+        recovery_time_secs=0.2,
+        name=name,
+        shared=True,
+    )
+
+    with pytest.raises(RuntimeError):
+        async with first_breaker:
+            raise RuntimeError
+
+    with pytest.raises(BreakerFailing):
+        async with second_breaker:
+            pass
+
+    assert second_breaker.state.NAME == "failing"
+
+    await asyncio.sleep(0.25)
+
+    async with second_breaker:
+        pass
+
+
+async def test__sharedmem__breaker_health_check_clears_shared_failure(name: str) -> None:
+    async def ping() -> None:
+        pass
+
+    breaker = consecutive_breaker(
+        exceptions=RuntimeError,
+        failure_threshold=1,
+        recovery_time_secs=10,
+        recovery_threshold=1,
+        name=name,
+        shared=True,
+        health_check=HealthCheck(ping, interval_secs=0.01, jitter=0),
+    )
+
+    with pytest.raises(RuntimeError):
+        async with breaker:
+            raise RuntimeError
+
+    await asyncio.sleep(0.05)
+
+    assert breaker.state.NAME == "working"
+
+    # the published failing deadline doesn't move the breaker back into the failing state
+    async with breaker:
+        pass
+
+    assert breaker.state.NAME == "working"
+
+
+async def test__sharedmem__bulkhead_capacity_is_shared(name: str) -> None:
+    first_bulkhead = bulkhead(max_concurrency=1, max_capacity=2, name=name, shared=True)
+    second_bulkhead = bulkhead(max_concurrency=1, max_capacity=2, name=name, shared=True)
+
+    async def calculations() -> float:
+        await asyncio.sleep(0.1)
+        return 42
+
+    tasks = [asyncio.create_task(first_bulkhead(calculations)()), asyncio.create_task(second_bulkhead(calculations)())]
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(BulkheadFull):
+        await first_bulkhead(calculations)()
+
+    assert await asyncio.gather(*tasks) == [42, 42]
+
+    assert await second_bulkhead(calculations)() == 42
+
+
+async def test__sharedmem__bulkhead_resets_slot_of_dead_process_with_same_pid(name: str) -> None:
+    segment = SharedSegment(f"bulkhead-{name}", words=PROCESS_SLOTS * SLOT_WORDS)
+
+    # a dead process with the same pid has leaked its executions
+    with segment.locked() as words:
+        words[SLOT_PID] = os.getpid()
+        words[SLOT_EXECUTING] = 1
+        words[SLOT_ADMITTED] = 2
+
+    shared_bulkhead = bulkhead(max_concurrency=1, max_capacity=2, name=name, shared=True)
+
+    async def calculations() -> float:
+        return 42
+
+    assert await shared_bulkhead(calculations)() == 42
+    assert segment[SLOT_EXECUTING] == 0
+    assert segment[SLOT_ADMITTED] == 0
+
+
+def test__sharedmem__shared_components_require_names() -> None:
+    with pytest.raises(ValueError):
+        consecutive_breaker(exceptions=RuntimeError, failure_threshold=1, recovery_time_secs=1, shared=True)
+
+    with pytest.raises(ValueError):
+        bulkhead(max_concurrency=1, max_capacity=1, shared=True)
+
+
+def test__sharedmem__segment_of_previous_boot_is_reset(name: str) -> None:
+    segment = SharedSegment(name, words=1)
+
+    with segment.locked() as words:
+        words[0] = 42
+
+    # pretend the segment has been written during another boot
+    with open(segment.path, "r+b") as segment_file:
+        segment_file.write((12345).to_bytes(8, sys.byteorder, signed=True))
+
+    assert SharedSegment(name, words=1)[0] == 0
+
+
+def test__sharedmem__symlinks_are_not_followed(name: str, tmp_path: pathlib.Path) -> None:
+    segment_path = SharedSegment(name, words=1).path
+    os.unlink(segment_path)
+    os.symlink(tmp_path / "target", segment_path)
+
+    try:
+        with pytest.raises(OSError):
+            SharedSegment(name, words=1)
+    finally:
+        os.unlink(segment_path)